@@ -0,0 +1,28 @@
+#
+# coding=utf-8
+"""benchmarks - Performance benchmarks for upoints"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# The benchmarks follow airspeed velocity's conventions, classes with a `setup`
+# method and `time_*` methods optionally parametrised by `params`, so they can
+# be used with asv directly.  For offline use without any extra dependencies
+# run:
+#
+#     python -m benchmarks.run [--quick] [--sizes 100,1000] [pattern]
+#
+# which reports the time per call, throughput and peak memory usage of each
+# benchmark.
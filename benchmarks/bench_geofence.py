@@ -0,0 +1,41 @@
+#
+# coding=utf-8
+"""bench_geofence - Geofence benchmarks"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from upoints import (geofence, point)
+
+from benchmarks import generators
+
+
+class GeofenceSetContains(object):
+    params = generators.SIZES
+    param_names = ['fences']
+
+    def setup(self, size):
+        self.fences = geofence.GeofenceSet()
+        for i, (latitude, longitude) in enumerate(generators.locations(size)):
+            self.fences[i] = [point.Point(latitude, longitude),
+                              point.Point(latitude, longitude + 0.02),
+                              point.Point(latitude + 0.02, longitude + 0.01)]
+        self.points = [point.Point(*location) for location
+                       in generators.locations(1000, 1.1)]
+        self.fences.fences(0, 0)
+
+    def time_contains(self, size):
+        list(self.fences.contains(self.points))
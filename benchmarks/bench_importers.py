@@ -0,0 +1,218 @@
+#
+# coding=utf-8
+"""bench_importers - Dataset import and export benchmarks"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from io import BytesIO
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO  # NOQA
+
+from upoints import (baken, cellid, cities, geonames, gpx, kml, nmea, osm,
+                     trigpoints, tzdata, utils, weather_stations, xearth)
+
+from benchmarks import generators
+
+
+class _Dataset(object):
+
+    """Base class for dataset benchmarks.
+
+    Subclasses set ``generator`` to a function producing the text of
+    a dataset, and ``importer`` to the class used to import it.
+    """
+
+    params = generators.SIZES
+    param_names = ['records']
+
+    generator = None
+    importer = None
+
+    def setup(self, size):
+        self.text = self.__class__.generator(size)
+        self.data = self.time_import(size)
+
+    def time_import(self, size):
+        return self.__class__.importer(StringIO(self.text))
+
+
+class GpxWaypoints(_Dataset):
+    generator = staticmethod(generators.gpx_waypoints)
+    importer = gpx.Waypoints
+
+    def time_export_gpx_file(self, size):
+        self.data.export_gpx_file()
+
+
+class GpxTracks(_Dataset):
+    generator = staticmethod(generators.gpx_tracks)
+    importer = gpx.Trackpoints
+
+    def time_export_gpx_file(self, size):
+        self.data.export_gpx_file()
+
+    def time_speed(self, size):
+        [list(segment) for segment in self.data.speed()]
+
+    def time_track_stats(self, size):
+        list(self.data.track_stats())
+
+
+class GpxRoutes(_Dataset):
+    generator = staticmethod(generators.gpx_routes)
+    importer = gpx.Routepoints
+
+    def time_export_gpx_file(self, size):
+        self.data.export_gpx_file()
+
+
+class KmlPlacemarks(_Dataset):
+    generator = staticmethod(generators.kml_placemarks)
+    importer = kml.Placemarks
+
+    def time_export_kml_file(self, size):
+        self.data.export_kml_file()
+
+    def time_write_kml(self, size):
+        self.data.write_kml(BytesIO())
+
+
+class KmlLineString(_Dataset):
+    generator = staticmethod(generators.kml_linestring)
+    importer = kml.Placemarks
+
+    def time_write_kml(self, size):
+        self.data.write_kml(BytesIO())
+
+
+class NmeaLocations(_Dataset):
+    generator = staticmethod(generators.nmea_log)
+    importer = nmea.Locations
+
+    def time_export_sentences(self, size):
+        [str(location) for location in self.data]
+
+
+class NmeaChecksums(object):
+    params = generators.SIZES
+    param_names = ['sentences']
+
+    def setup(self, size):
+        self.lines = generators.nmea_log(size).splitlines()
+        self.raw = [line.encode('ascii') for line in self.lines]
+
+    def time_calc_checksum(self, size):
+        for line in self.lines:
+            nmea.calc_checksum(line)
+
+    def time_valid_sentences(self, size):
+        list(nmea.valid_sentences(self.lines))
+
+    def time_valid_sentences_bytes(self, size):
+        list(nmea.valid_sentences(self.raw))
+
+    def time_valid_sentences_filtered(self, size):
+        list(nmea.valid_sentences(self.lines, ['GPGGA']))
+
+
+class OsmExtract(_Dataset):
+    generator = staticmethod(generators.osm_extract)
+    importer = osm.Osm
+
+    def time_export_osm_file(self, size):
+        self.data.export_osm_file()
+
+
+class GeonamesLocations(_Dataset):
+    generator = staticmethod(generators.geonames_tsv)
+
+    def setup(self, size):
+        super(GeonamesLocations, self).setup(size)
+        self.index = geonames.NameIndex(self.data)
+
+    def time_import(self, size):
+        return geonames.Locations(
+            StringIO(self.text), StringIO(generators.geonames_timezones()))
+
+    def time_name_index(self, size):
+        geonames.NameIndex(self.data)
+
+    def time_search_prefix(self, size):
+        self.index.search('p')
+
+
+class NoaaStations(_Dataset):
+    generator = staticmethod(generators.noaa_stations)
+    importer = weather_stations.Stations
+
+
+class OpenCellIdCells(_Dataset):
+    generator = staticmethod(generators.opencellid_csv)
+    importer = cellid.Cells
+
+    def time_export_csv(self, size):
+        str(self.data)
+
+
+class CitiesRecords(_Dataset):
+    generator = staticmethod(generators.cities_records)
+    importer = cities.Cities
+
+    def time_export_records(self, size):
+        [str(city) for city in self.data]
+
+
+class TrigpointsMarkers(_Dataset):
+    generator = staticmethod(generators.trigpoints_markers)
+    importer = trigpoints.Trigpoints
+
+    def setup(self, size):
+        super(TrigpointsMarkers, self).setup(size)
+        self.location = next(iter(self.data.values()))
+        self.data.nearest(self.location)
+
+    def time_export_xearth_markers(self, size):
+        utils.dump_xearth_markers(self.data)
+
+    def time_nearest(self, size):
+        self.data.nearest(self.location, 5)
+
+    def time_visible_from(self, size):
+        self.data.visible_from(self.location)
+
+
+class XearthMarkers(_Dataset):
+    generator = staticmethod(generators.xearth_markers)
+    importer = xearth.Xearths
+
+    def time_export_markers(self, size):
+        str(self.data)
+
+
+class ZoneTab(_Dataset):
+    generator = staticmethod(generators.zone_tab)
+    importer = tzdata.Zones
+
+    def time_dump_zone_file(self, size):
+        self.data.dump_zone_file()
+
+
+class BakenIni(_Dataset):
+    generator = staticmethod(generators.baken_ini)
+    importer = baken.Bakens
@@ -0,0 +1,157 @@
+#
+# coding=utf-8
+"""bench_point - Point and Points method benchmarks"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+
+from upoints import point
+
+from benchmarks import generators
+
+
+class PointMethods(object):
+    def setup(self):
+        self.home = point.Point(52.015, -0.221)
+        self.telford = point.Point(52.6333, -2.5)
+        self.date = datetime.date(2007, 6, 28)
+
+    def time_init(self):
+        point.Point(52.015, -0.221)
+
+    def time_init_dms(self):
+        point.Point((52, 0, 54), (0, -13, -15))
+
+    def time_distance(self):
+        self.home.distance(self.telford)
+
+    def time_distance_sloc(self):
+        self.home.distance(self.telford, 'sloc')
+
+    def time_bearing(self):
+        self.home.bearing(self.telford)
+
+    def time_final_bearing(self):
+        self.home.final_bearing(self.telford)
+
+    def time_midpoint(self):
+        self.home.midpoint(self.telford)
+
+    def time_destination(self):
+        self.home.destination(294, 169)
+
+    def time_sun_events(self):
+        self.home.sun_events(self.date)
+
+    def time_to_grid_locator(self):
+        self.home.to_grid_locator('extsquare')
+
+    def time_format_dms(self):
+        format(self.home, 'dms')
+
+    def time_hash(self):
+        hash(self.home)
+
+
+class PointsGenerators(object):
+    params = generators.SIZES
+    param_names = ['points']
+
+    def setup(self, size):
+        self.strings = generators.location_strings(size)
+        self.points = point.Points([point.Point(*location) for location
+                                    in generators.locations(size)])
+        self.home = point.Point(52.015, -0.221)
+        self.date = datetime.date(2007, 6, 28)
+        self.columns = self.points.to_columns()
+        self.route = point.Points(self.points[::10])
+        self.corridor = point.Corridor(self.route, 20)
+
+    def time_import_locations(self, size):
+        point.Points(self.strings, parse=True)
+
+    def time_to_columns(self, size):
+        self.points.to_columns()
+
+    def time_from_columns(self, size):
+        point.Points.from_columns(self.columns)
+
+    def time_distance(self, size):
+        list(self.points.distance())
+
+    def time_bearing(self, size):
+        list(self.points.bearing())
+
+    def time_final_bearing(self, size):
+        list(self.points.final_bearing())
+
+    def time_inverse(self, size):
+        list(self.points.inverse())
+
+    def time_midpoint(self, size):
+        list(self.points.midpoint())
+
+    def time_range(self, size):
+        list(self.points.range(self.home, 20))
+
+    def time_within_corridor(self, size):
+        list(self.points.within_corridor(self.route, 20))
+
+    def time_within_prepared_corridor(self, size):
+        list(self.points.within_corridor(self.corridor, 20))
+
+    def time_cluster_grid(self, size):
+        self.points.cluster(5, method='grid')
+
+    def time_cluster_dbscan(self, size):
+        self.points.cluster(5, 4)
+
+    def time_resample(self, size):
+        self.points.resample(every_km=50)
+
+    def time_densify(self, size):
+        self.points.densify(50)
+
+    def time_destination(self, size):
+        list(self.points.destination(42, 20))
+
+    def time_sun_events(self, size):
+        list(self.points.sun_events(self.date))
+
+    def time_to_grid_locator(self, size):
+        list(self.points.to_grid_locator('subsquare'))
+
+
+class KeyedPointsGenerators(object):
+    params = generators.SIZES
+    param_names = ['points']
+
+    def setup(self, size):
+        self.strings = [(str(i), location) for i, location
+                        in enumerate(generators.location_strings(size))]
+        self.points = point.KeyedPoints(self.strings, parse=True)
+        self.order = list(self.points.keys())
+        self.home = point.Point(52.015, -0.221)
+
+    def time_import_locations(self, size):
+        point.KeyedPoints(self.strings, parse=True)
+
+    def time_distance(self, size):
+        list(self.points.distance(self.order))
+
+    def time_range(self, size):
+        list(self.points.range(self.home, 20))
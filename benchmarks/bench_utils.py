@@ -0,0 +1,71 @@
+#
+# coding=utf-8
+"""bench_utils - Conversion utility benchmarks"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+
+from upoints import utils
+
+from benchmarks import generators
+
+
+class Conversions(object):
+    def time_to_dms(self):
+        utils.to_dms(52.015)
+
+    def time_to_dd(self):
+        utils.to_dd(52, 0, 54)
+
+    def time_angle_to_name(self):
+        utils.angle_to_name(294, 16)
+
+    def time_from_grid_locator(self):
+        utils.from_grid_locator('IO92va33')
+
+    def time_to_grid_locator(self):
+        utils.to_grid_locator(52.015, -0.221, 'extsquare')
+
+    def time_from_iso6709(self):
+        utils.from_iso6709('+520054-0001315+60/')
+
+    def time_to_iso6709(self):
+        utils.to_iso6709(52.015, -0.221, 60, 'dms')
+
+    def time_parse_isoformat(self):
+        utils.Timestamp.parse_isoformat('2008-01-25T12:52:11+00:00')
+
+    def time_sun_rise_set(self):
+        utils.sun_rise_set(52.015, -0.221, datetime.date(2007, 6, 28))
+
+    def time_calc_radius(self):
+        utils.calc_radius(52.015)
+
+
+class ParseLocations(object):
+    params = generators.SIZES
+    param_names = ['strings']
+
+    def setup(self, size):
+        self.strings = generators.location_strings(size)
+
+    def time_parse_location(self, size):
+        for location in self.strings:
+            utils.parse_location(location)
+
+    def time_parse_locations(self, size):
+        utils.parse_locations(self.strings)
@@ -0,0 +1,387 @@
+#
+# coding=utf-8
+"""generators - Synthetic data generators for benchmarks"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# All generators produce text in the same format as the real data sources, and
+# use a fixed seed so that runs are comparable.
+
+from __future__ import division
+
+import datetime
+import random
+
+from upoints import (nmea, utils)
+
+#: Dataset sizes used for scaling benchmarks
+SIZES = (100, 1000, 10000)
+
+_SEED = 20140220
+
+_TZNAMES = ('Europe/London', 'Europe/Paris', 'America/New_York',
+            'Asia/Tokyo', 'Australia/Sydney')
+
+
+def _random(size):
+    """Create a seeded random number generator for a dataset.
+
+    :param int size: Number of records in the dataset
+    :rtype: :class:`random.Random`
+    :return: Reproducible random number generator
+    """
+    return random.Random(_SEED + size)
+
+
+def locations(size, spread=1.0):
+    """Generate random locations clustered around Home.
+
+    :param int size: Number of locations to generate
+    :param float spread: Maximum offset from Home in degrees
+    :rtype: ``list`` of ``tuple`` of ``float``
+    :return: Latitude and longitude pairs
+    """
+    rand = _random(size)
+    return [(52.015 + rand.uniform(-spread, spread),
+             -0.221 + rand.uniform(-spread, spread)) for _ in range(size)]
+
+
+def _timestamps(size):
+    """Generate one second spaced timestamps.
+
+    :param int size: Number of timestamps to generate
+    :rtype: ``list`` of :class:`datetime.datetime`
+    :return: Increasing timestamps
+    """
+    start = datetime.datetime(2008, 6, 3, 16, 12, 43)
+    return [start + datetime.timedelta(seconds=i) for i in range(size)]
+
+
+def location_strings(size):
+    """Generate location strings in all formats ``parse_location`` accepts.
+
+    :param int size: Number of strings to generate
+    :rtype: ``list`` of ``str``
+    """
+    data = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        kind = i % 4
+        if kind == 0:
+            data.append('%f;%f' % (latitude, longitude))
+        elif kind == 1:
+            data.append('%fN %fW' % (latitude, abs(longitude)))
+        elif kind == 2:
+            lat = utils.to_dms(latitude)
+            lon = utils.to_dms(abs(longitude))
+            data.append('%id%im%is N %id%im%is W' % (lat + lon))
+        else:
+            data.append(utils.to_grid_locator(latitude, longitude,
+                                              'extsquare'))
+    return data
+
+
+def gpx_waypoints(size):
+    """Generate GPX waypoint data.
+
+    :param int size: Number of waypoints
+    :rtype: ``str``
+    """
+    text = ['<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" '
+            'creator="benchmarks">\n']
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('<wpt lat="%f" lon="%f"><name>WPT%i</name>'
+                    '<desc>Waypoint %i</desc><ele>%i</ele></wpt>\n'
+                    % (latitude, longitude, i, i, i % 500))
+    text.append('</gpx>\n')
+    return ''.join(text)
+
+
+def _gpx_segmented(size, outer, inner, elem, segment_size=500):
+    """Generate segmented GPX data.
+
+    :param int size: Number of points
+    :param str outer: Name of the container element
+    :param str inner: Name of the segment element, if any
+    :param str elem: Name of the point element
+    :param int segment_size: Number of points per segment
+    :rtype: ``str``
+    """
+    text = ['<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" '
+            'creator="benchmarks">\n']
+    if inner:
+        text.append('<%s>\n' % outer)
+    points = zip(locations(size), _timestamps(size))
+    for i, ((latitude, longitude), timestamp) in enumerate(points):
+        if i % segment_size == 0:
+            if i:
+                text.append('</%s>\n' % (inner if inner else outer))
+            text.append('<%s>\n' % (inner if inner else outer))
+        text.append('<%s lat="%f" lon="%f"><ele>%.1f</ele>'
+                    '<time>%sZ</time></%s>\n'
+                    % (elem, latitude, longitude, (i % 500) / 10,
+                       timestamp.isoformat(), elem))
+    text.append('</%s>\n' % (inner if inner else outer))
+    if inner:
+        text.append('</%s>\n' % outer)
+    text.append('</gpx>\n')
+    return ''.join(text)
+
+
+def gpx_tracks(size):
+    """Generate GPX track data.
+
+    :param int size: Number of trackpoints
+    :rtype: ``str``
+    """
+    return _gpx_segmented(size, 'trk', 'trkseg', 'trkpt')
+
+
+def gpx_routes(size):
+    """Generate GPX route data.
+
+    :param int size: Number of routepoints
+    :rtype: ``str``
+    """
+    return _gpx_segmented(size, 'rte', None, 'rtept')
+
+
+def kml_placemarks(size):
+    """Generate KML placemark data.
+
+    :param int size: Number of placemarks
+    :rtype: ``str``
+    """
+    text = ['<kml xmlns="http://earth.google.com/kml/2.2"><Document>\n']
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('<Placemark id="P%i"><name>P%i</name>'
+                    '<description>Placemark %i</description><Point>'
+                    '<coordinates>%f,%f,%i</coordinates></Point></Placemark>\n'
+                    % (i, i, i, longitude, latitude, i % 500))
+    text.append('</Document></kml>\n')
+    return ''.join(text)
+
+
+def kml_linestring(size):
+    """Generate KML data with a single large LineString placemark.
+
+    :param int size: Number of vertices
+    :rtype: ``str``
+    """
+    text = ['<kml xmlns="http://earth.google.com/kml/2.2"><Document>\n'
+            '<Placemark id="Track"><name>Track</name><LineString>'
+            '<coordinates>\n']
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('%f,%f,%i\n' % (longitude, latitude, i % 500))
+    text.append('</coordinates></LineString></Placemark></Document></kml>\n')
+    return ''.join(text)
+
+
+def nmea_log(size):
+    """Generate NMEA 0183 log data.
+
+    Each epoch produces GGA, RMC and GSV sentences, so roughly a third of the
+    sentences are ignored by the importer just as in real receiver logs.
+
+    :param int size: Number of sentences
+    :rtype: ``str``
+    """
+    text = []
+    points = zip(locations(size), _timestamps(size))
+    for i, ((latitude, longitude), timestamp) in enumerate(points):
+        kind = i % 3
+        if kind == 0:
+            sentence = str(nmea.Fix(timestamp.time(), latitude, longitude, 1,
+                                    8, 1.2, 60.5, 47.0))
+        elif kind == 1:
+            sentence = str(nmea.Position(timestamp.time(), True, latitude,
+                                         longitude, 12.5, 45.0,
+                                         timestamp.date(), 1.5, 'A'))
+        else:
+            data = 'GPGSV,3,1,12,02,76,044,43,03,84,156,49,06,89,116,51'
+            sentence = '$%s*%02X\r' % (data, nmea.calc_checksum(data))
+        text.append(sentence.rstrip('\r') + '\n')
+    return ''.join(text)
+
+
+def osm_extract(size):
+    """Generate OpenStreetMap data.
+
+    One in ten elements is a way referencing the preceding nodes.
+
+    :param int size: Number of elements
+    :rtype: ``str``
+    """
+    text = ['<osm version="0.5" generator="benchmarks">\n']
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        if i % 10 == 9:
+            text.append('<way id="%i" visible="true" '
+                        'timestamp="2008-01-25T13:00:00+00:00">' % i)
+            text.extend('<nd ref="%i"/>' % j for j in range(i - 9, i))
+            text.append('<tag k="highway" v="primary"/></way>\n')
+        else:
+            text.append('<node id="%i" lat="%f" lon="%f" user="bench" '
+                        'visible="true" '
+                        'timestamp="2008-01-25T12:52:11+00:00">'
+                        '<tag k="amenity" v="pub"/></node>\n'
+                        % (i, latitude, longitude))
+    text.append('</osm>\n')
+    return ''.join(text)
+
+
+def geonames_tsv(size):
+    """Generate geonames.org database export data.
+
+    :param int size: Number of records
+    :rtype: ``str``
+    """
+    text = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('\t'.join((
+            str(2633441 + i), 'Place %i' % i, 'Place %i' % i,
+            'Alt %i,Other %i' % (i, i), '%.7f' % latitude, '%.7f' % longitude,
+            'P', 'PPL', 'GB', '', 'P9', '', '', '', str(i * 10), '',
+            str(i % 300), _TZNAMES[i % len(_TZNAMES)], '2006-08-21')))
+        text.append('\n')
+    return ''.join(text)
+
+
+def geonames_timezones():
+    """Generate geonames.org timezone export data.
+
+    :rtype: ``str``
+    """
+    return ('Europe/London\t0.0\t1.0\n'
+            'Europe/Paris\t1.0\t2.0\n'
+            'America/New_York\t-5.0\t-4.0\n'
+            'Asia/Tokyo\t9.0\t9.0\n'
+            'Australia/Sydney\t10.0\t11.0\n')
+
+
+def _noaa_angle(angle, hemispheres):
+    """Format an angle in NOAA's ``DD-MM-SSH`` style.
+
+    :param float angle: Angle to format
+    :param str hemispheres: Positive and negative hemisphere letters
+    :rtype: ``str``
+    """
+    degrees, minutes, seconds = utils.to_dms(abs(angle))
+    return '%02i-%02i-%02i%s' % (degrees, minutes, seconds,
+                                 hemispheres[0] if angle >= 0
+                                 else hemispheres[1])
+
+
+def noaa_stations(size):
+    """Generate WMO indexed NOAA station data.
+
+    :param int size: Number of stations
+    :rtype: ``str``
+    """
+    text = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append(';'.join((
+            '%02i' % (i // 1000 % 100), '%03i' % (i % 1000), 'E%03i' % i,
+            'Station %i' % i, '', 'United Kingdom', '6',
+            _noaa_angle(latitude, 'NS'), _noaa_angle(longitude, 'EW'),
+            '', '', str(i % 300), '', 'P' if i % 2 else '')))
+        text.append('\n')
+    return ''.join(text)
+
+
+def opencellid_csv(size):
+    """Generate OpenCellID.org export data.
+
+    :param int size: Number of cells
+    :rtype: ``str``
+    """
+    text = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('%i,%.13f,%.13f,234,%i,%i,%i,0,1,2008-04-05 21:32:40,'
+                    '2008-04-05 21:32:40\n'
+                    % (i, latitude, longitude, i % 30, i % 20000, i))
+    return ''.join(text)
+
+
+def cities_records(size):
+    """Generate GNU miscfiles cities data.
+
+    :param int size: Number of records
+    :rtype: ``str``
+    """
+    from upoints.cities import TEMPLATE
+    records = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        records.append(TEMPLATE % (i, 'City', i * 100, '', 'City %i' % i, 'UK',
+                                   'England', 'Earth', '%.3f' % longitude,
+                                   '%.3f' % latitude, '', '19961206',
+                                   'bench@example.com'))
+    return '\n//\n'.join(records) + '\n'
+
+
+def trigpoints_markers(size):
+    """Generate alltrigs-wgs84 style marker data.
+
+    :param int size: Number of trigpoints
+    :rtype: ``str``
+    """
+    text = ['H  SOFTWARE NAME & VERSION\n', 'I  GPSU 4.04,\n',
+            'S SymbolSet=0\n']
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        text.append('W,%i,N%.6f,%s%010.6f,%8.1f,Trig %i\n'
+                    % (500000 + i, latitude, 'W' if longitude < 0 else 'E',
+                       abs(longitude), i % 900, i))
+    return ''.join(text)
+
+
+def xearth_markers(size):
+    """Generate xearth marker data.
+
+    :param int size: Number of markers
+    :rtype: ``str``
+    """
+    return ''.join('%f %f "Marker %i" # Comment %i\n'
+                   % (latitude, longitude, i, i)
+                   for i, (latitude, longitude) in enumerate(locations(size)))
+
+
+def zone_tab(size):
+    """Generate zoneinfo ``zone.tab`` data.
+
+    :param int size: Number of zones
+    :rtype: ``str``
+    """
+    return ''.join('GB\t%s\tZone/%i\tComment %i, Other %i\n'
+                   % (utils.to_iso6709(latitude, longitude, format='dms')[:-1],
+                      i, i, i)
+                   for i, (latitude, longitude) in enumerate(locations(size)))
+
+
+def baken_ini(size):
+    """Generate baken INI data.
+
+    :param int size: Number of sections
+    :rtype: ``str``
+    """
+    text = []
+    for i, (latitude, longitude) in enumerate(locations(size)):
+        if i % 2:
+            text.append('[B%i]\nlocator=%s\nfrequency=50.000\nheight=460\n'
+                        'mode=A1A\n\n'
+                        % (i, utils.to_grid_locator(latitude, longitude,
+                                                    'subsquare').upper()))
+        else:
+            text.append('[B%i]\nlatitude=%f\nlongitude=%f\nheight=0.000\n\n'
+                        % (i, latitude, longitude))
+    return ''.join(text)
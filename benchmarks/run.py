@@ -0,0 +1,174 @@
+#
+# coding=utf-8
+"""run - Offline benchmark runner"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (division, print_function)
+
+import argparse
+import gc
+import inspect
+import re
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    #: ``tracemalloc`` module reference if available
+    tracemalloc = None
+
+from benchmarks import (bench_geofence, bench_importers, bench_point,
+                        bench_utils)
+
+#: Modules searched for benchmark classes
+MODULES = (bench_geofence, bench_importers, bench_point, bench_utils)
+
+
+def discover(modules=MODULES):
+    """Find benchmark classes and methods.
+
+    :param list modules: Modules to search
+    :rtype: ``list`` of ``tuple``
+    :return: Benchmark name, class and method name
+    """
+    benchmarks = []
+    for module in modules:
+        prefix = module.__name__.split('.')[-1]
+        for name, cls in sorted(vars(module).items()):
+            if name.startswith('_') or not inspect.isclass(cls) \
+                    or not cls.__module__ == module.__name__:
+                continue
+            for method in sorted(dir(cls)):
+                if method.startswith('time_'):
+                    benchmarks.append(('%s.%s.%s' % (prefix, name, method),
+                                       cls, method))
+    return benchmarks
+
+
+def time_call(func, min_time=0.2, repeat=3):
+    """Time a function call.
+
+    :param func: Function to time
+    :param float min_time: Minimum time for each timing loop
+    :param int repeat: Number of timing loops
+    :rtype: ``float``
+    :return: Best time per call in seconds
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1000000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, timer.timeit(number))
+    return best / number
+
+
+def peak_memory(func):
+    """Measure peak memory allocated during a function call.
+
+    :param func: Function to measure
+    :rtype: ``int``
+    :return: Peak allocation in bytes, or ``None`` if unsupported
+    """
+    if not tracemalloc:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(benchmarks, sizes=None, quick=False, stream=sys.stdout):
+    """Run benchmarks and report results.
+
+    :param list benchmarks: Benchmarks from :func:`discover`
+    :type sizes: ``list`` of ``int``
+    :param sizes: Restrict parametrised benchmarks to these sizes
+    :param bool quick: Only execute each benchmark once, for smoke tests
+    :param file stream: Stream to write results to
+    :rtype: ``list`` of ``tuple``
+    :return: Name, parameter, time per call, throughput and peak memory
+    """
+    results = []
+    print('%-60s %8s %12s %14s %12s' % ('benchmark', 'param', 'time/call',
+                                        'throughput', 'peak mem'),
+          file=stream)
+    for name, cls, method in benchmarks:
+        params = getattr(cls, 'params', None)
+        if params is None:
+            params = [None]
+        elif sizes:
+            params = [param for param in params if param in sizes]
+        for param in params:
+            args = () if param is None else (param, )
+            instance = cls()
+            if hasattr(instance, 'setup'):
+                instance.setup(*args)
+            func = lambda: getattr(instance, method)(*args)
+            if quick:
+                func()
+                elapsed = None
+            else:
+                elapsed = time_call(func)
+            memory = peak_memory(func)
+            results.append((name, param, elapsed, memory))
+            if elapsed is None:
+                timing = throughput = '-'
+            else:
+                timing = '%.3fms' % (elapsed * 1000)
+                throughput = '%.0f/s' % ((param or 1) / elapsed)
+            print('%-60s %8s %12s %14s %12s'
+                  % (name, '-' if param is None else param, timing,
+                     throughput,
+                     '-' if memory is None else '%.1fKiB' % (memory / 1024)),
+                  file=stream)
+    return results
+
+
+def main(argv=sys.argv[1:]):
+    """Main script handler.
+
+    :rtype: ``int``
+    :return: 0 for success
+    """
+    parser = argparse.ArgumentParser(description='Run upoints benchmarks.')
+    parser.add_argument('--quick', action='store_true',
+                        help='execute each benchmark once without timing')
+    parser.add_argument('--sizes',
+                        help='comma separated dataset sizes to run')
+    parser.add_argument('pattern', nargs='?',
+                        help='regular expression to select benchmarks')
+    args = parser.parse_args(argv)
+
+    benchmarks = discover()
+    if args.pattern:
+        benchmarks = [bench for bench in benchmarks
+                      if re.search(args.pattern, bench[0])]
+    sizes = [int(i) for i in args.sizes.split(',')] if args.sizes else None
+    run(benchmarks, sizes, args.quick)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,7 +21,7 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.baken import (Baken, Bakens)
+from upoints.baken import (Baken, Bakens, iter_bakens)
 
 
 class TestBaken(TestCase):
@@ -64,3 +64,11 @@ class TestBakens(TestCase):
         expect(data[2]) == """IW1RCT - JN44FH (44°18'45"N, 008°27'29"E)"""
         locations = Bakens(open('tests/data/no_valid_baken'))
         expect(len(locations)) == 0
+
+
+def test_iter_bakens():
+    bakens = iter_bakens(open('tests/data/baken_data'), bbox=(40, -5, 60, 10))
+    expect([name for name, baken in bakens]) == ['GB3BUX', 'IW1RCT']
+    bakens = iter_bakens(open('tests/data/baken_data'),
+                         predicate=lambda r: r['locator'] is None)
+    expect([name for name, baken in bakens]) == ['Abeche, Chad']
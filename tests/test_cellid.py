@@ -23,7 +23,7 @@ from expecter import expect
 
 import datetime
 
-from upoints.cellid import (Cell, Cells)
+from upoints.cellid import (Cell, Cells, iter_cells)
 
 
 class TestCell(TestCase):
@@ -47,7 +47,14 @@ class TestCells(TestCase):
     def setUp(self):
         self.cells = Cells(open('tests/data/cells'))
 
+    def test___init__(self):
+        expect(Cells()) == {}
+        expect(Cells.from_columns(self.cells.to_columns())) == self.cells
+
     def test___str__(self):
+        expect(str(self.cells).splitlines()[0]) == \
+            ('22747,52.0438995361328,-0.2246370017529,234,33,2319,647,0,1,'
+             '2008-04-05 21:32:40,2008-04-05 21:32:40')
         data = sorted(map(str, self.cells.values()))
         expect(data[0]) == \
             ('22747,52.0438995361328,-0.2246370017529,234,33,2319,647,0,1,'
@@ -64,3 +71,11 @@ class TestCells(TestCase):
             Cell(22747, 52.0438995361328, -0.224637001752853, 234, 33, 2319,
                  647, 0, 1, datetime.datetime(2008, 4, 5, 21, 32, 40),
                  datetime.datetime(2008, 4, 5, 21, 32, 40))
+
+
+def test_iter_cells():
+    cells = iter_cells(open('tests/data/cells'), bbox=(52.3, -1, 53, 0))
+    expect([ident for ident, cell in cells]) == ['22995', '23008']
+    cells = iter_cells(open('tests/data/cells'),
+                       predicate=lambda r: r['mnc'] == 33)
+    expect([ident for ident, cell in cells]) == ['22747']
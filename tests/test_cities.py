@@ -17,11 +17,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from io import StringIO
 from unittest import TestCase
 
 from expecter import expect
 
-from upoints.cities import (City, Cities)
+from upoints.cities import (City, Cities, iter_cities)
 
 
 class TestCity(TestCase):
@@ -68,3 +69,45 @@ class TestCities(TestCase):
         manual_list = cities_file.read().split('//\\n')
         cities = Cities(manual_list)
         expect(len(cities)) == 1
+        expect(tuple(cities[0].date)) == (1996, 12, 6, 0, 0, 0, 4, 341, -1)
+
+    def test_import_locations_broken_separator(self):
+        records = open('tests/data/city_data').read().splitlines(True)
+        del records[13]
+        cities = Cities(StringIO(u''.join(records)))
+        expect([city.identifier for city in cities]) == [126, 128]
+
+    def test_by_country(self):
+        cities = Cities(open('tests/data/city_data'))
+        expect([city.name for city in cities.by_country('UK')]) == ['London']
+        expect(cities.by_country('DE')) == []
+        cities *= 2
+        expect([city.name for city in cities.by_country('UK')]) == \
+            ['London', 'London']
+        cities *= 0
+        expect(cities.by_country('UK')) == []
+        cities.extend(Cities(open('tests/data/city_data')))
+        expect(len(cities.by_country('UK'))) == 1
+        cities.pop(0)
+        expect(cities.by_country('UK')) == []
+
+    def test_by_population(self):
+        cities = Cities(open('tests/data/city_data'))
+        expect([city.name for city in cities.by_population()]) == \
+            ['London', 'Lyon', 'Luxembourg']
+        expect([city.name for city in cities.by_population(100000)]) == \
+            ['London', 'Lyon']
+        expect([city.name for city in
+                cities.by_population(76130, 1000000)]) == \
+            ['Lyon', 'Luxembourg']
+        cities.append(City(1, 'Nowhere', 'City', '', 'UK', 'Earth', 1000,
+                           None, 0, 0, None, None, ''))
+        expect(cities.by_population(maximum=1000)[0].name) == 'Nowhere'
+
+
+def test_iter_cities():
+    cities = iter_cities(open('tests/data/city_data'), bbox=(45, 0, 50, 10))
+    expect([city.name for city in cities]) == ['Luxembourg', 'Lyon']
+    cities = iter_cities(open('tests/data/city_data'),
+                         predicate=lambda r: r['country'] == 'UK')
+    expect([city.name for city in cities]) == ['London']
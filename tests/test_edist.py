@@ -17,7 +17,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import os
+import shutil
 import sys
+import tempfile
+import threading
 
 from doctest import _ellipsis_match as ellipsis_match
 from unittest import TestCase
@@ -31,8 +35,9 @@ from expecter import expect
 from mock import patch
 
 from upoints.compat import PY2
-from upoints.edist import (LocationsError, NumberedPoint, NumberedPoints,
-                           main, read_csv)
+from upoints.edist import (EdistClient, EdistServer, LocationsError,
+                           NumberedPoint, NumberedPoints, main,
+                           process_request, read_csv)
 
 
 class TestLocationsError(TestCase):
@@ -68,6 +73,18 @@ class TestNumberedPoints(TestCase):
         locs = NumberedPoints(['0;0', 'Home', '0;0'],
                               config_locations={'Home': (52.015, -0.221)})
         expect(repr(locs)) == "NumberedPoints([NumberedPoint(0.0, 0.0, 1, 'metric'), NumberedPoint(52.015, -0.221, 'Home', 'metric'), NumberedPoint(0.0, 0.0, 3, 'metric')], 'dd', True, {'Home': (52.015, -0.221)}, 'km')"
+        locs = NumberedPoints(['1e1;2'])
+        expect((locs[0].latitude, locs[0].longitude)) == (10.0, 2.0)
+
+    def test_columns(self):
+        locs = NumberedPoints(['0;0', 'Home', '52.168;0.040'],
+                              config_locations={'Home': (52.015, -0.221)})
+        columns = locs.to_columns()
+        expect('name' in columns) == True
+        imported = NumberedPoints.from_columns(columns)
+        expect(repr(imported[:])) == repr(locs[:])
+        expect(imported[1].name) == 'Home'
+        expect(imported[1].__dict__['name']) == 'Home'
 
     @patch('sys.stdout', new_callable=StringIO)
     def test_display(self, stdout):
@@ -285,6 +302,112 @@ class TestNumberedPoints(TestCase):
         )
 
 
+class TestProcessRequest(TestCase):
+    def test_command(self):
+        request = {'command': 'distance', 'locations': ['Home', '52.168;0.040']}
+        expect(process_request(request, {'Home': (52.015, -0.221)})) == \
+            {'output': ['Location Home to 2 is 24 kilometres']}
+
+    def test_options(self):
+        request = {'command': 'bearing', 'locations': ['52.015;-0.221',
+                                                       '52.168;0.040'],
+                   'string': True, 'verbose': False}
+        expect(process_request(request)) == {'output': ['North-east']}
+
+    def test_defaults(self):
+        request = {'command': 'distance', 'locations': ['52.015;-0.221',
+                                                        '52.168;0.040']}
+        expect(process_request(request, defaults={'units': 'sm'})) == \
+            {'output': ['Location 1 to 2 is 15 miles']}
+
+    def test_errors(self):
+        expect(process_request({'command': 'unknown'})) == \
+            {'error': "Unknown command 'unknown'"}
+        expect(process_request(['distance'])) == \
+            {'error': "Invalid request ['distance']"}
+        expect(process_request({'command': 'distance',
+                                'locations': ['52.015;-0.221']})) == \
+            {'error': 'More than one location is required'}
+        expect(process_request({'command': 'display',
+                                'locations': ['invalid']})) == \
+            {'error': "Location parsing failure in location 0 'invalid'."}
+
+    def test_invalid_options(self):
+        locations = ['52.015;-0.221', '52.168;0.040']
+        expect(process_request({'command': 'distance', 'locations': locations,
+                                'units': 'xx'})) == \
+            {'error': "Invalid units 'xx', choose from km, sm, nm"}
+        expect(process_request({'command': 'display', 'locations': locations,
+                                'format': 'bogus'})) == \
+            {'error': "Invalid format 'bogus', choose from dms, dm, dd, "
+                      'locator'}
+        expect(process_request({'command': 'bearing', 'locations': locations,
+                                'string': 'yes'})) == \
+            {'error': "Invalid string 'yes', expected a boolean"}
+        expect(process_request({'command': 'range', 'locations': locations,
+                                'distance': '20'})) == \
+            {'error': "Invalid distance '20', expected a number"}
+        expect(process_request({'command': 'distance',
+                                'locations': '52.015;-0.221'})) == \
+            {'error': "Invalid locations '52.015;-0.221', expected a list of "
+                      'strings'}
+        expect(process_request({'command': 'destination',
+                                'locations': locations, 'distance': 20})) == \
+            {'error': "Missing required option 'bearing' for destination"}
+        expect(process_request({'command': 'range',
+                                'locations': locations})) == \
+            {'error': "Missing required option 'distance' for range"}
+
+    def test_concurrent_output(self):
+        request = {'command': 'distance', 'locations': ['52.015;-0.221',
+                                                        '52.168;0.040'],
+                   'verbose': False}
+        expected = process_request(request)
+        results = []
+
+        def worker():
+            for _ in range(20):
+                results.append(process_request(request))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expect(len(results)) == 80
+        expect(len(expected['output'])) == 1
+        expect(all(result == expected for result in results)) == True
+
+
+class TestEdistServer(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'edist.sock')
+        self.server = EdistServer(self.path, {'Home': (52.015, -0.221)},
+                                  {'verbose': False})
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def test_request(self):
+        client = EdistClient(self.path)
+        try:
+            expect(client.request('display', ['Home'], format='locator',
+                                  locator='extsquare')) == ['IO92va33']
+            expect(client.request('range', ['Home', '52.168;0.040'],
+                                  distance=30)) == ['True']
+            with expect.raises(RuntimeError,
+                               'More than one location is required'):
+                client.request('distance', ['Home'])
+        finally:
+            client.close()
+
+
 def test_read_csv():
     locations, names = read_csv(open('tests/data/gpsbabel'))
     expect(sorted(locations.items())) == \
@@ -0,0 +1,128 @@
+#
+# coding=utf-8
+"""test_geofence - Test geofence support"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from unittest import TestCase
+
+from expecter import expect
+
+from upoints.geofence import (GeofenceSet, Polygon)
+from upoints.point import Point
+
+
+class TestPolygon(TestCase):
+    def setUp(self):
+        self.square = Polygon([Point(52.0, -0.3), Point(52.0, -0.1),
+                               Point(52.1, -0.1), Point(52.1, -0.3),
+                               Point(52.0, -0.3)])
+
+    def test___init__(self):
+        expect(len(self.square.vertices)) == 4
+        expect(self.square.spherical) == False
+        with expect.raises(ValueError):
+            Polygon([Point(0, 0), Point(0, 1), Point(0, 0)])
+
+    def test_contains(self):
+        expect(Point(52.015, -0.221) in self.square) == True
+        expect(Point(52.168, 0.040) in self.square) == False
+        expect(self.square.contains(52.05, -0.31)) == False
+
+    def test_concave(self):
+        shape = Polygon([Point(0, 0), Point(0, 0.4), Point(0.2, 0.2),
+                         Point(0.4, 0.4), Point(0.4, 0)])
+        expect(shape.contains(0.1, 0.2)) == True
+        expect(shape.contains(0.3, 0.2)) == True
+        expect(shape.contains(0.2, 0.35)) == False
+
+    def test_spherical(self):
+        triangle = Polygon([Point(0, 0), Point(0, 40), Point(40, 20)])
+        expect(triangle.spherical) == True
+        expect(triangle.contains(10, 20)) == True
+        expect(triangle.contains(45, 20)) == False
+        expect(triangle.contains(-1, 20)) == False
+
+    def test_holes(self):
+        hole = [Point(52.04, -0.24), Point(52.04, -0.16),
+                Point(52.06, -0.16), Point(52.06, -0.24)]
+        shape = Polygon(self.square.vertices, holes=[hole])
+        expect(len(shape.holes)) == 1
+        expect(shape.contains(52.015, -0.221)) == True
+        expect(shape.contains(52.05, -0.2)) == False
+        triangle = Polygon([Point(0, 0), Point(0, 40), Point(40, 20)],
+                           holes=[[Point(5, 15), Point(5, 25),
+                                   Point(15, 20)]])
+        expect(triangle.contains(20, 20)) == True
+        expect(triangle.contains(8, 20)) == False
+        with expect.raises(ValueError):
+            Polygon(self.square.vertices, holes=[hole[:2]])
+
+    def test_antimeridian(self):
+        shape = Polygon([Point(-0.5, 179.5), Point(-0.5, -179.5),
+                         Point(0.5, -179.5), Point(0.5, 179.5)])
+        expect(shape.spherical) == False
+        expect(shape.contains(0, 180)) == True
+        expect(shape.contains(0, -179.8)) == True
+        expect(shape.contains(0, 0)) == False
+
+    def test_pole(self):
+        cap = Polygon([Point(80, 0), Point(80, 90), Point(80, 180),
+                       Point(80, -90)])
+        expect(cap.all_longitudes) == True
+        expect(cap.contains(89, 45)) == True
+        expect(cap.contains(70, 45)) == False
+
+    def test_from_kml_coordinates(self):
+        shape = Polygon.from_kml_coordinates(
+            '-0.3,52.0,0 -0.1,52.0,0 -0.1,52.1,0 -0.3,52.1,0 -0.3,52.0,0',
+            'home')
+        expect(shape.name) == 'home'
+        expect(Point(52.015, -0.221) in shape) == True
+
+
+class TestGeofenceSet(TestCase):
+    def setUp(self):
+        self.fences = GeofenceSet({
+            'home': [Point(52.0, -0.3), Point(52.0, -0.1), Point(52.1, -0.1),
+                     Point(52.1, -0.3)],
+            'county': [Point(51.8, -0.8), Point(51.8, 0.2), Point(52.2, 0.2),
+                       Point(52.2, -0.8)],
+        })
+
+    def test_fences(self):
+        expect(sorted(self.fences.fences(52.015, -0.221))) == \
+            ['county', 'home']
+        expect(self.fences.fences(52.168, 0.040)) == ['county']
+        expect(self.fences.fences(52.855, 0.657)) == []
+        expect(self.fences.fences(-52.015, 0.221)) == []
+
+    def test_contains(self):
+        result = list(self.fences.contains([Point(52.015, -0.221),
+                                            Point(52.15, 0.1),
+                                            Point(0, 0)]))
+        expect([sorted(x) for x in result]) == \
+            [['county', 'home'], ['county'], []]
+
+    def test_update(self):
+        self.fences.fences(52.015, -0.221)
+        del self.fences['county']
+        expect(self.fences.fences(52.015, -0.221)) == ['home']
+        self.fences['all'] = Polygon([Point(-80, -179), Point(-80, 179),
+                                      Point(80, 179), Point(80, -179)],
+                                     spherical=False)
+        expect(self.fences.fences(0, 0)) == []
+        expect(self.fences.fences(0, 179.5)) == ['all']
@@ -23,7 +23,8 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.geonames import (Location, Locations)
+from upoints.geonames import (Location, Locations, NameIndex, fold_name,
+                              get_timezone, iter_locations)
 from upoints.utils import FileFormatError
 
 
@@ -62,6 +63,9 @@ class TestLocations(TestCase):
             'Wyre (Viera - N59.117°; W002.967°)'
         expect(str(locations[2])) == \
             'Wraysbury (Wyrardisbury - N51.450°; W000.550°)'
+        expect(locations[2].tzname) == 'Europe/London'
+        expect(locations[0].timezone is locations[2].timezone) == True
+        expect(locations[2].timezone is get_timezone('Europe/London')) == True
 
         with expect.raises(FileFormatError,
                            "Incorrect data format, if you're using a file "
@@ -85,3 +89,71 @@ class TestLocations(TestCase):
                            'downloaded from geonames.org please report this '
                            'to James Rowe <jnrowe@gmail.com>'):
             Locations(None, open('tests/data/geonames_timezones_broken'))
+
+
+def test_get_timezone():
+    expect(get_timezone('Europe/London') is get_timezone('Europe/London')) \
+        == True
+    expect(get_timezone('Nowhere/Special')) == None
+    expect(get_timezone(None)) == None
+
+
+class TestNameIndex(TestCase):
+    def setUp(self):
+        def location(geonameid, name, alt_names, population, country):
+            return Location(geonameid, name, fold_name(name), alt_names,
+                            52.0, 0.0, 'P', 'PPL', country, None, None, None,
+                            None, None, population, None, None,
+                            'Europe/London', datetime.date(2007, 6, 15), 0)
+        self.index = NameIndex([
+            location(1, u'Z\xfcrich', ['Zurigo'], 400000, 'CH'),
+            location(2, 'Zug', None, 30000, 'CH'),
+            location(3, 'Zurich', None, None, 'US'),
+            location(4, 'London', ['Londres', 'Lundenwic'], 8000000, 'GB'),
+            location(5, 'London', None, 400000, 'CA'),
+        ])
+
+    def test_lookup(self):
+        expect([i.geonameid for i in self.index.lookup('LONDON')]) == [4, 5]
+        expect([i.geonameid for i in self.index.lookup('zurich')]) == [1, 3]
+        expect([i.geonameid for i in self.index.lookup('zurigo')]) == [1]
+        expect(self.index.lookup('Luton')) == []
+
+    def test_search(self):
+        expect([i.geonameid for i in self.index.search('zu')]) == [1, 2, 3]
+        expect([i.geonameid for i in self.index.search(u'Z\xdcR')]) == [1, 3]
+        expect([i.geonameid for i in self.index.search('zu', 'US')]) == [3]
+        expect([i.geonameid for i in self.index.search('l', limit=1)]) == [4]
+        expect([i.geonameid for i in self.index.search('')]) == \
+            [4, 5, 1, 2, 3]
+        expect(self.index.search('zu', feature_class='T')) == []
+
+    def test_large_population(self):
+        earth = Location(6295630, 'Earth', 'Earth', None, 0.0, 0.0, 'L',
+                         'AREA', None, None, None, None, None, None,
+                         6814400000, None, None, None,
+                         datetime.date(2012, 8, 27), 0)
+        index = NameIndex(self.index.locations + [earth])
+        expect([i.geonameid for i in index.search('')]) == [6295630, 4, 5, 1,
+                                                             2, 3]
+
+    def test_import_locations(self):
+        index = NameIndex(Locations(open('tests/data/geonames')))
+        expect([i.name for i in index.search('wyr')]) == \
+            ['Wraysbury', 'Afon Wyre', 'Wyre']
+
+
+def test_fold_name():
+    expect(fold_name(u'Z\xfcrich')) == 'zurich'
+    expect(fold_name(u'\xc5lesund')) == 'alesund'
+    expect(fold_name('Afon Wyre')) == 'afon wyre'
+
+
+def test_iter_locations():
+    locations = iter_locations(open('tests/data/geonames'),
+                               bbox=(50, -5, 55, 0))
+    expect([location.name for location in locations]) == \
+        ['Afon Wyre', 'Wraysbury']
+    locations = iter_locations(open('tests/data/geonames'),
+                               predicate=lambda r: r['feature_class'] == 'T')
+    expect([location.name for location in locations]) == ['Wyre']
@@ -85,6 +85,33 @@ class TestWaypoints(TestCase):
         expect(data[1]) == \
             """MSR (52°10'01"N, 000°23'24"E on 2008-07-27T00:00:00+00:00) [Microsoft Research, Cambridge]"""
 
+    def test_import_locations_tracks(self):
+        trackpoints = Trackpoints([
+            '<gpx xmlns="http://www.topografix.com/GPX/1/1">',
+            '<trk><trkseg><trkpt lat="52" lon="0"><ele>4</ele></trkpt>',
+            '</trkseg><trkseg/></trk>',
+            '<trk><trkseg><trkpt lat="53" lon="1"/></trkseg></trk>',
+            '</gpx>',
+        ])
+        expect([len(segment) for segment in trackpoints]) == [1, 0, 1]
+        expect(trackpoints[0][0].elevation) == 4
+        expect(trackpoints[2][0].latitude) == 53
+
+    def test_bounds_antimeridian(self):
+        trackpoints = Trackpoints([
+            '<gpx xmlns="http://www.topografix.com/GPX/1/1">',
+            '<trk><trkseg><trkpt lat="0" lon="-170"/><trkpt lat="1" lon="0"/>',
+            '<trkpt lat="2" lon="170"/></trkseg></trk>',
+            '</gpx>',
+        ])
+        bounds = trackpoints.bounds
+        expect((bounds.west, bounds.east)) == (170, 0)
+        expect(trackpoints[0][0] in bounds) == True
+        export = trackpoints.export_gpx_file()
+        element = export.find('.//{http://www.topografix.com/GPX/1/1}bounds')
+        expect((element.get('minlon'), element.get('maxlon'))) == \
+            ('170.0', '0.0')
+
     def test_export_gpx_file(self):
         locations = Waypoints(open('tests/data/gpx'))
         export = locations.export_gpx_file()
@@ -120,6 +147,17 @@ class TestTrackpoints(TestCase):
         for e1, e2 in zip(export.getiterator(), tracks_xml.getiterator()):
             xml_compare(e1, e2)
 
+    def test_track_stats(self):
+        locations = Trackpoints(open('tests/data/gpx_tracks'))
+        locations[0][0].elevation = 60
+        locations[0][1].elevation = 20
+        stats = list(locations.track_stats())
+        expect(len(stats)) == 1
+        expect(stats[0]['duration']) == [86400]
+        expect(stats[0]['elevation']) == [-40]
+        expect(stats[0]['elevation_gain']) == 0
+        expect(stats[0]['elevation_loss']) == 40
+
 
 
 class TestRoutepoint(TestCase):
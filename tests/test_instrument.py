@@ -0,0 +1,105 @@
+#
+# coding=utf-8
+"""test_instrument - Test instrumentation support"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from unittest import TestCase
+
+from expecter import expect
+
+from upoints import instrument
+from upoints.cellid import Cells
+from upoints.gpx import Trackpoints
+from upoints.instrument import Registry
+from upoints.nmea import Locations
+from upoints.trigpoints import Trigpoints
+
+
+class TestRegistry(TestCase):
+    def test_disabled(self):
+        registry = Registry()
+        registry.count('rows_parsed', 5, 'test')
+        with registry.timer('import', 'test'):
+            pass
+        expect(registry.as_dict()) == {'counters': {}, 'timers': {}}
+
+    def test_as_dict(self):
+        registry = Registry()
+        registry.enable()
+        registry.count('rows_parsed', 5, 'test')
+        registry.count('rows_parsed', source='test')
+        registry.add_time('import', 0.5, 'test')
+        registry.add_time('import', 0.25, 'test')
+        expect(registry.as_dict()) == {
+            'counters': {'test.rows_parsed': 6},
+            'timers': {'test.import': {'count': 2, 'seconds': 0.75}},
+        }
+        registry.reset()
+        expect(registry.as_dict()) == {'counters': {}, 'timers': {}}
+
+    def test_prometheus(self):
+        registry = Registry()
+        registry.enable()
+        registry.count('rows_parsed', 5, 'nmea')
+        registry.count('rows_parsed', 2, 'gpx')
+        registry.add_time('import', 0.5, 'nmea')
+        expect(registry.prometheus().splitlines()) == [
+            '# TYPE upoints_rows_parsed_total counter',
+            'upoints_rows_parsed_total{source="gpx"} 2',
+            'upoints_rows_parsed_total{source="nmea"} 5',
+            '# TYPE upoints_import_seconds summary',
+            'upoints_import_seconds_count{source="nmea"} 1',
+            'upoints_import_seconds_sum{source="nmea"} 0.5',
+        ]
+
+
+class TestImporters(TestCase):
+    def setUp(self):
+        instrument.reset()
+        instrument.enable()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_csv(self):
+        Trigpoints(open('tests/data/trigpoints'))
+        data = instrument.as_dict()
+        expect(data['counters']['trigpoints.rows_parsed']) == 3
+        expect(data['counters']['trigpoints.rows_skipped']) == 4
+        expect(data['counters']['trigpoints.bytes_read']) > 0
+        expect(data['timers']['trigpoints.import']['count']) == 1
+
+    def test_cellid(self):
+        Cells(open('tests/data/cells'))
+        data = instrument.as_dict()
+        expect(data['counters']['cellid.rows_parsed']) == 3
+        expect(data['timers']['cellid.import']['count']) == 1
+
+    def test_xml(self):
+        Trackpoints(open('tests/data/gpx_tracks'))
+        data = instrument.as_dict()
+        expect(data['counters']['gpx.rows_parsed']) == 2
+        expect(data['counters']['gpx.bytes_read']) > 0
+        expect(data['timers']).contains('gpx.parse')
+
+    def test_checksum_failures(self):
+        with expect.raises(ValueError):
+            Locations(['$GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,'
+                       '1374.6,M,34.5,M,,*00'])
+        expect(instrument.as_dict()['counters']['nmea.checksum_failures']) \
+            == 1
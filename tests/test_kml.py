@@ -17,11 +17,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from io import BytesIO
 from unittest import TestCase
 
 from expecter import expect
 
-from upoints.kml import (Placemark, Placemarks, etree)
+from upoints.kml import (LineString, MultiGeometry, Placemark, Placemarks,
+                         Polygon, etree)
 
 from tests.utils import xml_compare
 
@@ -72,9 +74,80 @@ class TestPlacemarks(TestCase):
         expect(str(locations['Home'])) == \
             """Home (52°00'54"N, 000°13'15"W alt 60m)"""
 
+    def test_import_locations_shapes(self):
+        locations = Placemarks(open('tests/data/kml_shapes'))
+        expect(len(locations)) == 0
+        expect(sorted(locations.shapes)) == ['Both', 'Field', 'Route']
+        route = locations.shapes['Route']
+        expect(route).isinstance(LineString)
+        expect(len(route)) == 3
+        expect(route[0].altitude) == 60
+        expect(route.description) == 'Home to Cambridge'
+        field = locations.shapes['Field']
+        expect(field).isinstance(Polygon)
+        expect(len(field.outer)) == 5
+        expect(len(field.inner)) == 1
+        expect(field.to_geofence().contains(52.08, -0.2)) == True
+        # Inside the hole
+        expect(field.to_geofence().contains(52.03, -0.21)) == False
+        with expect.raises(ValueError, 'Polygon has no outer boundary'):
+            Polygon().to_geofence()
+        both = locations.shapes['Both']
+        expect(both).isinstance(MultiGeometry)
+        expect(both[0].longitude) == 0.39
+        expect(len(both[1])) == 2
+
+    def test_import_locations_chunks(self):
+        text = open('tests/data/kml_shapes').read()
+        locations = Placemarks([text[i:i + 7]
+                                for i in range(0, len(text), 7)])
+        expect(locations.shapes['Route'][1].latitude) == 52.167
+        with expect.raises(ValueError):
+            Placemarks(['<kml><Document><Placemark><Point>',
+                        '<coordinates>1,2,3,4</coordinates>',
+                        '</Point></Placemark></Document></kml>'])
+
+    def test_write_kml(self):
+        locations = Placemarks(open('tests/data/kml_shapes'))
+        locations.update(Placemarks(open('tests/data/kml')))
+        output = BytesIO()
+        locations.write_kml(output, chunk_size=2)
+        imported = Placemarks([output.getvalue()])
+        expect(sorted(imported)) == ['Cambridge', 'Home']
+        expect(imported['Home'].altitude) == 60
+        expect(imported.shapes['Route']) == locations.shapes['Route']
+        expect(imported.shapes['Route'].description) == 'Home to Cambridge'
+        expect(imported.shapes['Field'].inner) == \
+            locations.shapes['Field'].inner
+        expect(len(imported.shapes['Both'])) == 2
+
     def test_export_kml_file(self):
         locations = Placemarks(open('tests/data/kml'))
         export = locations.export_kml_file()
         kml_xml = etree.parse('tests/data/kml')
         for e1, e2 in zip(export.getiterator(), kml_xml.getiterator()):
             xml_compare(e1, e2)
+
+    def test_export_kml_file_shapes(self):
+        locations = Placemarks(open('tests/data/kml_shapes'))
+        export = etree.tostring(locations.export_kml_file())
+        imported = Placemarks([export])
+        expect(sorted(imported.shapes)) == ['Both', 'Field', 'Route']
+        expect(imported.shapes['Route']) == locations.shapes['Route']
+        expect(imported.shapes['Route'].description) == 'Home to Cambridge'
+        expect(imported.shapes['Field'].outer) == \
+            locations.shapes['Field'].outer
+        expect(imported.shapes['Field'].inner) == \
+            locations.shapes['Field'].inner
+        expect(imported.shapes['Both']) == locations.shapes['Both']
+
+    def test_import_locations_bare_ring(self):
+        locations = Placemarks([
+            '<kml><Document><Placemark><name>Ring</name><LinearRing>',
+            '<coordinates>0,52 1,52 1,53 0,52</coordinates>',
+            '</LinearRing></Placemark></Document></kml>'
+        ])
+        ring = locations.shapes['Ring']
+        expect(ring).isinstance(LineString)
+        expect(len(ring)) == 4
+        expect(ring[0]) == ring[-1]
@@ -23,9 +23,13 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.nmea import (Fix, Locations, LoranPosition, Position, Waypoint,
-                          calc_checksum, nmea_latitude, nmea_longitude,
-                          parse_latitude, parse_longitude)
+from upoints.nmea import (ActiveSatellites, CourseSpeed, Fix, Heading,
+                          Locations, LoranPosition, Position, TimeDate,
+                          Waypoint, calc_checksum, compile_decoder,
+                          iter_locations, merge_columns, merge_epochs,
+                          nmea_latitude, nmea_longitude, parse_latitude,
+                          parse_longitude, parse_sentence, parse_time,
+                          valid_sentences)
 
 
 def test_calc_checksum():
@@ -33,6 +37,67 @@ def test_calc_checksum():
     expect(calc_checksum('GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,*6B')) == 107
     expect(calc_checksum('$GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,')) == 107
     expect(calc_checksum('GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,')) == 107
+    expect(calc_checksum(b'$GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,*6B')) == 107
+    expect(calc_checksum(memoryview(b'$GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,*6B'))) == 107
+    expect(calc_checksum(b'GPWPL,5200.9000,N,00013.2600,W,HOME,' * 301)) == \
+        calc_checksum('GPWPL,5200.9000,N,00013.2600,W,HOME,')
+
+
+def test_valid_sentences():
+    sentences = [
+        '$GPGSV,6,6,21,32,65,170,35*00',
+        '$GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,*6B',
+        '$GPWPL,5200.9000,N,00013.2600,W,HOME*5E',
+    ]
+    expect(list(valid_sentences(sentences, ['GPGGA', 'GPWPL']))) == \
+        ['GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,',
+         'GPWPL,5200.9000,N,00013.2600,W,HOME']
+    expect(list(valid_sentences([x.encode() for x in sentences[1:]]))) == \
+        [b'GPGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,',
+         b'GPWPL,5200.9000,N,00013.2600,W,HOME']
+    with expect.raises(ValueError):
+        list(valid_sentences(sentences))
+    expect(len(list(valid_sentences(sentences, checksum=False)))) == 3
+    with expect.raises(ValueError):
+        list(valid_sentences(['$GPWPL,5200.9000,N,00013.2600,W,HOME']))
+
+
+def test_parse_time():
+    expect(parse_time('142058')) == datetime.time(14, 20, 58)
+    expect(parse_time('201530.25')) == datetime.time(20, 15, 30, 250000)
+
+
+def test_compile_decoder():
+    decode = compile_decoder('Test', (('first', int), ('unit', None),
+                                      ('values', float, 3)))
+    expect(decode(['GPTST', '4', 'M', '1.5', '', '2'])) == \
+        decode.record('GP', 4, [1.5, 2.0])
+    expect(decode(['GPTST', ''])) == decode.record('GP', None, [])
+
+
+def test_parse_sentence():
+    gsa = parse_sentence('$GNGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*27')
+    expect(gsa) == ActiveSatellites.record('GN', 'A', 3, [4, 5, 9, 12, 24],
+                                           2.5, 1.3, 2.1)
+    gsv = parse_sentence('$GLGSV,3,3,09,03,03,111,00*5D')
+    expect(gsv.talker) == 'GL'
+    expect(gsv.satellites) == [(3, 3, 111, 0)]
+    gsv = parse_sentence('$GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,'
+                         '00,13,06,292,00*74')
+    expect(len(gsv.satellites)) == 4
+    expect(gsv.satellites[3]) == (13, 6, 292, 0)
+    vtg = parse_sentence('$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48')
+    expect(vtg) == CourseSpeed.record('GP', 54.7, 34.4, 5.5, 10.2, None)
+    zda = parse_sentence('$GPZDA,201530.00,04,07,2002,00,00*60')
+    expect(zda) == TimeDate.record('GP', datetime.time(20, 15, 30), 4, 7,
+                                   2002, 0, 0)
+    hdt = parse_sentence('$GPHDT,274.07,T*03')
+    expect(hdt) == Heading.record('GP', 274.07)
+    fix = parse_sentence('$GNGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,'
+                         '1374.6,M,34.5,M,,*75')
+    expect(isinstance(fix, Fix)) == True
+    with expect.raises(ValueError):
+        parse_sentence('$GPXXX,1*52')
 
 
 def test_nmea_latitude():
@@ -175,6 +240,23 @@ class TestWaypoint(TestCase):
 
 
 class TestLocations(TestCase):
+    def test_import_locations_types(self):
+        locations = Locations()
+        locations.import_locations(open('tests/data/gpsdata'),
+                                   types=('GSV', 'WPL'))
+        expect(len(locations)) == 8
+        expect(locations[0].satellites) == [(32, 65, 170, 35)]
+        with expect.raises(ValueError):
+            locations.import_locations(open('tests/data/gpsdata'),
+                                       types=('XXX', ))
+
+    def test_import_locations_talkers(self):
+        locations = Locations([
+            '$GNGGA,142058,5308.6414,N,00300.9257,W,1,04,5.6,1374.6,M,34.5,M,,*75',
+            '$GPWPL,5200.9000,N,00013.2600,W,HOME*5E',
+        ])
+        expect(len(locations)) == 2
+
     def test_import_locations(self):
         locations = Locations(open('tests/data/gpsdata'))
         data = list(map(str, locations))
@@ -188,3 +270,55 @@ class TestLocations(TestCase):
             '$GPGGA,142100,5200.9000,N,00316.6600,W,1,04,5.6,1000.0,M,34.5,M,,*68\r'
         expect(data[4]) == \
             '$GPRMC,142100,A,5200.9000,N,00316.6600,W,123142.7,188.1,191107,5,E,A*21\r'
+
+    def test_track(self):
+        track = Locations(open('tests/data/gpsdata')).track()
+        expect(len(track)) == 2
+        expect(track[0].time) == datetime.datetime(2007, 11, 19, 14, 20, 58)
+        expect(track[0].speed) == 109394.7
+        expect(track[0].altitude) == 1374.6
+        expect(track[1].satellites) == 4
+
+
+def test_merge_epochs():
+    def fix(hour, minute, quality=1):
+        return Fix(datetime.time(hour, minute), 52.0, -0.3, quality, 4, 1.2,
+                   10.0, 45.0)
+
+    def position(hour, minute, day):
+        return Position(datetime.time(hour, minute), True, 52.1, -0.2, 5.0,
+                        90.0, datetime.date(2007, 11, day), None)
+
+    records = list(merge_epochs([
+        fix(23, 58), fix(23, 59), position(23, 59, 19), fix(0, 0, 0),
+        fix(0, 1),
+    ]))
+    expect([i.time for i in records]) == [
+        datetime.datetime(2007, 11, 19, 23, 58),
+        datetime.datetime(2007, 11, 19, 23, 59),
+        datetime.datetime(2007, 11, 20, 0, 1),
+    ]
+    expect(records[0].speed) == None
+    expect(records[1].latitude) == 52.0
+    expect(records[1].speed) == 5.0
+    expect(records[2].dilution) == 1.2
+    records = list(merge_epochs([fix(23, 59), position(0, 0, 20)]))
+    expect(records[0].time) == datetime.datetime(2007, 11, 19, 23, 59)
+    expect(list(merge_epochs([fix(12, 0)]))[0].time) == None
+
+
+def test_merge_columns():
+    columns = merge_columns(Locations(open('tests/data/gpsdata')))
+    expect(list(columns['altitude']['data'])) == [1374.6, 1000.0]
+    expect(columns['time']['data'][1]) == \
+        datetime.datetime(2007, 11, 19, 14, 21)
+    expect(columns['units']['dictionary']) == ['metric']
+
+
+def test_iter_locations():
+    locations = iter_locations(open('tests/data/gpsdata'),
+                               bbox=(53, -4, 54, -3))
+    expect([type(location) for location in locations]) == [Fix, Position]
+    locations = iter_locations(open('tests/data/gpsdata'),
+                               predicate=lambda r: isinstance(r, Waypoint))
+    expect([location.name for location in locations]) == ['HOME']
@@ -17,12 +17,27 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import os
+import shutil
+import tempfile
+import threading
+import time
+
 from unittest import TestCase
 
+try:
+    from http.server import (BaseHTTPRequestHandler, HTTPServer)
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import (BaseHTTPRequestHandler, HTTPServer)
+    from SocketServer import ThreadingMixIn
+
 from expecter import expect
 
 from upoints import (point, utils)
-from upoints.osm import (Node, Osm, Way, etree, get_area_url)
+from upoints.osm import (AreaFetcher, Node, Osm, TileCache, Way, area_tiles,
+                         etree, get_area_url, merge_osm, tile_bounds,
+                         tile_index)
 
 from tests.utils import (xml_compare, xml_str_compare)
 
@@ -145,6 +160,14 @@ class TestWay(TestCase):
             '<way id="0" visible="false"><tag k="key" v="value"/><nd ref="0"/><nd ref="1"/><nd ref="2"/></way>',
             etree.tostring(self.tagged.toosm()))
 
+    def test_geometry(self):
+        region = Osm(open('tests/data/osm'))
+        way = [x for x in region if isinstance(x, Way)][0]
+        expect([node.ident for node in way.geometry(region)]) == [0, 1, 2]
+        with expect.raises(KeyError):
+            way.geometry({})
+
+
 class TestOsm(TestCase):
     def setUp(self):
         self.region = Osm(open('tests/data/osm'))
@@ -162,6 +185,14 @@ class TestOsm(TestCase):
             ("""Node 2 (52°00'56"N, 000°13'18"W) [visible, user: jnrowe, """
              'timestamp: 2008-01-25T12:52:30+00:00, amenity: pub]')
 
+    def test_to_columns(self):
+        columns = self.region.to_columns()
+        expect(list(columns['ident']['data'])) == [0, 1, 2]
+        expect(list(columns['user']['mask'])) == [1, 0, 1]
+        nodes = Osm.from_columns(columns)
+        expect(list(map(str, nodes))) == \
+            list(map(str, [x for x in self.region if isinstance(x, Node)]))
+
     def test_export_osm_file(self):
         export = self.region.export_osm_file()
         osm_xml = etree.parse('tests/data/osm')
@@ -170,3 +201,135 @@ class TestOsm(TestCase):
             # expect(e1.tag) == e2.tag
             # expect(e1.text) == e2.text
             # expect(e1.attrib) == e2.attrib
+
+
+def test_tile_index():
+    expect(tile_index(52.015, -0.221, 14)) == (8181, 5410)
+    expect(tile_index(90, 180, 2)) == (3, 0)
+    expect(tile_index(-90, -180, 2)) == (0, 3)
+
+
+def test_tile_bounds():
+    bounds = tile_bounds(0, 0, 0)
+    expect(bounds.west) == -180
+    expect(bounds.east) == 180
+    expect(round(bounds.north, 6)) == 85.051129
+    bounds = tile_bounds(14, 8181, 5410)
+    expect(point.Point(52.015, -0.221) in bounds) == True
+
+
+def test_area_tiles():
+    bounds = point.Bounds([point.Point(52.015, -0.221)])
+    expect(area_tiles(bounds, 14)) == [(14, 8181, 5410)]
+    bounds = point.Bounds([point.Point(1, 179.9), point.Point(-1, -179.9)])
+    expect(sorted(area_tiles(bounds, 1))) == [(1, 0, 0), (1, 0, 1),
+                                              (1, 1, 0), (1, 1, 1)]
+
+
+def test_merge_osm():
+    region = Osm(open('tests/data/osm'))
+    merged = merge_osm([region, region])
+    expect(len(merged)) == len(region)
+
+
+class TestTileCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_put(self):
+        cache = TileCache(self.directory)
+        expect(cache.get('tile')) == None
+        cache.put('tile', b'data')
+        expect(cache.get('tile')) == b'data'
+        cache.clear()
+        expect(cache.get('tile')) == None
+
+    def test_expiry(self):
+        cache = TileCache(self.directory, ttl=60)
+        cache.put('tile', b'data')
+        old = time.time() - 120
+        os.utime(os.path.join(self.directory, 'tile.osm'), (old, old))
+        expect(cache.get('tile')) == None
+
+    def test_eviction(self):
+        cache = TileCache(self.directory, max_size=10)
+        cache.put('old', b'12345678')
+        old = time.time() - 30
+        os.utime(os.path.join(self.directory, 'old.osm'), (old, old))
+        cache.put('new', b'12345678')
+        expect(cache.get('old')) == None
+        expect(cache.get('new')) == b'12345678'
+
+
+class _OsmHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        with open('tests/data/osm', 'rb') as osm_file:
+            data = osm_file.read()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _OsmServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TestAreaFetcher(TestCase):
+    def setUp(self):
+        self.server = _OsmServer(('127.0.0.1', 0), _OsmHandler)
+        self.server.paths = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/api/0.5/map' % self.server.server_port
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def test_fetch(self):
+        fetcher = AreaFetcher(self.url, zoom=14)
+        region = fetcher.fetch(point.Point(52.015, -0.221), 0.5)
+        fetcher.close()
+        expect(len(self.server.paths)) == 4
+        expect(self.server.paths[0][:18]) == '/api/0.5/map?bbox='
+        expect(len(region)) == len(Osm(open('tests/data/osm')))
+
+    def test_fetch_many(self):
+        fetcher = AreaFetcher(self.url, zoom=14)
+        regions = fetcher.fetch_many([(point.Point(52.015, -0.221), 0.5),
+                                      (point.Point(52.016, -0.222), 0.5)])
+        fetcher.close()
+        expect(len(regions)) == 2
+        expect(len(self.server.paths)) == 4
+
+    def test_cache(self):
+        fetcher = AreaFetcher(self.url, cache=TileCache(self.directory))
+        fetcher.fetch(point.Point(52.015, -0.221), 0.5)
+        fetcher.fetch(point.Point(52.015, -0.221), 0.5)
+        fetcher.close()
+        expect(len(self.server.paths)) == 4
+
+    def test_max_tiles(self):
+        fetcher = AreaFetcher(self.url, max_tiles=2)
+        with expect.raises(ValueError):
+            fetcher.fetch(point.Point(52.015, -0.221), 0.5)
+        expect(self.server.paths) == []
+
+    def test_node_fetch_area_osm(self):
+        fetcher = AreaFetcher(self.url)
+        region = Node(0, 52.015, -0.221).fetch_area_osm(0.5, fetcher)
+        fetcher.close()
+        expect(len(region)) == len(Osm(open('tests/data/osm')))
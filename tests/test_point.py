@@ -25,7 +25,8 @@ from unittest import TestCase
 from expecter import expect
 
 from upoints import utils
-from upoints.point import (KeyedPoints, Point, Points, TimedPoint, TimedPoints)
+from upoints.point import (Bounds, Corridor, KeyedPoints, Point, Points,
+                           TimedPoint, TimedPoints)
 
 
 class TestPoint(TestCase):
@@ -190,12 +191,124 @@ class TestPoint(TestCase):
         expect(Point(33.9400, -118.4000).sun_events(date)) == \
             (datetime.time(12, 41), datetime.time(3, 6))
 
+    def test_sun_events_timezone(self):
+        class Summer(datetime.tzinfo):
+            def utcoffset(self, dt):
+                return datetime.timedelta(hours=4 <= dt.month <= 10)
+
+            def dst(self, dt):
+                return self.utcoffset(dt)
+        home = Point(52.015, -0.221, timezone=Summer())
+        expect(home.sun_events(datetime.date(2007, 6, 15))) == \
+            (datetime.time(4, 40), datetime.time(21, 22))
+        expect(home.sun_events(datetime.date(2007, 12, 15))) == \
+            Point(52.015, -0.221).sun_events(datetime.date(2007, 12, 15))
+        expect(Point(52.015, -0.221, timezone=utils.TzOffset('+01:00'))
+               .sun_events(datetime.date(2007, 6, 15))) == \
+            Point(52.015, -0.221, timezone=60) \
+            .sun_events(datetime.date(2007, 6, 15))
+
+    def test_sun_events_series(self):
+        dates = [datetime.date(2007, 6, 15), datetime.date(2007, 12, 15)]
+        for location in (Point(52.015, -0.221),
+                         Point(52.6333, -2.5, timezone=60), Point(80, 0)):
+            expect(location.sun_events_series(dates)) == \
+                [location.sun_events(date) for date in dates]
+
     def test_inverse(self):
         bearing, dist = Point(52.015, -0.221).inverse(Point(52.6333, -2.5))
         expect(int(bearing)) == 294
         expect(int(dist)) == 169
 
 
+class TestBounds(TestCase):
+    def test_add(self):
+        bounds = Bounds()
+        expect(bool(bounds)) == False
+        bounds.add(52.015, -0.221)
+        bounds.add(52.855, 0.657)
+        bounds.add(52.168, 0.040)
+        expect(bounds) == Bounds([Point(52.015, -0.221), Point(52.855, 0.657)])
+        expect(bounds.as_dict()) == \
+            {'minlat': 52.015, 'maxlat': 52.855, 'minlon': -0.221,
+             'maxlon': 0.657}
+
+    def test_antimeridian(self):
+        bounds = Bounds([Point(-17, 178), Point(-18, -179)])
+        expect(bounds.crosses_antimeridian) == True
+        expect((bounds.west, bounds.east)) == (178, -179)
+        expect(bounds.contains(-17.5, 180)) == True
+        expect(bounds.contains(-17.5, 0)) == False
+        bounds.add(-17, 170)
+        expect((bounds.west, bounds.east)) == (170, -179)
+
+    def test_update(self):
+        bounds = Bounds([Point(0, 0)])
+        bounds.update(Bounds([Point(10, 20)]))
+        bounds.update(Bounds())
+        expect(bounds.as_dict()) == \
+            {'minlat': 0, 'maxlat': 10, 'minlon': 0, 'maxlon': 20}
+        expect(Point(5, 5) in bounds) == True
+
+    def test_update_antimeridian(self):
+        segment = Bounds([Point(0, -170), Point(0, 0), Point(0, 170)])
+        expect((segment.west, segment.east)) == (170, 0)
+        bounds = Bounds()
+        bounds.update(segment)
+        expect((bounds.west, bounds.east)) == (170, 0)
+        expect(bounds.contains(0, -170)) == True
+        bounds = Bounds([Point(0, 10)])
+        bounds.update(segment)
+        expect((bounds.west, bounds.east)) == (170, 10)
+        bounds = Bounds([Point(0, 175), Point(0, -175)])
+        bounds.update(Bounds([Point(0, -160)]))
+        expect((bounds.west, bounds.east)) == (175, -160)
+        bounds.update(Bounds([Point(0, 160)]))
+        expect((bounds.west, bounds.east)) == (160, -160)
+        # Ranges that together cover every longitude
+        bounds = Bounds([Point(0, -170), Point(0, 0), Point(0, 170)])
+        bounds.update(Bounds([Point(0, -10), Point(0, 90), Point(0, -170)]))
+        expect((bounds.west, bounds.east)) == (-180, 180)
+
+
+class TestCorridor(TestCase):
+    def setUp(self):
+        self.corridor = Corridor([Point(0, 0), Point(0, 10)], 60)
+
+    def test_contains(self):
+        expect(Point(0.5, 5) in self.corridor) == True
+        expect(Point(1, 5) in self.corridor) == False
+        expect(Point(0, 10.4) in self.corridor) == True
+        expect(Point(0, -1) in self.corridor) == False
+        expect(Point(45, 5) in self.corridor) == False
+
+    def test_distance_to(self):
+        expect('%.3f' % self.corridor.distance_to(Point(0.5, 5))) == '55.563'
+        expect('%.3f' % self.corridor.distance_to(Point(0, 10.4))) == \
+            '44.450'
+        expect(self.corridor.distance_to(Point(1, 5))) == None
+
+    def test_segments(self):
+        corridor = Corridor([[Point(0, 0), Point(0, 1)],
+                             [Point(10, 0), Point(10, 1)]], 20)
+        expect(Point(10.1, 0.5) in corridor) == True
+        expect(Point(5, 0.5) in corridor) == False
+
+    def test_antimeridian(self):
+        corridor = Corridor([Point(0, 179), Point(0, -179)], 30)
+        expect(Point(0.2, 180) in corridor) == True
+        expect(Point(0.2, 0) in corridor) == False
+
+    def test_pole(self):
+        corridor = Corridor([Point(80, 0), Point(80, 180)], 20)
+        expect(Point(89.9, 90) in corridor) == True
+        expect(Point(85, 90) in corridor) == False
+
+    def test_empty(self):
+        with expect.raises(ValueError):
+            Corridor([], 10)
+
+
 class TestPoints(TestCase):
     def setUp(self):
         self.locs = Points(['52.015;-0.221', '52.168;0.040', '52.855;0.657'],
@@ -245,6 +358,54 @@ class TestPoints(TestCase):
         expect(list(self.locs.range(Point(52.015, -0.221), 20))) == \
             [Point(52.015, -0.221, 'metric', 'degrees', 0)]
 
+    def test_within_corridor(self):
+        route = [Point(52, -1), Point(52, 0)]
+        expect(list(self.locs.within_corridor(route, 5))) == \
+            [Point(52.015, -0.221, 'metric', 'degrees', 0)]
+        expect(list(self.locs.within_corridor(Corridor(route, 120), 5))) == \
+            list(self.locs)
+
+    def test_resample(self):
+        samples = self.locs.resample(every_km=25)
+        expect(len(samples)) == 5
+        expect(samples[0]) == self.locs[0]
+        expect(['%.3f' % x for x in samples.distance()][1:3]) == \
+            ['25.000', '25.000']
+        with expect.raises(ValueError):
+            self.locs.resample()
+        with expect.raises(ValueError):
+            self.locs.resample(every_km=0)
+        with expect.raises(NotImplementedError):
+            self.locs.resample(every_seconds=60)
+        single = Points([Point(52.015, -0.221)])
+        expect(single.resample(every_km=25)) == single
+        expect(Points().resample(every_km=25)) == Points()
+
+    def test_cluster(self):
+        locations = Points([Point(52.015, -0.221), Point(52.016, -0.222),
+                            Point(52.017, -0.220), Point(52.168, 0.040),
+                            Point(52.855, 0.657), Point(52.856, 0.658)])
+        labels, centroids = locations.cluster(1, 2)
+        expect(list(labels)) == [0, 0, 0, -1, 1, 1]
+        expect(['%.4f;%.4f' % (x.latitude, x.longitude)
+                for x in centroids]) == ['52.0160;-0.2210', '52.8555;0.6575']
+        labels, centroids = locations.cluster(1, 3)
+        expect(list(labels)) == [0, 0, 0, -1, -1, -1]
+        labels, centroids = locations.cluster(50, 1, method='grid')
+        expect(labels[0]) == labels[1]
+        expect(labels[3] == labels[4]) == False
+        with expect.raises(ValueError):
+            locations.cluster(1, method='kmeans')
+
+    def test_densify(self):
+        dense = self.locs.densify(10)
+        expect(len(dense)) == 13
+        expect(dense[0]) == self.locs[0]
+        expect(dense[-1]) == self.locs[-1]
+        expect(max(dense.distance()) <= 10) == True
+        expect('%.3f' % sum(dense.distance())) == \
+            '%.3f' % sum(self.locs.distance())
+
     def test_destination(self):
         expect(list(self.locs.destination(42, 240))) == \
             [Point(53.59560782169536, 2.2141813683976777, 'metric', 'degrees',
@@ -275,11 +436,51 @@ class TestPoints(TestCase):
         expect(list(self.locs.to_grid_locator('subsquare'))) == \
             ['IO92va', 'JO02ae', 'JO02hu']
 
+    def test_bounds(self):
+        bounds = self.locs.bounds
+        expect((bounds.south, bounds.north)) == (52.015, 52.855)
+        self.locs.append(Point(53, 1))
+        expect(self.locs.bounds is bounds) == True
+        expect((bounds.north, bounds.east)) == (53, 1)
+        self.locs[0] = Point(52.1, 0)
+        expect(self.locs.bounds.as_dict()) == \
+            {'minlat': 52.1, 'maxlat': 53, 'minlon': 0, 'maxlon': 1}
+        self.locs.pop()
+        expect(self.locs.bounds.as_dict()) == \
+            {'minlat': 52.1, 'maxlat': 52.855, 'minlon': 0, 'maxlon': 0.657}
+        self.locs *= 2
+        expect(self.locs.bounds.as_dict()) == \
+            {'minlat': 52.1, 'maxlat': 52.855, 'minlon': 0, 'maxlon': 0.657}
+        self.locs *= 0
+        expect(bool(self.locs.bounds)) == False
+        self.locs.append(Point(52.1, 0))
+        del self.locs[:]
+        expect(bool(self.locs.bounds)) == False
+
+    def test_to_columns(self):
+        columns = self.locs.to_columns()
+        expect(sorted(columns)) == \
+            ['latitude', 'longitude', 'timezone', 'units']
+        expect(list(columns['latitude']['data'])) == [52.015, 52.168, 52.855]
+        expect(columns['units']['dictionary']) == ['metric']
+
+    def test_from_columns(self):
+        locations = Points.from_columns(self.locs.to_columns())
+        expect(repr(locations)) == repr(Points(self.locs))
+        timed = TimedPoints.from_columns({
+            'latitude': {'type': 'float64', 'data': [52.015]},
+            'longitude': {'type': 'float64', 'data': [-0.221]},
+        })
+        expect(repr(timed[0])) == \
+            "TimedPoint(52.015, -0.221, 'metric', 'degrees', 0, None)"
+        with expect.raises(ValueError):
+            Points.from_columns({})
+
 
 class TestTimedPoints(TestCase):
-    def speed(self):
-        locations = TimedPoints()
-        locations.extend([
+    def setUp(self):
+        self.locations = TimedPoints()
+        self.locations.extend([
             TimedPoint(52.015, -0.221,
                        time=datetime.datetime(2008, 7, 28, 16, 38)),
             TimedPoint(52.168, 0.040,
@@ -287,9 +488,81 @@ class TestTimedPoints(TestCase):
             TimedPoint(52.855, 0.657,
                        time=datetime.datetime(2008, 7, 28, 19, 17)),
         ])
-        expect(map(lambda s: '%.3f' % s, locations.speed())) == \
+
+    def test_speed(self):
+        expect(['%.3f' % s for s in self.locations.speed()]) == \
             ['12.315', '133.849']
 
+    def test_speed_durations(self):
+        self.locations[1].time = datetime.datetime(2008, 7, 29, 16, 38, 0,
+                                                   500000)
+        self.locations[2].time = self.locations[1].time
+        speeds = list(self.locations.speed())
+        expect('%.5f' % speeds[0]) == '1.02623'
+        expect(speeds[1]) == None
+
+    def test_speed_no_time(self):
+        self.locations[1].time = None
+        with expect.raises(NotImplementedError):
+            list(self.locations.speed())
+
+    def test_resample(self):
+        samples = self.locations.resample(every_seconds=1800)
+        expect([x.time.strftime('%H:%M') for x in samples]) == \
+            ['16:38', '17:08', '17:38', '18:08', '18:38', '19:08']
+        expect('%.3f' % samples[1].distance(samples[2])) == \
+            '%.3f' % (self.locations[0].distance(self.locations[1]) / 4)
+        samples = self.locations.resample(every_km=50)
+        expect([x.time.strftime('%H:%M') for x in samples]) == \
+            ['16:38', '18:49', '19:11']
+        single = TimedPoints(self.locations[:1])
+        for samples in (single.resample(every_km=50),
+                        single.resample(every_seconds=1800)):
+            expect(samples) == single
+            expect(samples[0].time) == single[0].time
+
+    def test_densify(self):
+        dense = self.locations.densify(10)
+        expect(len(dense)) == 13
+        expect(dense[1].time) == datetime.datetime(2008, 7, 28, 17, 18)
+
+    def test_track_stats(self):
+        stats = self.locations.track_stats()
+        expect(['%.3f' % i for i in stats['distance']]) == \
+            ['24.630', '87.002']
+        expect(stats['duration']) == [7200, 2340]
+        expect(['%.3f' % i for i in stats['speed']]) == \
+            ['12.315', '133.849']
+        expect(stats['acceleration'][0]) == None
+        expect('%.5f' % stats['acceleration'][1]) == '0.02548'
+        expect(['%.3f' % i for i in stats['bearing']]) == \
+            ['46.242', '28.416']
+        expect(stats['bearing_change'][0]) == None
+        expect('%.3f' % stats['bearing_change'][1]) == '-17.826'
+        expect(stats['elevation']) == [None, None]
+        expect('%.3f' % stats['total_distance']) == '111.632'
+        expect(stats['total_duration']) == 9540
+        expect(stats['moving_time']) == 9540
+        expect(stats['stopped_time']) == 0
+
+    def test_track_stats_stops(self):
+        self.locations.append(
+            TimedPoint(52.855, 0.657,
+                       time=datetime.datetime(2008, 7, 28, 19, 27)))
+        self.locations.append(
+            TimedPoint(52.855, 0.657,
+                       time=datetime.datetime(2008, 7, 28, 19, 27)))
+        stats = self.locations.track_stats()
+        expect(stats['speed'][2:]) == [0, None]
+        expect(stats['bearing'][2:]) == [None, None]
+        expect(stats['moving_time']) == 9540
+        expect(stats['stopped_time']) == 600
+
+    def test_track_stats_short(self):
+        stats = TimedPoints(self.locations[:1]).track_stats()
+        expect(stats['distance']) == []
+        expect(stats['total_distance']) == 0
+
 
 class TestKeyedPoints(TestCase):
     def setUp(self):
@@ -335,6 +608,16 @@ class TestKeyedPoints(TestCase):
         expect(list(self.locs.range(Point(52.015, -0.221), 20))) == \
             [('home', Point(52.015, -0.221, 'metric', 'degrees', 0))]
 
+    def test_within_corridor(self):
+        route = [Point(52, -1), Point(52, 0)]
+        expect(list(self.locs.within_corridor(route, 5))) == \
+            [('home', Point(52.015, -0.221, 'metric', 'degrees', 0))]
+
+    def test_cluster(self):
+        labels, centroids = self.locs.cluster(100, 2)
+        expect(labels['home']) == labels['Carol']
+        expect(len(centroids)) == 1
+
     def test_destination(self):
         expect(sorted(self.locs.destination(42, 240))) == \
             [('Carol', Point(53.74846914951471, 2.4840382137470614, 'metric',
@@ -367,3 +650,23 @@ class TestKeyedPoints(TestCase):
             [('Carol', 'JO02ae40'), ('Kenny', 'JO02hu85'), ('home', 'IO92va33')]
         expect(sorted(self.locs.to_grid_locator('subsquare'))) == \
             [('Carol', 'JO02ae'), ('Kenny', 'JO02hu'), ('home', 'IO92va')]
+
+    def test_to_columns(self):
+        columns = self.locs.to_columns()
+        expect(sorted(columns['key']['dictionary'])) == \
+            ['Carol', 'Kenny', 'home']
+
+    def test_from_columns(self):
+        locations = KeyedPoints.from_columns(self.locs.to_columns())
+        expect(sorted(locations.items())) == sorted(self.locs.items())
+
+    def test_bounds(self):
+        expect(self.locs.bounds.as_dict()) == \
+            {'minlat': 52.015, 'maxlat': 52.855, 'minlon': -0.221,
+             'maxlon': 0.657}
+        self.locs['north'] = Point(53, 0)
+        expect(self.locs.bounds.north) == 53
+        del self.locs['north']
+        self.locs.update(south=Point(51, 0))
+        expect((self.locs.bounds.south, self.locs.bounds.north)) == \
+            (51, 52.855)
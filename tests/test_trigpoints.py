@@ -21,7 +21,8 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.trigpoints import (Trigpoint, Trigpoints)
+from upoints.point import Point
+from upoints.trigpoints import (Trigpoint, Trigpoints, iter_trigpoints)
 
 
 class TestTrigpoint(TestCase):
@@ -61,3 +62,50 @@ class TestTrigpoints(TestCase):
             """500968 - Brown Hill Nm  See The Heights (53°38'23"N, 001°39'34"W)"""
         expect(data[1]) == \
             """501414 - Cheriton Hill Nm  See Paddlesworth (51°06'03"N, 001°08'33"E)"""
+
+    def test_nearest(self):
+        markers = Trigpoints(open('tests/data/trigpoints'))
+        expect([identity for identity, _ in
+                markers.nearest(Point(52.015, -0.221))]) == [501097]
+        expect([identity for identity, _ in
+                markers.nearest(Point(52.015, -0.221), 3)]) == \
+            [501097, 500936, 505392]
+        del markers[501097]
+        expect([identity for identity, _ in
+                markers.nearest(Point(52.015, -0.221))]) == [500936]
+        with expect.raises(ValueError):
+            markers.nearest(Point(52.015, -0.221), 0)
+
+    def test_nearest_fallback(self):
+        markers = Trigpoints(open('tests/data/trigpoints'))
+        nearest = [identity for identity, _ in
+                   markers.nearest(Point(52.015, -0.221), len(markers) + 5)]
+        expect(len(nearest)) == len(markers)
+        expect(nearest[:3]) == [501097, 500936, 505392]
+        expect([identity for identity, _ in
+                markers.nearest(Point(-33.9, 151.2), 3)]) == \
+            [identity for identity, _ in
+             sorted(markers.items(),
+                    key=lambda item: item[1].distance(Point(-33.9, 151.2)))
+             ][:3]
+
+    def test_visible_from(self):
+        markers = Trigpoints(open('tests/data/trigpoints'))
+        expect(markers.visible_from(Point(52.4, -0.2))) == []
+        # Bygrave is 43km away, with a 35km horizon
+        expect([identity for identity, _ in
+                markers.visible_from(Point(52.4, -0.2), 10)]) == [501097]
+        expect([identity for identity, _ in
+                markers.visible_from(Point(52.4, -0.2), 50)]) == \
+            [500936, 501097, 505392]
+        expect([identity for identity, _ in
+                markers.visible_from(markers[501097])]) == [500936, 505392]
+
+
+def test_iter_trigpoints():
+    trigpoints = iter_trigpoints(open('tests/data/trigpoints'),
+                                 bbox=(52, -0.2, 52.1, 0))
+    expect([identity for identity, trigpoint in trigpoints]) == [501097]
+    trigpoints = iter_trigpoints(open('tests/data/trigpoints'),
+                                 predicate=lambda r: r['latitude'] < 52)
+    expect([identity for identity, trigpoint in trigpoints]) == [505392]
@@ -22,7 +22,7 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.tzdata import (Zone, Zones)
+from upoints.tzdata import (Zone, Zones, iter_zones)
 
 
 class TestZone(TestCase):
@@ -53,3 +53,12 @@ class TestZones(TestCase):
             ['AN\t+121100-0690000\tAmerica/Curacao',
              'AO\t-084800+0131400\tAfrica/Luanda',
              'AQ\t-775000+1663600\tAntarctica/McMurdo\tMcMurdo Station, Ross Island']
+
+
+def test_iter_zones():
+    zones = iter_zones(open('tests/data/timezones'), bbox=(-90, 0, 0, 180))
+    expect([zone.zone for zone in zones]) == \
+        ['Africa/Luanda', 'Antarctica/McMurdo']
+    zones = iter_zones(open('tests/data/timezones'),
+                       predicate=lambda r: r['comments'])
+    expect([zone.zone for zone in zones]) == ['Antarctica/McMurdo']
@@ -18,18 +18,27 @@
 #
 
 import datetime
+import zipfile
 
+from io import BytesIO
 from unittest import TestCase
 
 from expecter import expect
+from lxml import etree
 
 from upoints.point import Point
 from upoints.trigpoints import Trigpoint
-from upoints.utils import (FileFormatError, Timestamp, TzOffset,
-                           angle_to_distance, angle_to_name, calc_radius,
-                           distance_to_angle, dump_xearth_markers,
-                           from_grid_locator, from_iso6709, parse_location,
-                           prepare_csv_read, prepare_read, prepare_xml_read,
+from upoints.utils import (FileFormatError, RecordFilter, Timestamp,
+                           TzOffset, angle_to_distance, angle_to_name,
+                           calc_radius, child_texts, decode_column,
+                           distance_to_angle,
+                           dump_xearth_markers, encode_column,
+                           from_grid_locator, from_iso6709, iterparse_xml,
+                           parse_coordinate, parse_location,
+                           prepare_stream,
+                           parse_locations, prepare_csv_read,
+                           prepare_csv_rows, prepare_read,
+                           prepare_xml_feed, prepare_xml_read,
                            sun_rise_set, to_dd, to_dms, to_grid_locator,
                            to_iso6709, value_or_empty)
 
@@ -50,14 +59,36 @@ def test_value_or_empty():
     expect(value_or_empty('test')) == 'test'
 
 
+def test_prepare_stream():
+    expected = open('tests/data/gpsdata').read()
+    for suffix in ('', '.gz', '.bz2', '.xz', '.zip'):
+        expect(prepare_stream('tests/data/gpsdata' + suffix).read()) == \
+            expected
+        data = prepare_stream(open('tests/data/gpsdata' + suffix, 'rb'), True)
+        expect(data.read()) == open('tests/data/gpsdata', 'rb').read()
+    text = open('tests/data/gpsdata')
+    expect(prepare_stream(text) is text) == True
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, 'w') as output:
+        output.writestr('one', 'first')
+        output.writestr('two', 'second')
+    archive.seek(0)
+    with expect.raises(ValueError):
+        prepare_stream(archive)
+    with expect.raises(TypeError):
+        prepare_stream(None)
+
+
 def test_prepare_read():
-    expect(prepare_read(open('tests/data/real_file'))) == \
+    expect(list(prepare_read(open('tests/data/real_file')))) == \
         ['This is a test file-type object\n']
     test_list = ['This is a test list-type object', 'with two elements']
     expect(prepare_read(test_list)) == \
         ['This is a test list-type object', 'with two elements']
     expect(prepare_read(open('tests/data/real_file'), 'read')) == \
         'This is a test file-type object\n'
+    expect(len(list(prepare_read('tests/data/gpsdata.gz')))) == \
+        len(open('tests/data/gpsdata').readlines())
 
 
 def test_prepare_csv_read():
@@ -69,6 +100,13 @@ def test_prepare_csv_read():
         [{'last': 'Rowe', 'first': 'James'}, {'last': 'caro', 'first': 'ell'}]
 
 
+def test_prepare_csv_rows():
+    expect(list(prepare_csv_rows(open('tests/data/real_file.csv')))) == \
+        [['file', 'true', 'test']]
+    expect(list(prepare_csv_rows(['James,Rowe', 'ell,caro']))) == \
+        [['James', 'Rowe'], ['ell', 'caro']]
+
+
 def test_prepare_xml_read():
     data = prepare_xml_read(open('tests/data/real_file.xml'))
     expect(data.find('tag').text) == 'This is a test file-type object'
@@ -77,6 +115,65 @@ def test_prepare_xml_read():
         'This is a test list'
 
 
+def test_prepare_xml_feed():
+    expect(b''.join(prepare_xml_feed('tests/data/real_file.xml', 8))) == \
+        open('tests/data/real_file.xml', 'rb').read()
+    test_list = ['<xml>', '<tag>This is a test list</tag>', '</xml>']
+    expect(list(prepare_xml_feed(test_list))) == test_list
+    with expect.raises(TypeError):
+        prepare_xml_feed(None)
+
+
+def test_record_filter():
+    expect(bool(RecordFilter())) == False
+    expect(RecordFilter().in_bbox(None, None)) == True
+    bbox = RecordFilter(bbox=(50, -1, 53, 1))
+    expect(bbox.in_bbox(52.015, -0.221)) == True
+    expect(bbox.in_bbox(52.015, 2)) == False
+    expect(bbox.in_bbox(None, None)) == False
+    expect(RecordFilter(bbox=(-10, 170, 10, -170)).in_bbox(0, 179)) == True
+    expect(RecordFilter(bbox=(-10, 170, 10, -170)).in_bbox(0, 0)) == False
+    predicate = RecordFilter(lambda r: r['name'] == 'Home')
+    expect(predicate.matches({'name': 'Home'})) == True
+    expect(predicate.matches({'name': 'Telford'})) == False
+
+
+def test_iterparse_xml():
+    test_list = ['<root xmlns="urn:x"><a id="1"><b>one</b></a>',
+                 '<c><a id="2"/></c><a id="3"><b>three</b><b>3</b></a>',
+                 '</root>']
+    found = []
+    started = []
+    iterparse_xml(test_list,
+                  {'root/a': lambda e: found.append(child_texts(e))},
+                  {'root/a': lambda e: started.append(e.get('id'))})
+    expect(started) == ['1', '3']
+    expect(found) == [{'b': 'one'}, {'b': 'three'}]
+    with expect.raises(etree.XMLSyntaxError):
+        iterparse_xml(['<root><a></root>'], {'root/a': found.append})
+
+
+def test_encode_column():
+    column = encode_column([1.5, 2, None])
+    expect(column['type']) == 'float64'
+    expect(column['data'].typecode) == 'd'
+    expect(list(column['mask'])) == [1, 1, 0]
+    expect(encode_column([1, 2])['type']) == 'int64'
+    expect(list(encode_column([True, False])['data'])) == [1, 0]
+    column = encode_column(['b', 'a', 'b', None])
+    expect(column['type']) == 'dictionary'
+    expect(column['dictionary']) == ['b', 'a']
+    expect(list(column['data'])) == [0, 1, 0, 0]
+    expect(encode_column([[1], None])) == \
+        {'type': 'object', 'data': [[1], None]}
+
+
+def test_decode_column():
+    for values in ([1.5, 2.0, None], [1, 2], [True, False, None],
+                   ['b', 'a', 'b', None], [[1], None], [None, None]):
+        expect(decode_column(encode_column(values))) == values
+
+
 def test_to_dms():
     expect(to_dms(52.015)) == (52, 0, 54.0)
     expect(to_dms(-0.221)) == (0, -13, -15.600000000000023)
@@ -109,12 +206,14 @@ class TestTzOffset(TestCase):
         expect(TzOffset('-00:00').utcoffset()) == datetime.timedelta(0)
         expect(TzOffset('+05:30').utcoffset()) == datetime.timedelta(0, 19800)
         expect(TzOffset('-08:00').utcoffset()) == datetime.timedelta(-1, 57600)
+        expect(TzOffset('-03:30').utcoffset()) == datetime.timedelta(-1, 73800)
 
     def test___repr__(self):
         expect(repr(TzOffset('+00:00'))) == "TzOffset('+00:00')"
         expect(repr(TzOffset('-00:00'))) == "TzOffset('+00:00')"
         expect(repr(TzOffset('+05:30'))) == "TzOffset('+05:30')"
         expect(repr(TzOffset('-08:00'))) == "TzOffset('-08:00')"
+        expect(repr(TzOffset('-03:30'))) == "TzOffset('-03:30')"
 
 
 class TestTimestamp(TestCase):
@@ -282,6 +381,37 @@ def test_parse_location():
         '52.015;-0.221'
     expect('%.3f;%.3f' % parse_location('''52d0'54" N 000d13'15" W''')) == \
         '52.015;-0.221'
+    expect('%.3f;%.3f' % parse_location('52.015 N; 0.221 W')) == \
+        '52.015;-0.221'
+    expect('%.3f;%.3f' % parse_location('IO92va')) == '52.021;-0.208'
+    expect(parse_location('52.015')) == None
+    expect(parse_location('ZZ99')) == None
+    expect('%.3f;%.3f' % parse_location('65-58-56N 161-09-07W')) == \
+        '65.982;-161.152'
+    expect('%.3f;%.3f' % parse_location('70-56N;008-40W')) == \
+        '70.933;-8.667'
+    # Exponents are accepted, as float() would
+    expect(parse_location('1e1;2')) == (10.0, 2.0)
+    expect(parse_location('5.2015E1 -2.21e-1')) == (52.015, -0.221)
+    expect(parse_location('1e1E 2E')) == None
+    expect(parse_location('1e1N 2E')) == (10.0, 2.0)
+
+
+def test_parse_coordinate():
+    expect('%.3f' % parse_coordinate('65-58-56N')) == '65.982'
+    expect('%.3f' % parse_coordinate('161-09-07W')) == '-161.152'
+    expect('%.3f' % parse_coordinate('32-21-  S')) == '-32.350'
+    expect('%.3f' % parse_coordinate('52d00m54s N')) == '52.015'
+    expect(parse_coordinate('-0.221')) == -0.221
+    expect(parse_coordinate('1e1E')) == 10.0
+    # NOAA style requires a hemisphere
+    expect(parse_coordinate('65-58-56')) == None
+    expect(parse_coordinate('xx')) == None
+
+
+def test_parse_locations():
+    expect(parse_locations(['52.015;-0.221', 'IO92', 'invalid'])) == \
+        [(52.015, -0.221), from_grid_locator('IO92'), None]
 
 
 def test_sun_rise_set():
@@ -21,7 +21,8 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.weather_stations import (Station, Stations)
+from upoints.point import Point
+from upoints.weather_stations import (Station, Stations, iter_stations)
 
 
 class TestStation(TestCase):
@@ -89,3 +90,48 @@ class TestStations(TestCase):
             'KCQB - Chandler, Chandler Municipal Airport (N35.724°; W096.820°)'
         expect('%s - %s' % data[2]) == \
             'KTYR - Tyler, Tyler Pounds Field (N32.359°; W095.404°)'
+
+    def test_index(self):
+        stations = Stations(open('tests/data/WMO_stations'))
+        expect(stations.index('WMO')) == dict(stations)
+        expect(stations.index('ICAO')['ENJA'] is stations['01001']) == True
+        expect(sorted(stations.index('ICAO'))) == ['ENJA', 'PABL']
+        expect(len(stations.index('country')['Norway'])) == 2
+        with expect.raises(ValueError):
+            stations.index('bogus')
+        del stations['01001']
+        expect(sorted(stations.index('ICAO'))) == ['PABL']
+        expect(len(stations.index('country')['Norway'])) == 1
+
+    def test_index_icao(self):
+        stations = Stations(open('tests/data/ICAO_stations'), 'ICAO')
+        expect(stations.index('WMO')['94014'] is stations['AYMD']) == True
+        expect(sorted(stations.index('WMO'))) == ['94014', '94035']
+
+    def test_nearest_many(self):
+        stations = Stations(open('tests/data/WMO_stations'))
+        track = [Point(79, 10), Point(79.0001, 10.0001), Point(60, -170)]
+        nearest = list(stations.nearest_many(track))
+        expect([[key for key, _ in found] for found in nearest]) == \
+            [['01002'], ['01002'], ['00000']]
+        expect(nearest[0][0][1] is stations['01002']) == True
+        nearest = list(stations.nearest_many(track, 2, rbsn_only=True))
+        expect([[key for key, _ in found] for found in nearest]) == \
+            [['01001'], ['01001'], ['01001']]
+        nearest = list(stations.nearest_many(track[:1], 3))
+        expect([key for key, _ in nearest[0]]) == ['01002', '01001', '00000']
+        with expect.raises(ValueError):
+            stations.nearest_many(track, 0)
+        nearest = list(stations.nearest_many(track + track[:1]))
+        expect([[key for key, _ in found] for found in nearest]) == \
+            [['01002'], ['01002'], ['00000'], ['01002']]
+
+
+def test_iter_stations():
+    # Crossing the antimeridian
+    stations = iter_stations(open('tests/data/WMO_stations'),
+                             bbox=(60, 170, 70, -150))
+    expect([identifier for identifier, station in stations]) == ['00000']
+    stations = iter_stations(open('tests/data/WMO_stations'),
+                             predicate=lambda r: r['rbsn'])
+    expect([identifier for identifier, station in stations]) == ['01001']
@@ -21,7 +21,7 @@ from unittest import TestCase
 
 from expecter import expect
 
-from upoints.xearth import (Xearth, Xearths)
+from upoints.xearth import (Xearth, Xearths, iter_xearths)
 
 
 class TestXearth(TestCase):
@@ -52,3 +52,11 @@ class TestXearths(TestCase):
         expect(str(markers['Home'])) == \
             "James Rowe's home (N52.015°; W000.221°)"
         expect(str(markers['Telford'])) == 'N52.633°; W002.500°'
+
+
+def test_iter_xearths():
+    markers = iter_xearths(open('tests/data/xearth'), bbox=(52, -1, 53, 0))
+    expect([name for name, marker in markers]) == ['Home']
+    markers = iter_xearths(open('tests/data/xearth'),
+                           predicate=lambda r: r['comment'] is None)
+    expect([name for name, marker in markers]) == ['Telford']
@@ -67,9 +67,10 @@ datetime.time(20, 24)
 .. moduleauthor:: `%s <mailto:%s>`__
 """ % parseaddr(__author__)
 
-from upoints import (baken, cellid, cities, geonames, gpx, kml, nmea, osm,
-                     point, trigpoints, tzdata, utils, weather_stations,
-                     xearth)
+from upoints import (baken, cellid, cities, geofence, geonames, gpx,
+                     instrument, kml, nmea, osm, point, trigpoints, tzdata,
+                     utils, weather_stations, xearth)
 
-__all__ = (baken, cellid, cities, geonames, gpx, kml, nmea, osm, point,
-           trigpoints, tzdata, utils, weather_stations, xearth)
+__all__ = (baken, cellid, cities, geofence, geonames, gpx, instrument, kml,
+           nmea, osm, point, trigpoints, tzdata, utils, weather_stations,
+           xearth)
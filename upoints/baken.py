@@ -25,7 +25,8 @@ try:
 except ImportError:
     from ConfigParser import ConfigParser
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
+from upoints.compat import basestring
 
 
 class Baken(point.Point):
@@ -112,12 +113,15 @@ class Bakens(point.KeyedPoints):
     .. versionadded:: 0.5.1
     """
 
+    point_class = Baken
+
     def __init__(self, baken_file=None):
         """Initialise a new `Bakens` object."""
         super(Bakens, self).__init__()
         if baken_file:
             self.import_locations(baken_file)
 
+    @instrument.instrumented('baken')
     def import_locations(self, baken_file):
         """Import baken data files.
 
@@ -160,43 +164,82 @@ class Bakens(point.KeyedPoints):
         .. _baken: http://www.qsl.net:80/g4klx/
         """
         self._baken_file = baken_file
-        data = ConfigParser()
-        if hasattr(baken_file, 'readlines'):
-            data.readfp(baken_file)
-        elif isinstance(baken_file, list):
-            data.read(baken_file)
-        elif isinstance(baken_file, basestring):
-            data.readfp(open(baken_file))
-        else:
-            raise TypeError('Unable to handle data of type %r'
-                            % type(baken_file))
-        valid_locator = re.compile(r"[A-Z]{2}\d{2}[A-Z]{2}")
-        for name in data.sections():
-            elements = {}
-            for item in ('latitude', 'longitude', 'antenna', 'direction',
-                         'frequency', 'height', 'locator', 'mode', 'operator',
-                         'power', 'qth'):
-                if data.has_option(name, item):
-                    if item in ('antenna', 'locator', 'mode', 'power', 'qth'):
-                        elements[item] = data.get(name, item)
-                    elif item == 'operator':
-                        elements[item] = elements[item].split(',')
-                    elif item == 'direction':
-                        elements[item] = data.get(name, item).split(',')
-                    else:
-                        try:
-                            elements[item] = data.getfloat(name, item)
-                        except ValueError:
-                            logging.debug('Multiple frequency workaround for '
-                                          '%r entry' % name)
-                            elements[item] = \
-                                map(float, data.get(name, item).split(','))
+        for name, baken in iter_bakens(baken_file):
+            self[name] = baken
+
+
+def iter_bakens(baken_file, predicate=None, bbox=None):
+    """Lazily parse baken data files.
+
+    Entries are filtered before their :class:`Baken` objects are created,
+    so only matching entries are built.  The record passed to ``predicate``
+    contains the entry's ``name`` and the keyword arguments of
+    :class:`Baken`.  Entries that only contain a locator are tested against
+    ``bbox`` using the centre of their locator.
+
+    :type baken_file: ``file``, ``list`` or ``str``
+    :param baken_file: Baken data to read
+    :param function predicate: Function called with each entry's parsed
+        fields, returning ``False`` for entries to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select entries
+        from
+    :rtype: ``generator`` of ``tuple``
+    :return: Names and :class:`Baken` objects for matching entries
+    :raise TypeError: Invalid value for ``baken_file``
+
+    .. versionadded:: 0.13.0
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    data = ConfigParser()
+    if hasattr(baken_file, 'readlines'):
+        data.readfp(utils.prepare_stream(baken_file))
+    elif isinstance(baken_file, list):
+        data.read(baken_file)
+    elif isinstance(baken_file, basestring):
+        data.readfp(utils.prepare_stream(baken_file))
+    else:
+        raise TypeError('Unable to handle data of type %r'
+                        % type(baken_file))
+    valid_locator = re.compile(r"[A-Z]{2}\d{2}[A-Z]{2}")
+    for name in data.sections():
+        elements = {}
+        for item in ('latitude', 'longitude', 'antenna', 'direction',
+                     'frequency', 'height', 'locator', 'mode', 'operator',
+                     'power', 'qth'):
+            if data.has_option(name, item):
+                if item in ('antenna', 'locator', 'mode', 'power', 'qth'):
+                    elements[item] = data.get(name, item)
+                elif item == 'operator':
+                    elements[item] = elements[item].split(',')
+                elif item == 'direction':
+                    elements[item] = data.get(name, item).split(',')
                 else:
-                    elements[item] = None
-            if elements['latitude'] is None \
-               and not valid_locator.match(elements['locator']):
-                logging.info('Skipping %r entry, as it contains no location '
-                             'data' % name)
+                    try:
+                        elements[item] = data.getfloat(name, item)
+                    except ValueError:
+                        logging.debug('Multiple frequency workaround for '
+                                      '%r entry' % name)
+                        elements[item] = \
+                            map(float, data.get(name, item).split(','))
+            else:
+                elements[item] = None
+        if elements['latitude'] is None \
+           and not valid_locator.match(elements['locator']):
+            logging.info('Skipping %r entry, as it contains no location '
+                         'data' % name)
+            instrument.count('rows_skipped')
+            continue
+        if filters:
+            if elements['latitude'] is None:
+                location = utils.from_grid_locator(elements['locator'])
+            else:
+                location = (elements['latitude'], elements['longitude'])
+            if not filters.in_bbox(*location):
                 continue
+            if filters.predicate:
+                record = dict(elements, name=name)
+                if not filters.matches(record):
+                    continue
 
-            self[name] = Baken(**elements)
+        yield name, Baken(**elements)
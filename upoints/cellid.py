@@ -22,7 +22,7 @@ import logging
 
 from operator import attrgetter
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 
 
 class Cell(point.Point):
@@ -88,6 +88,8 @@ class Cells(point.KeyedPoints):
     .. versionadded:: 0.11.0
     """
 
+    point_class = Cell
+
     def __init__(self, cells_file=None):
         """Initialise a new ``Cells`` object."""
         super(Cells, self).__init__()
@@ -104,6 +106,7 @@ class Cells(point.KeyedPoints):
         return '\n'.join(map(str, sorted(self.values(),
                                          key=attrgetter('ident'))))
 
+    @instrument.instrumented('cellid')
     def import_locations(self, cells_file):
         """Parse OpenCellID.org data files.
 
@@ -141,26 +144,54 @@ class Cells(point.KeyedPoints):
         .. _OpenCellID.org: http://opencellid.org/
         """
         self._cells_file = cells_file
-        field_names = ('ident', 'latitude', 'longitude', 'mcc', 'mnc', 'lac',
-                       'cellid', 'crange', 'samples', 'created', 'updated')
-        parse_date = lambda s: datetime.datetime.strptime(s,
-                                                          '%Y-%m-%d %H:%M:%S')
-        field_parsers = (int, float, float, int, int, int, int, int, int,
-                         parse_date, parse_date)
-        data = utils.prepare_csv_read(cells_file, field_names)
-
-        for row in data:
-            try:
-                cell = dict((n, p(row[n]))
-                            for n, p in zip(field_names, field_parsers))
-            except ValueError:
-                if r"\N" in row.values():
-                    # A few entries are incomplete, and when that occurs the
-                    # export includes the string "\N" to denote missing
-                    # data.  We just ignore them for now
-                    logging.debug('Skipping incomplete entry %r' % row)
-                    break
-                else:
-                    raise utils.FileFormatError('opencellid.org')
+        for ident, cell in iter_cells(cells_file):
+            self[ident] = cell
+
+
+def iter_cells(cells_file, predicate=None, bbox=None):
+    """Lazily parse OpenCellID.org data files.
+
+    Rows outside of ``bbox`` are rejected once their location has been
+    parsed, before the remaining fields are converted.  The record passed to
+    ``predicate`` contains the keyword arguments of :class:`Cell`.
+
+    :type cells_file: ``file``, ``list`` or ``str``
+    :param cells_file: Cell data to read
+    :param function predicate: Function called with each row's parsed
+        fields, returning ``False`` for rows to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select rows from
+    :rtype: ``generator`` of ``tuple``
+    :return: Database identifiers and :class:`Cell` objects for matching rows
+    :raise utils.FileFormatError: Unknown file format
+
+    .. versionadded:: 0.13.0
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    field_names = ('ident', 'latitude', 'longitude', 'mcc', 'mnc', 'lac',
+                   'cellid', 'crange', 'samples', 'created', 'updated')
+    parse_date = lambda s: datetime.datetime.strptime(s, '%Y-%m-%d %H:%M:%S')
+    field_parsers = (int, float, float, int, int, int, int, int, int,
+                     parse_date, parse_date)
+    data = utils.prepare_csv_read(cells_file, field_names)
+
+    for row in data:
+        try:
+            latitude = float(row['latitude'])
+            longitude = float(row['longitude'])
+            if not filters.in_bbox(latitude, longitude):
+                continue
+            cell = dict((n, p(row[n]))
+                        for n, p in zip(field_names, field_parsers))
+        except ValueError:
+            if r"\N" in row.values():
+                # A few entries are incomplete, and when that occurs the
+                # export includes the string "\N" to denote missing
+                # data.  We just ignore them for now
+                logging.debug('Skipping incomplete entry %r' % row)
+                instrument.count('rows_skipped')
+                break
             else:
-                self[row['ident']] = Cell(**cell)
+                raise utils.FileFormatError('opencellid.org')
+        if filters.matches(cell):
+            yield row['ident'], Cell(**cell)
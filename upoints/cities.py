@@ -23,10 +23,15 @@ __doc__ += """.
 .. versionadded:: 0.2.0
 """
 
+import datetime
 import logging
 import time
 
-from upoints import (point, trigpoints, utils)
+from bisect import (bisect_left, bisect_right)
+from itertools import (chain, islice)
+
+from upoints import (instrument, point, trigpoints, utils)
+from upoints.compat import lru_cache
 
 #: GNU miscfiles cities.dat template
 TEMPLATE = """\
@@ -112,6 +117,11 @@ class Cities(point.Points):
     .. versionadded:: 0.5.1
     """
 
+    point_class = City
+
+    #: Secondary indexes, built when first requested
+    _indexes = None
+
     def __init__(self, data=None):
         """Initialise a new ``Cities`` object."""
         super(Cities, self).__init__()
@@ -119,6 +129,84 @@ class Cities(point.Points):
         if data:
             self.import_locations(data)
 
+    def append(self, point):
+        self._indexes = None
+        super(Cities, self).append(point)
+
+    def insert(self, index, point):
+        self._indexes = None
+        super(Cities, self).insert(index, point)
+
+    def extend(self, points):
+        self._indexes = None
+        super(Cities, self).extend(points)
+
+    def __setitem__(self, index, value):
+        self._indexes = None
+        super(Cities, self).__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._indexes = None
+        super(Cities, self).__delitem__(index)
+
+    def pop(self, index=-1):
+        self._indexes = None
+        return super(Cities, self).pop(index)
+
+    def remove(self, point):
+        self._indexes = None
+        super(Cities, self).remove(point)
+
+    def __imul__(self, count):
+        self._indexes = None
+        return super(Cities, self).__imul__(count)
+
+    def _build_indexes(self):
+        """Index places by country, and by population.
+
+        :rtype: ``tuple`` of ``dict``, ``list`` and ``list``
+        :return: Country to places mapping, places with a known population
+            from largest to smallest, and their negated populations
+        """
+        if self._indexes is None:
+            countries = {}
+            for city in self:
+                countries.setdefault(city.country, []).append(city)
+            populated = sorted((city for city in self
+                                if city.population is not None),
+                               key=lambda city: -city.population)
+            self._indexes = (countries, populated,
+                             [-city.population for city in populated])
+        return self._indexes
+
+    def by_country(self, country):
+        """Find places in a country.
+
+        :param str country: Country name, as used in the data file
+        :rtype: ``list`` of :class:`City`
+        :return: Places in ``country``
+
+        .. versionadded:: 0.13.0
+        """
+        return list(self._build_indexes()[0].get(country, ()))
+
+    def by_population(self, minimum=None, maximum=None):
+        """Find places with a population within a given range.
+
+        :param int minimum: Smallest population to include
+        :param int maximum: Largest population to include
+        :rtype: ``list`` of :class:`City`
+        :return: Places with a known population in the range, from largest
+            to smallest
+
+        .. versionadded:: 0.13.0
+        """
+        _, populated, keys = self._build_indexes()
+        start = 0 if maximum is None else bisect_left(keys, -maximum)
+        end = len(keys) if minimum is None else bisect_right(keys, -minimum)
+        return populated[start:end]
+
+    @instrument.instrumented('cities')
     def import_locations(self, data):
         """Parse `GNU miscfiles`_ cities data files.
 
@@ -176,34 +264,114 @@ class Cities(point.Points):
         .. _GNU miscfiles: http://directory.fsf.org/project/miscfiles/
         """
         self._data = data
-        if hasattr(data, 'read'):
-            data = data.read().split('//\n')
-        elif isinstance(data, list):
-            pass
-        elif isinstance(data, basestring):
-            data = open(data).read().split('//\n')
-        else:
-            raise TypeError('Unable to handle data of type %r' % type(data))
-
-        keys = ('identifier', 'ptype', 'population', 'size', 'name', 'country',
-                'region', 'location', 'longitude', 'latitude', 'altitude',
-                'date', 'entered')
-
-        for record in data:
-            # We truncate after splitting because the v1.4.2 datafile contains
-            # a broken separator between 229 and 230 that would otherwise break
-            # the import
-            data = [i.split(':')[1].strip() for i in record.splitlines()[:13]]
-            entries = dict(zip(keys, data))
-
-            # Entry for Utrecht has the incorrect value of 0.000 for elevation.
-            if entries['altitude'] == '0.000':
-                logging.debug("Ignoring `0.000' value for elevation in %r "
-                              'entry' % record)
-                entries['altitude'] = ''
-            for i in ('identifier', 'population', 'size', 'altitude'):
-                entries[i] = int(entries[i]) if entries[i] else None
-            for i in ('longitude', 'latitude'):
-                entries[i] = float(entries[i]) if entries[i] else None
-            entries['date'] = time.strptime(entries['date'], '%Y%m%d')
-            self.append(City(**entries))
+        self.extend(iter_cities(data))
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value):
+    """Decode a ``YYYYMMDD`` date.
+
+    :param str value: Date to decode
+    :rtype: ``time.struct_time``
+    :return: Decoded date, or ``None`` for an empty value
+    :raise ValueError: Invalid date
+    """
+    if not value:
+        return None
+    if not len(value) == 8 or not value.isdigit():
+        raise ValueError('Invalid date %r' % value)
+    return datetime.date(int(value[:4]), int(value[4:6]),
+                         int(value[6:])).timetuple()
+
+
+def _parse_city(values, filters):
+    """Convert the fields of a record to a :class:`City` object.
+
+    :type values: ``list`` of ``str``
+    :param values: Field values, in file order
+    :param utils.RecordFilter filters: Filters for the record
+    :rtype: :class:`City`
+    :return: Place, or ``None`` if the record is filtered out
+    """
+    (identifier, ptype, population, size, name, country, region, location,
+     longitude, latitude, altitude, date, entered) = values
+    longitude = float(longitude) if longitude else None
+    latitude = float(latitude) if latitude else None
+    if filters.south is not None and not filters.in_bbox(latitude, longitude):
+        return None
+    # Entry for Utrecht has the incorrect value of 0.000 for elevation.
+    if altitude == '0.000':
+        logging.debug("Ignoring `0.000' value for elevation in %r "
+                      'entry' % identifier)
+        altitude = ''
+    identifier = int(identifier) if identifier else None
+    population = int(population) if population else None
+    size = int(size) if size else None
+    altitude = int(altitude) if altitude else None
+    date = _parse_date(date)
+    if filters.predicate is not None and \
+            not filters.predicate({'identifier': identifier, 'name': name,
+                                   'ptype': ptype, 'region': region,
+                                   'country': country, 'location': location,
+                                   'population': population, 'size': size,
+                                   'latitude': latitude,
+                                   'longitude': longitude,
+                                   'altitude': altitude, 'date': date,
+                                   'entered': entered}):
+        return None
+    return City(identifier, name, ptype, region, country, location,
+                population, size, latitude, longitude, altitude, date,
+                entered)
+
+
+def iter_cities(data, predicate=None, bbox=None):
+    """Lazily parse `GNU miscfiles`_ cities data files.
+
+    The data is read a line at a time, and places are produced as each
+    record's separator is reached.  Records outside of ``bbox`` are rejected
+    once their location has been parsed, before the remaining fields are
+    converted.  The record passed to ``predicate`` contains the keyword
+    arguments of :class:`City`.
+
+    .. versionchanged:: 0.13.0
+       Records with an empty date are imported with a ``date`` of ``None``
+
+    :type data: ``file``, ``list`` or ``str``
+    :param data: Cities data to read, where a ``list`` contains the text of
+        each record
+    :param function predicate: Function called with each record's parsed
+        fields, returning ``False`` for records to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select records
+        from
+    :rtype: ``generator`` of :class:`City`
+    :return: Matching places
+    :raise TypeError: Invalid value for ``data``
+
+    .. versionadded:: 0.13.0
+
+    .. _GNU miscfiles: http://directory.fsf.org/project/miscfiles/
+    """
+    if isinstance(data, list):
+        lines = chain.from_iterable(chain(islice(record.splitlines(), 13),
+                                          ('//', ))
+                                    for record in data)
+    else:
+        lines = utils.prepare_read(data)
+    filters = utils.RecordFilter(predicate, bbox)
+
+    values = []
+    for line in chain(lines, ('//', )):
+        if line.startswith('//'):
+            if len(values) == 13:
+                city = _parse_city(values, filters)
+                if city is not None:
+                    yield city
+            elif values:
+                instrument.count('rows_skipped')
+            values = []
+        # Fields after the thirteenth are ignored until the next separator,
+        # because the v1.4.2 datafile contains a broken separator between
+        # 229 and 230 that would otherwise break the import
+        elif len(values) < 13 and line.strip():
+            values.append(line.split(':')[1].strip())
@@ -23,8 +23,10 @@ PY2 = version_info[0] == 2
 
 if PY2:
     basestring = basestring
+    unichr = unichr
 else:
     basestring = str
+    unichr = chr
 
 if PY2:
     def mangle_repr_type(klass):
@@ -36,3 +38,31 @@ if PY2:
         return klass
 else:
     mangle_repr_type = lambda x: x
+
+try:
+    from functools import lru_cache
+except ImportError:  # Python 2
+    def lru_cache(maxsize=128):
+        """Minimal bounded cache decorator for single argument functions.
+
+        Unlike :func:`functools.lru_cache` the whole cache is discarded when it
+        fills, which is good enough for the repetitive inputs it is used for.
+
+        :param int maxsize: Maximum number of results to store
+        """
+        def decorator(func):
+            cache = {}
+
+            def wrapper(arg):
+                try:
+                    return cache[arg]
+                except KeyError:
+                    if len(cache) >= maxsize:
+                        cache.clear()
+                    result = cache[arg] = func(arg)
+                    return result
+            wrapper.cache_clear = cache.clear
+            wrapper.__doc__ = func.__doc__
+            wrapper.__name__ = func.__name__
+            return wrapper
+        return decorator
@@ -22,7 +22,7 @@ from __future__ import print_function
 from email.utils import parseaddr
 
 from upoints import (__version__, __author__)
-from upoints.compat import mangle_repr_type
+from upoints.compat import (basestring, mangle_repr_type)
 
 
 __doc__ += """.
@@ -54,8 +54,13 @@ USAGE = __doc__[:__doc__.find('\n\n', 100)].replace('``', "'").splitlines()[2:]
 # Replace script name with optparse's substitution var, and rebuild string
 USAGE = '\n'.join(USAGE).replace('edist', '%(prog)s')
 
+import argparse
+import json
 import logging
+import numbers
 import os
+import socket
+import stat
 import sys
 
 from operator import itemgetter
@@ -67,6 +72,16 @@ try:
 except ImportError:
     from ConfigParser import ConfigParser
 
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver  # NOQA
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO  # NOQA
+
 
 from upoints import (point, utils)
 
@@ -80,6 +95,15 @@ EPILOG = 'Please report bugs at https://github.com/JNRowe/upoints/'
 
 APP = aaargh.App(description=USAGE, epilog=EPILOG)
 
+#: Output formats for locations
+FORMATS = ('dms', 'dm', 'dd', 'locator')
+#: Accuracies for Maidenhead locator output
+LOCATORS = ('square', 'subsquare', 'extsquare')
+#: Units for time output
+TIME_UNITS = ('h', 'm', 's')
+#: Units for distance output
+UNITS = ('km', 'sm', 'nm')
+
 
 class LocationsError(ValueError):
     """Error object for data parsing error.
@@ -136,7 +160,7 @@ class NumberedPoint(point.Point):
        Unit type to be used for distances
     """
 
-    __slots__ = ('name')
+    __slots__ = ('name', )
 
     def __init__(self, latitude, longitude, name, units='km'):
         """Initialise a new ``NumberedPoint`` object.
@@ -169,6 +193,12 @@ class NumberedPoints(point.Points):
     .. versionadded:: 0.6.0
     """
 
+    point_class = NumberedPoint
+
+    #: Stream command output is written to, or ``None`` for
+    #: :data:`sys.stdout`
+    output = None
+
     def __init__(self, locations=None, format='dd', verbose=True,
                  config_locations=None, units='km'):
         """Initialise a new ``NumberedPoints`` object.
@@ -197,6 +227,13 @@ class NumberedPoints(point.Points):
         """
         return utils.repr_assist(self, {'locations': self[:]})
 
+    def _write(self, text):
+        """Write a line of command output.
+
+        :param str text: Line to write
+        """
+        print(text, file=self.output)
+
     def import_locations(self, locations, config_locations):
         """Import locations from arguments.
 
@@ -233,9 +270,9 @@ class NumberedPoints(point.Points):
             else:
                 output = format(location, self.format)
             if self.verbose:
-                print('Location %s is %s' % (location.name, output))
+                self._write('Location %s is %s' % (location.name, output))
             else:
-                print(output)
+                self._write(output)
 
     def distance(self):
         """Calculate distances between locations."""
@@ -253,13 +290,13 @@ class NumberedPoints(point.Points):
             total_msg.append('kilometres')
         if self.verbose:
             for number, distance in enumerate(distances):
-                print(' '.join(leg_msg) % (self[number].name,
-                                           self[number + 1].name,
-                                           distance))
+                self._write(' '.join(leg_msg) % (self[number].name,
+                                                 self[number + 1].name,
+                                                 distance))
             if len(distances) > 1:
-                print(' '.join(total_msg) % sum(distances))
+                self._write(' '.join(total_msg) % sum(distances))
         else:
-            print(sum(distances))
+            self._write(sum(distances))
 
     def bearing(self, mode, string):
         """Calculate bearing/final bearing between locations.
@@ -278,10 +315,10 @@ class NumberedPoints(point.Points):
             verbose_fmt = 'Final bearing from location %s to %s is %s'
         for number, bearing in enumerate(bearings):
             if self.verbose:
-                print(verbose_fmt % (self[number].name, self[number + 1].name,
-                                     bearing))
+                self._write(verbose_fmt % (self[number].name,
+                                           self[number + 1].name, bearing))
             else:
-                print(bearing)
+                self._write(bearing)
 
     def range(self, distance):
         """Test whether locations are within a given range of the first.
@@ -303,9 +340,10 @@ class NumberedPoints(point.Points):
                 else:
                     text.append('kilometres')
                 text.append('of location %s')
-                print(' '.join(text) % (location.name, distance, self[0].name))
+                self._write(' '.join(text) % (location.name, distance,
+                                              self[0].name))
             else:
-                print(in_range)
+                self._write(in_range)
 
     def destination(self, distance, bearing, locator):
         """Calculate destination locations for given distance and bearings.
@@ -322,10 +360,10 @@ class NumberedPoints(point.Points):
             else:
                 output = format(location, self.format)
             if self.verbose:
-                print('Destination from location %s is %s' % (location.name,
-                                                              output))
+                self._write('Destination from location %s is %s'
+                            % (location.name, output))
             else:
-                print(output)
+                self._write(output)
 
     def sun_events(self, mode):
         """Calculate sunrise/sunset times for locations.
@@ -337,13 +375,13 @@ class NumberedPoints(point.Points):
         for location, time in zip(self, times):
             if self.verbose:
                 if time:
-                    print('%s at %s UTC in location %s' % (mode_str, time,
-                                                           location.name))
+                    self._write('%s at %s UTC in location %s'
+                                % (mode_str, time, location.name))
                 else:
-                    print("The sun doesn't %s at location %s on this date"
-                          % (mode_str[3:], location.name))
+                    self._write("The sun doesn't %s at location %s on this "
+                                'date' % (mode_str[3:], location.name))
             else:
-                print(time)
+                self._write(time)
 
     def flight_plan(self, speed, time):
         """Output the flight plan corresponding to the given locations.
@@ -356,17 +394,18 @@ class NumberedPoints(point.Points):
         if len(self) == 1:
             raise LocationsError('flight_plan')
         if self.verbose:
-            print('WAYPOINT,BEARING[°],DISTANCE[%s],ELAPSED_TIME[%s],'
-                  'LATITUDE[d.dd],LONGITUDE[d.dd]' % (self.units, time))
+            self._write('WAYPOINT,BEARING[°],DISTANCE[%s],ELAPSED_TIME[%s],'
+                        'LATITUDE[d.dd],LONGITUDE[d.dd]' % (self.units, time))
         legs = [(0, 0), ] + list(self.inverse())
         for leg, loc in zip(legs, self):
             if leg == (0, 0):
-                print('%s,,,,%f,%f' % (loc.name, loc.latitude, loc.longitude))
+                self._write('%s,,,,%f,%f' % (loc.name, loc.latitude,
+                                             loc.longitude))
             else:
                 leg_speed = '%.1f' % (leg[1] / speed) if speed != 0 else ''
-                print('%s,%i,%.1f,%s,%f,%f'
-                      % (loc.name, leg[0], leg[1], leg_speed, loc.latitude,
-                         loc.longitude))
+                self._write('%s,%i,%.1f,%s,%f,%f'
+                            % (loc.name, leg[0], leg[1], leg_speed,
+                               loc.latitude, loc.longitude))
         if self.verbose:
             overall_distance = sum(map(itemgetter(1), legs))
             direct_distance = self[0].distance(self[-1])
@@ -378,15 +417,15 @@ class NumberedPoints(point.Points):
                 speed_marker = ''
                 overall_speed = '%.1f' % (overall_distance / speed)
                 direct_speed = '%.1f' % (direct_distance / speed)
-            print('-- OVERALL --%s,,%.1f,%s,,'
-                  % (speed_marker, overall_distance, overall_speed))
-            print('-- DIRECT --%s,%i,%.1f,%s,,'
-                  % (speed_marker, self[0].bearing(self[-1]), direct_distance,
-                     direct_speed))
+            self._write('-- OVERALL --%s,,%.1f,%s,,'
+                        % (speed_marker, overall_distance, overall_speed))
+            self._write('-- DIRECT --%s,%i,%.1f,%s,,'
+                        % (speed_marker, self[0].bearing(self[-1]),
+                           direct_distance, direct_speed))
 
 
 @APP.cmd(help='pretty print the location(s)')
-@APP.cmd_arg('-l', '--locator', choices=('square', 'subsquare', 'extsquare'),
+@APP.cmd_arg('-l', '--locator', choices=LOCATORS,
              default='subsquare',
              help='accuracy of Maidenhead locator output')
 @APP.cmd_arg('location', nargs='+', help='Locations to operate on')
@@ -425,7 +464,7 @@ def range(args):
 
 
 @APP.cmd(help='calculate the destination for a given distance and bearing')
-@APP.cmd_arg('-l', '--locator', choices=('square', 'subsquare', 'extsquare'),
+@APP.cmd_arg('-l', '--locator', choices=LOCATORS,
              default='subsquare',
              help='accuracy of Maidenhead locator output')
 @APP.cmd_arg('-d', '--distance', required=True, type=float,
@@ -453,13 +492,254 @@ def sunset(args):
          help='calculate the flight plan corresponding to locations (route)')
 @APP.cmd_arg('-s', '--speed', default=0, type=float,
              help='speed to calculate elapsed time')
-@APP.cmd_arg('-t', '--time', choices=('h', 'm', 's'),
+@APP.cmd_arg('-t', '--time', choices=TIME_UNITS,
              help='display time in hours, minutes or seconds')
 @APP.cmd_arg('location', nargs='+', help='Locations to operate on')
 def flight_plan(args):
     args.locations.flight_plan(args.speed, args.time)
 
 
+@APP.cmd(help='serve requests from a local socket')
+@APP.cmd_arg('-s', '--socket', required=True,
+             help='socket path to listen on')
+def serve(args):
+    server = EdistServer(args.socket, args.config_locations,
+                         {'format': args.format, 'verbose': args.verbose,
+                          'units': args.units})
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+#: Commands available to :class:`EdistServer` clients
+SERVER_COMMANDS = {
+    'bearing': bearing,
+    'destination': destination,
+    'display': display,
+    'distance': distance,
+    'final-bearing': final_bearing,
+    'flight-plan': flight_plan,
+    'range': range,
+    'sunrise': sunrise,
+    'sunset': sunset,
+}
+
+#: Default option values for :class:`EdistServer` requests
+SERVER_DEFAULTS = {
+    'bearing': None,
+    'distance': None,
+    'format': 'dms',
+    'locator': 'subsquare',
+    'speed': 0,
+    'string': False,
+    'time': 'h',
+    'units': 'km',
+    'verbose': True,
+}
+
+#: Valid values for :class:`EdistServer` request options
+SERVER_CHOICES = {
+    'format': FORMATS,
+    'locator': LOCATORS,
+    'time': TIME_UNITS,
+    'units': UNITS,
+}
+
+#: Options required by :class:`EdistServer` commands
+SERVER_REQUIRED = {
+    'destination': ('distance', 'bearing'),
+    'range': ('distance', ),
+}
+
+
+def _check_options(options):
+    """Validate :class:`EdistServer` request options.
+
+    Options are checked against the values accepted on the command line, and
+    numeric options are converted to ``float``.
+
+    :param dict options: Option values to check
+    :rtype: ``str``
+    :return: Error message, or ``None`` if options are valid
+    """
+    for key, value in sorted(options.items()):
+        if key in SERVER_CHOICES:
+            if value not in SERVER_CHOICES[key]:
+                return 'Invalid %s %r, choose from %s' \
+                    % (key, value, ', '.join(SERVER_CHOICES[key]))
+        elif isinstance(SERVER_DEFAULTS[key], bool):
+            if not isinstance(value, bool):
+                return 'Invalid %s %r, expected a boolean' % (key, value)
+        elif value is not None:
+            if isinstance(value, bool) or \
+                    not isinstance(value, numbers.Real):
+                return 'Invalid %s %r, expected a number' % (key, value)
+            options[key] = float(value)
+    return None
+
+
+def process_request(request, config_locations=None, defaults=None):
+    """Process a single :class:`EdistServer` request.
+
+    Requests are ``dict`` objects containing a ``command`` name, a list of
+    ``locations`` and any options the command accepts on the command line,
+    for example::
+
+        {"command": "distance", "locations": ["Home", "52.168;0.040"],
+         "units": "nm"}
+
+    Options are validated as they would be on the command line, and command
+    output is written to a buffer for each request so requests may be
+    processed concurrently.
+
+    .. versionadded:: 0.13.0
+
+    :param dict request: Command, locations and options to process
+    :param dict config_locations: Locations imported from user's config file
+    :param dict defaults: Option values to use when not set in ``request``
+    :rtype: ``dict``
+    :return: Command output lines as ``output``, or message as ``error``
+    """
+    if not isinstance(request, dict):
+        return {'error': 'Invalid request %r' % request}
+    command = request.get('command')
+    try:
+        func = SERVER_COMMANDS[command]
+    except (KeyError, TypeError):
+        return {'error': 'Unknown command %r' % command}
+    locations = request.get('locations')
+    if not isinstance(locations, list) or \
+            not all(isinstance(i, basestring) for i in locations):
+        return {'error': 'Invalid locations %r, expected a list of strings'
+                % (locations, )}
+
+    options = SERVER_DEFAULTS.copy()
+    if defaults:
+        options.update(defaults)
+    options.update((key, value) for key, value in request.items()
+                   if key in SERVER_DEFAULTS)
+    error = _check_options(options)
+    if error:
+        return {'error': error}
+    for key in SERVER_REQUIRED.get(command, ()):
+        if options[key] is None:
+            return {'error': 'Missing required option %r for %s'
+                    % (key, command)}
+    args = argparse.Namespace(**options)
+
+    output = StringIO()
+    try:
+        args.locations = NumberedPoints(locations, args.format, args.verbose,
+                                        config_locations, args.units)
+        args.locations.output = output
+        func(args)
+    except (RuntimeError, TypeError, ValueError) as error:
+        return {'error': str(error)}
+    return {'output': output.getvalue().splitlines()}
+
+
+class EdistRequestHandler(socketserver.StreamRequestHandler):
+    """Line-delimited JSON request handler for :class:`EdistServer`.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def handle(self):
+        """Process requests until the client closes the connection."""
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except ValueError:
+                response = {'error': 'Invalid request %r' % line}
+            else:
+                response = process_request(request,
+                                           self.server.config_locations,
+                                           self.server.defaults)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class EdistServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Long-running ``edist`` server listening on a local socket.
+
+    The config file locations are read once, and kept resident for the
+    lifetime of the server.
+
+    .. versionadded:: 0.13.0
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, config_locations=None, defaults=None):
+        """Initialise a new ``EdistServer`` object.
+
+        :param str path: Socket path to listen on
+        :param dict config_locations: Locations imported from user's config
+            file
+        :param dict defaults: Option values to use when not set in requests
+        :raise socket.error: ``path`` exists, and is not a stale socket
+        """
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        socketserver.UnixStreamServer.__init__(self, path,
+                                               EdistRequestHandler)
+        self.config_locations = config_locations
+        self.defaults = defaults
+
+    def server_close(self):
+        """Close the listening socket, and remove its path."""
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class EdistClient(object):
+    """Thin client for :class:`EdistServer`.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, path):
+        """Initialise a new ``EdistClient`` object.
+
+        :param str path: Socket path server is listening on
+        """
+        super(EdistClient, self).__init__()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile('rwb')
+
+    def request(self, command, locations, **options):
+        """Process a command on the server.
+
+        :param str command: Command name, as used on the command line
+        :type locations: ``list`` of ``str``
+        :param locations: Location identifiers
+        :param options: Command options, as used on the command line
+        :rtype: ``list`` of ``str``
+        :return: Output lines from command
+        :raise RuntimeError: Server was unable to process the command
+        """
+        options.update(command=command, locations=list(locations))
+        self._file.write(json.dumps(options).encode('utf-8') + b'\n')
+        self._file.flush()
+        response = json.loads(self._file.readline().decode('utf-8'))
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['output']
+
+    def close(self):
+        """Close connection to the server."""
+        self._file.close()
+        self._socket.close()
+
+
 def read_locations(filename):
     """Pull locations from a user's config file.
 
@@ -535,16 +815,16 @@ def main():
             help='CSV file (gpsbabel format) to read route/locations from '
                  "('-' for STDIN)")
 
-    APP.arg('-o', '--format', choices=('dms', 'dm', 'dd', 'locator'),
+    APP.arg('-o', '--format', choices=FORMATS,
             default='dms',
             help='produce output in dms, dm, d format or Maidenhead locator')
     APP.arg('-g', '--string', action='store_true',
             help='display named bearings')
-    APP.arg('-u', '--units', choices=('km', 'sm', 'nm'), metavar='km',
+    APP.arg('-u', '--units', choices=UNITS, metavar='km',
             default='km',
             help='display distances in kilometres(default), statute miles or '
                  'nautical miles')
-    APP.arg('-t', '--time', choices=('h', 'm', 's'), metavar='h', default='h',
+    APP.arg('-t', '--time', choices=TIME_UNITS, metavar='h', default='h',
             help='display time in hours(default), minutes or seconds')
 
     args = APP._parser.parse_args()
@@ -555,6 +835,10 @@ def main():
     else:
         config_locations = read_locations(args.config_file)
 
+    if func is serve:
+        args.config_locations = config_locations
+        return func(args)
+
     try:
         args.locations = NumberedPoints(args.location, args.format,
                                         args.verbose, config_locations,
@@ -0,0 +1,345 @@
+#
+# coding=utf-8
+"""geofence - Point in polygon tests for sets of geofences"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import division
+
+__doc__ += """.
+
+Small fences are tested in a local equirectangular projection, and larger
+fences with great circle edges on the sphere::
+
+    >>> from upoints import (geofence, point)
+    >>> fences = geofence.GeofenceSet()
+    >>> fences['home'] = geofence.Polygon([point.Point(52.0, -0.3),
+    ...                                    point.Point(52.0, -0.1),
+    ...                                    point.Point(52.1, -0.1),
+    ...                                    point.Point(52.1, -0.3)])
+    >>> list(fences.contains([point.Point(52.015, -0.221),
+    ...                       point.Point(52.168, 0.040)]))
+    [['home'], []]
+
+.. versionadded:: 0.13.0
+"""
+
+import math
+
+from upoints import (point, utils)
+
+
+class Polygon(object):
+
+    """Class for representing a closed region on Earth.
+
+    .. versionadded:: 0.13.0
+    """
+
+    #: Largest extent in degrees for which fences are tested in a local
+    #: projection instead of on the sphere
+    planar_limit = 1.0
+
+    def __init__(self, points, name=None, spherical=None, holes=None):
+        """Initialise a new ``Polygon`` object.
+
+        The polygon is closed automatically, so the final location may either
+        repeat the first or not.  Ways from OSM data can be used once their
+        node references are resolved with :meth:`osm.Way.geometry`.
+        Locations within any of ``holes`` are outside of the polygon.
+
+        :type points: ``list`` of :class:`point.Point`
+        :param points: Vertices of the polygon
+        :param str name: Name of the polygon
+        :param bool spherical: Whether to test locations with great circle
+            edges, or ``None`` to choose based on the size of the polygon
+        :type holes: ``list`` of ``list`` of :class:`point.Point`
+        :param holes: Vertices of regions excluded from the polygon
+        :raise ValueError: Less than three vertices in polygon or hole
+        """
+        super(Polygon, self).__init__()
+        points = list(points)
+        if len(points) > 1 and \
+                (points[0].latitude, points[0].longitude) == \
+                (points[-1].latitude, points[-1].longitude):
+            points.pop()
+        if len(points) < 3:
+            raise ValueError('Polygon requires at least three vertices')
+        self.vertices = point.Points(points)
+        self.name = name
+        bounds = point.Bounds(points)
+        if spherical is None:
+            width = (bounds.east - bounds.west) % 360 \
+                * math.cos(math.radians(max(-bounds.south, bounds.north)))
+            spherical = max(bounds.north - bounds.south, width) \
+                > self.planar_limit
+        self.spherical = spherical
+        self.all_longitudes = False
+        if spherical:
+            self._prepare_spherical(bounds)
+        else:
+            self._prepare_planar(bounds)
+        self.bounds = bounds
+        self._holes = [Polygon(hole, spherical=spherical)
+                       for hole in holes or ()]
+        self.holes = [hole.vertices for hole in self._holes]
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``Polygon`` object
+        """
+        return utils.repr_assist(self, {'points': self.vertices[:]})
+
+    @classmethod
+    def from_kml_coordinates(cls, coordinates, name=None, spherical=None):
+        """Create a polygon from a KML ``coordinates`` value.
+
+        :param str coordinates: Whitespace separated longitude, latitude and
+            optional altitude triplets
+        :param str name: Name of the polygon
+        :param bool spherical: Whether to test locations with great circle
+            edges, or ``None`` to choose based on the size of the polygon
+        :rtype: :class:`Polygon`
+        :raise ValueError: Invalid coordinates, or less than three vertices
+        """
+        points = []
+        for chunk in coordinates.split():
+            values = chunk.split(',')
+            points.append(point.Point(float(values[1]), float(values[0])))
+        return cls(points, name, spherical)
+
+    def _prepare_planar(self, bounds):
+        """Project vertices for testing in a local projection.
+
+        :param point.Bounds bounds: Bounding box of the vertices
+        """
+        self._scale = math.cos(math.radians((bounds.south + bounds.north) / 2))
+        self._origin = bounds.west
+        self._edges = []
+        projected = [self._project(i.latitude, i.longitude)
+                     for i in self.vertices]
+        for (x1, y1), (x2, y2) in zip(projected,
+                                      projected[1:] + projected[:1]):
+            if not y1 == y2:
+                self._edges.append((x1, y1, x2, y2, (x2 - x1) / (y2 - y1)))
+
+    def _project(self, latitude, longitude):
+        """Project a location in to the polygon's local projection.
+
+        :param float latitude: Location's latitude
+        :param float longitude: Location's longitude
+        :rtype: ``tuple`` of ``float``
+        :return: Projected x and y co-ordinates
+        """
+        return ((longitude - self._origin) % 360 * self._scale, latitude)
+
+    def _prepare_spherical(self, bounds):
+        """Calculate vectors for testing on the sphere.
+
+        Bounds are extended to include poleward bulges of the edges, and
+        both poles are checked for polygons that enclose them.
+
+        :param point.Bounds bounds: Bounding box of the vertices
+        """
+        self._vectors = [point._unit_vector(i.latitude, i.longitude)
+                         for i in self.vertices]
+        for start, end in zip(self._vectors,
+                              self._vectors[1:] + self._vectors[:1]):
+            for latitude in point._arc_extremes(point.Corridor._segment(start,
+                                                                       end)):
+                bounds.south = min(bounds.south, latitude)
+                bounds.north = max(bounds.north, latitude)
+        if self._winding((0, 0, 1)):
+            bounds.north = 90
+            self.all_longitudes = True
+        if self._winding((0, 0, -1)):
+            bounds.south = -90
+            self.all_longitudes = True
+
+    def _winding(self, vector):
+        """Test whether a unit vector is enclosed by the polygon.
+
+        :param tuple vector: Unit vector to test
+        :rtype: ``bool``
+        :return: Whether the edges wind around the location
+        """
+        px, py, pz = vector
+        total = 0
+        previous = None
+        for ax, ay, az in self._vectors + self._vectors[:1]:
+            # Plane through the location and the vertex
+            current = (py * az - pz * ay, pz * ax - px * az, px * ay - py * ax)
+            if previous:
+                ux, uy, uz = previous
+                vx, vy, vz = current
+                cross = (uy * vz - uz * vy, uz * vx - ux * vz,
+                         ux * vy - uy * vx)
+                total += math.atan2(point._dot(vector, cross),
+                                    point._dot(previous, current))
+            previous = current
+        return abs(total) > math.pi
+
+    def contains(self, latitude, longitude):
+        """Test whether a location is within the polygon.
+
+        :param float latitude: Latitude to test
+        :param float longitude: Longitude to test
+        :rtype: ``bool``
+        """
+        bounds = self.bounds
+        if not bounds.south <= latitude <= bounds.north:
+            return False
+        if not self.all_longitudes and \
+                not bounds.contains_longitude(longitude):
+            return False
+        if self.spherical:
+            inside = self._winding(point._unit_vector(latitude, longitude))
+        else:
+            x, y = self._project(latitude, longitude)
+            inside = False
+            for x1, y1, x2, y2, slope in self._edges:
+                if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * slope:
+                    inside = not inside
+        if inside and self._holes:
+            return not any(hole.contains(latitude, longitude)
+                           for hole in self._holes)
+        return inside
+
+    def __contains__(self, point):
+        return self.contains(point.latitude, point.longitude)
+
+    def box(self):
+        """Bounding box suitable for indexing.
+
+        :rtype: ``tuple``
+        :return: South, north, west and east edges, with ``None`` for
+            longitudes when the polygon covers all longitudes
+        """
+        bounds = self.bounds
+        if self.all_longitudes:
+            return (bounds.south, bounds.north, None, None)
+        return (bounds.south, bounds.north, bounds.west, bounds.east)
+
+
+class GeofenceSet(dict):
+
+    """Class for testing locations against many named polygons.
+
+    Polygons are indexed by their bounding boxes, so each location is only
+    tested against the fences that could contain it.
+
+    .. versionadded:: 0.13.0
+    """
+
+    _index = None
+
+    def __init__(self, fences=None):
+        """Initialise a new ``GeofenceSet`` object.
+
+        :type fences: ``dict`` or ``list`` of ``tuple``
+        :param fences: Names and polygons, or lists of vertices, for fences
+        """
+        super(GeofenceSet, self).__init__()
+        if fences:
+            self.update(fences)
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``GeofenceSet`` object
+        """
+        return utils.repr_assist(self, {'fences': dict(self)})
+
+    def __setitem__(self, key, value):
+        if not isinstance(value, Polygon):
+            value = Polygon(value, key)
+        super(GeofenceSet, self).__setitem__(key, value)
+        self._index = None
+
+    def __delitem__(self, key):
+        super(GeofenceSet, self).__delitem__(key)
+        self._index = None
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        self._index = None
+        return super(GeofenceSet, self).pop(key, *args)
+
+    def popitem(self):
+        self._index = None
+        return super(GeofenceSet, self).popitem()
+
+    def clear(self):
+        self._index = None
+        super(GeofenceSet, self).clear()
+
+    def _build_index(self):
+        """Index fences by grid cells that their bounding boxes overlap.
+
+        :rtype: ``tuple``
+        :return: Keys, polygons and grid index
+        """
+        if self._index is None:
+            keys = list(self.keys())
+            polygons = [dict.__getitem__(self, key) for key in keys]
+            self._index = (keys, polygons,
+                           point._BoxGrid([polygon.box()
+                                           for polygon in polygons]))
+        return self._index
+
+    def fences(self, latitude, longitude):
+        """Find fences containing a location.
+
+        :param float latitude: Latitude to test
+        :param float longitude: Longitude to test
+        :rtype: ``list``
+        :return: Keys of fences containing the location
+        """
+        keys, polygons, grid = self._build_index()
+        return [keys[i] for i in grid.candidates(latitude, longitude)
+                if polygons[i].contains(latitude, longitude)]
+
+    def contains(self, points):
+        """Find fences containing each of several locations.
+
+        Locations without a position, such as :class:`nmea.Fix` objects
+        recorded without a satellite fix, are in no fences.
+
+        :type points: ``list`` of :class:`point.Point`
+        :param points: Locations to test
+        :rtype: ``list`` of ``list``
+        :return: Keys of fences containing each location
+        """
+        keys, polygons, grid = self._build_index()
+        for location in points:
+            latitude = location.latitude
+            longitude = location.longitude
+            if latitude is None or longitude is None:
+                yield []
+                continue
+            yield [keys[i] for i in grid.candidates(latitude, longitude)
+                   if polygons[i].contains(latitude, longitude)]
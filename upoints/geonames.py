@@ -18,6 +18,18 @@
 #
 
 import datetime
+import heapq
+import re
+import unicodedata
+
+from array import array
+from bisect import (bisect_left, bisect_right)
+
+try:
+    import zoneinfo
+except ImportError:  # Python < 3.9
+    #: ``zoneinfo`` module reference if available
+    zoneinfo = None
 
 try:
     from dateutil import tz
@@ -25,7 +37,45 @@ except ImportError:
     #: ``dateutil`` module reference if available
     tz = None
 
-from upoints import (point, trigpoints, utils)
+from upoints import (instrument, point, trigpoints, utils)
+from upoints.compat import (lru_cache, unichr)
+
+
+@lru_cache(maxsize=1024)
+def get_timezone(tzname):
+    """Resolve a time zone name to a shared ``tzinfo`` object.
+
+    Zones are looked up with :mod:`zoneinfo` if available, falling back to
+    ``dateutil``.  Each name is only resolved once, and the same object is
+    returned for every location in a zone.
+
+    :param str tzname: Time zone identifier, such as ``Europe/London``
+    :rtype: ``datetime.tzinfo``
+    :return: Time zone, or ``None`` if it can't be resolved
+
+    .. versionadded:: 0.13.0
+    """
+    if not tzname:
+        return None
+    if zoneinfo:
+        try:
+            return zoneinfo.ZoneInfo(tzname)
+        except (KeyError, ValueError, OSError):
+            pass
+    if tz:
+        return tz.gettz(tzname)
+    return None
+
+
+def _fixed_timezone(offset):
+    """Create a fixed offset time zone.
+
+    :param int offset: Offset from UTC in minutes
+    :rtype: :class:`utils.TzOffset`
+    """
+    hours, minutes = divmod(abs(offset), 60)
+    return utils.TzOffset('%s%02i:%02i' % ('-' if offset < 0 else '+', hours,
+                                           minutes))
 
 
 class Location(trigpoints.Trigpoint):
@@ -37,8 +87,6 @@ class Location(trigpoints.Trigpoint):
 
     .. versionadded:: 0.3.0
 
-    :cvar __TIMEZONES: ``dateutil.gettz`` cache to speed up generation
-
     .. _geonames.org: http://www.geonames.org/
     """
 
@@ -47,9 +95,6 @@ class Location(trigpoints.Trigpoint):
                  'admin3', 'admin4', 'population', 'altitude', 'gtopo30',
                  'tzname', 'modified_date')
 
-    if tz:
-        __TIMEZONES = {}
-
     def __init__(self, geonameid, name, asciiname, alt_names, latitude,
                  longitude, feature_class, feature_code, country, alt_country,
                  admin1, admin2, admin3, admin4, population, altitude, gtopo30,
@@ -80,7 +125,13 @@ class Location(trigpoints.Trigpoint):
         :param str tzname: The timezone identifier using POSIX timezone names
         :param datetime.date modified_date: Location's last modification date
             in the geonames databases
-        :param int timezone: The non-DST timezone offset from UTC in minutes
+        :type timezone: ``int`` or ``datetime.tzinfo``
+        :param timezone: Offset from UTC in minutes, or time zone of location,
+            defaults to the zone named by ``tzname``
+
+        .. versionchanged:: 0.13.0
+           ``timezone`` defaults to a ``datetime.tzinfo`` object, instead of
+           the non-DST offset in minutes
         """
         super(Location, self).__init__(latitude, longitude, altitude, name)
         self.geonameid = geonameid
@@ -102,16 +153,21 @@ class Location(trigpoints.Trigpoint):
         self.gtopo30 = gtopo30
         self.tzname = tzname
         self.modified_date = modified_date
-        if timezone is not None:
-            self.timezone = timezone
-        elif tz:
-            if tzname in Location.__TIMEZONES:
-                self.timezone = Location.__TIMEZONES[tzname]
-            else:
-                self.timezone = int(tz.gettz(tzname)._ttinfo_std.offset / 60)
-                Location.__TIMEZONES[tzname] = self.timezone
-        else:
-            self.timezone = None
+        if timezone is None:
+            timezone = get_timezone(tzname)
+        self.timezone = timezone
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``Location`` object
+        """
+        remap = {}
+        if self.timezone is not None \
+                and self.timezone is get_timezone(self.tzname):
+            remap['timezone'] = None
+        return utils.repr_assist(self, remap)
 
     def __str__(self):
         """Pretty printed location string.
@@ -149,6 +205,8 @@ class Locations(point.Points):
     .. versionadded:: 0.5.1
     """
 
+    point_class = Location
+
     def __init__(self, data=None, tzfile=None):
         """Initialise a new ``Locations`` object."""
         super(Locations, self).__init__()
@@ -163,6 +221,7 @@ class Locations(point.Points):
         if data:
             self.import_locations(data)
 
+    @instrument.instrumented('geonames')
     def import_locations(self, data):
         """Parse geonames.org country database exports.
 
@@ -206,32 +265,9 @@ class Locations(point.Points):
         .. _database export page: http://download.geonames.org/export/dump/
         """
         self._data = data
-        field_names = ('geonameid', 'name', 'asciiname', 'alt_names',
-                       'latitude', 'longitude', 'feature_class',
-                       'feature_code', 'country', 'alt_country', 'admin1',
-                       'admin2', 'admin3', 'admin4', 'population', 'altitude',
-                       'gtopo30', 'tzname', 'modified_date')
-        comma_split = lambda s: s.split(',')
-        date_parse = lambda s: datetime.date(*map(int, s.split('-')))
-        or_none = lambda x, s: x(s) if s else None
-        str_or_none = lambda s: or_none(str, s)
-        float_or_none = lambda s: or_none(float, s)
-        int_or_none = lambda s: or_none(int, s)
-        tz_parse = lambda s: self.timezones[s][0] if self.timezones else None
-        field_parsers = (int_or_none, str_or_none, str_or_none, comma_split,
-                         float_or_none, float_or_none, str_or_none,
-                         str_or_none, str_or_none, comma_split, str_or_none,
-                         str_or_none, str_or_none, str_or_none, int_or_none,
-                         int_or_none, int_or_none, tz_parse, date_parse)
-        data = utils.prepare_csv_read(data, field_names, delimiter=r"	")
-        for row in data:
-            try:
-                for name, parser in zip(field_names, field_parsers):
-                    row[name] = parser(row[name])
-            except ValueError:
-                raise utils.FileFormatError('geonames.org')
-            self.append(Location(**row))
+        self.extend(iter_locations(data, self.timezones))
 
+    @instrument.instrumented('geonames', size=None)
     def import_timezones_file(self, data):
         """Parse geonames.org_ timezone exports.
 
@@ -273,9 +309,266 @@ class Locations(point.Points):
         self.timezones = {}
         for row in data:
             if row['ident'] == 'TimeZoneId':
+                instrument.count('rows_skipped')
                 continue
             try:
                 delta = list(map(time_parse, (row['gmt_offset'], row['dst_offset'])))
             except ValueError:
                 raise utils.FileFormatError('geonames.org')
             self.timezones[row['ident']] = delta
+        instrument.count('rows_parsed', len(self.timezones))
+
+
+#: Characters that require Unicode folding
+_NON_ASCII = re.compile(u'[^\x00-\x7f]')
+
+
+def fold_name(name):
+    """Fold a name for case and diacritic insensitive comparison.
+
+    Characters are decomposed, and their combining marks dropped, so
+    ``Zürich`` and ``ZURICH`` both fold to ``zurich``.  Letters without
+    a decomposition, such as ``ø``, are kept.
+
+    :param unicode name: Name to fold
+    :rtype: ``unicode``
+    :return: Folded name
+
+    .. versionadded:: 0.13.0
+    """
+    if isinstance(name, bytes):
+        name = name.decode('utf-8')
+    if _NON_ASCII.search(name):
+        name = unicodedata.normalize('NFKD', name)
+        name = ''.join(c for c in name if not unicodedata.combining(c))
+        return name.casefold() if hasattr(name, 'casefold') else name.lower()
+    return name.lower()
+
+
+class NameIndex(object):
+
+    """Class for searching locations by name.
+
+    Each location is indexed under its ``name``, ``asciiname`` and
+    ``alt_names`` after folding with :func:`fold_name`, in a sorted array that
+    is searched with :mod:`bisect`.  A tree of maximum populations over the
+    array yields matches in population order, so a short prefix only visits
+    as many entries as are returned instead of every entry it matches.
+
+    .. note::
+       The index is not updated when its locations change.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, locations):
+        """Initialise a new ``NameIndex`` object.
+
+        :type locations: ``list`` of :class:`Location`
+        :param locations: Locations to index
+        """
+        super(NameIndex, self).__init__()
+        self.locations = list(locations)
+        entries = []
+        for number, location in enumerate(self.locations):
+            names = set([location.name, location.asciiname])
+            if location.alt_names:
+                names.update(location.alt_names)
+            for name in set(fold_name(i) for i in names if i):
+                entries.append((name, number))
+        entries.sort()
+        self.keys = [name for name, number in entries]
+        self.entries = array('i', (number for name, number in entries))
+
+        # Leaves hold each entry's population, and branches the largest
+        # population beneath them.  Places without a population sort last.
+        # A list is used, as populations of continents exceed a C int.
+        self._size = size = 1 << max(len(entries) - 1, 0).bit_length()
+        tree = [-2] * (2 * size)
+        populations = [-1 if location.population is None
+                       else location.population
+                       for location in self.locations]
+        tree[size:size + len(entries)] = \
+            [populations[number] for number in self.entries]
+        level = size
+        while level > 1:
+            tree[level // 2:level] = list(map(max, tree[level:2 * level:2],
+                                              tree[level + 1:2 * level:2]))
+            level //= 2
+        self._tree = tree
+
+    def __len__(self):
+        """Number of indexed names.
+
+        :rtype: ``int``
+        """
+        return len(self.keys)
+
+    def _ranked(self, low, high):
+        """Generate entries from a range in descending population order.
+
+        :param int low: First entry in the range
+        :param int high: Entry after the end of the range
+        :rtype: ``generator`` of ``int``
+        :return: Location numbers, which may repeat
+        """
+        tree = self._tree
+        size = self._size
+        heap = []
+        # Cover the range with the fewest whole subtrees
+        low += size
+        high += size
+        while low < high:
+            if low & 1:
+                heap.append((-tree[low], low))
+                low += 1
+            if high & 1:
+                high -= 1
+                heap.append((-tree[high], high))
+            low >>= 1
+            high >>= 1
+        heapq.heapify(heap)
+        while heap:
+            node = heapq.heappop(heap)[1]
+            if node >= size:
+                yield self.entries[node - size]
+            else:
+                for child in (2 * node, 2 * node + 1):
+                    heapq.heappush(heap, (-tree[child], child))
+
+    def _matches(self, low, high, country, feature_class, limit):
+        """Find locations from a range of entries.
+
+        :param int low: First entry in the range
+        :param int high: Entry after the end of the range
+        :param str country: Country code to restrict matches to
+        :param str feature_class: Feature class to restrict matches to
+        :param int limit: Maximum number of matches, or ``None`` for all
+        :rtype: ``list`` of :class:`Location`
+        :return: Matching locations, ordered by descending population
+        """
+        seen = set()
+        matches = []
+        if limit is not None and limit < 1:
+            return matches
+        for number in self._ranked(low, high):
+            if number in seen:
+                continue
+            seen.add(number)
+            location = self.locations[number]
+            if country and not location.country == country:
+                continue
+            if feature_class and not location.feature_class == feature_class:
+                continue
+            matches.append(location)
+            if len(matches) == limit:
+                break
+        return matches
+
+    def lookup(self, name, country=None, feature_class=None, limit=None):
+        """Find locations with a given name.
+
+        :param unicode name: Name to find
+        :param str country: Country code to restrict matches to
+        :param str feature_class: Feature class to restrict matches to
+        :param int limit: Maximum number of matches, or ``None`` for all
+        :rtype: ``list`` of :class:`Location`
+        :return: Matching locations, ordered by descending population
+        """
+        name = fold_name(name)
+        return self._matches(bisect_left(self.keys, name),
+                             bisect_right(self.keys, name), country,
+                             feature_class, limit)
+
+    def search(self, prefix, country=None, feature_class=None, limit=10):
+        """Find locations with names starting with a prefix.
+
+        :param unicode prefix: Start of names to find
+        :param str country: Country code to restrict matches to
+        :param str feature_class: Feature class to restrict matches to
+        :param int limit: Maximum number of matches, or ``None`` for all
+        :rtype: ``list`` of :class:`Location`
+        :return: Matching locations, ordered by descending population
+        """
+        prefix = fold_name(prefix)
+        low = bisect_left(self.keys, prefix)
+        if prefix:
+            # All names with the prefix sort before its successor
+            successor = prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+            high = bisect_left(self.keys, successor, low)
+        else:
+            high = len(self.keys)
+        return self._matches(low, high, country, feature_class, limit)
+
+
+def iter_locations(data, timezones=None, predicate=None, bbox=None):
+    """Lazily parse geonames.org country database exports.
+
+    Rows outside of ``bbox`` are rejected once their location has been
+    parsed, before the remaining fields are converted.  The record passed to
+    ``predicate`` contains the keyword arguments of :class:`Location`.
+
+    :type data: ``file``, ``list`` or ``str``
+    :param data: geonames.org locations data to read
+    :param dict timezones: Timezone identifiers with their UTC offsets, as
+        produced by :meth:`Locations.import_timezones_file`, used for zones
+        that :func:`get_timezone` can't resolve
+    :param function predicate: Function called with each row's parsed
+        fields, returning ``False`` for rows to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select rows from
+    :rtype: ``generator`` of :class:`Location`
+    :return: Matching locations
+    :raise FileFormatError: Unknown file format
+
+    .. versionadded:: 0.13.0
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    field_names = ('geonameid', 'name', 'asciiname', 'alt_names',
+                   'latitude', 'longitude', 'feature_class', 'feature_code',
+                   'country', 'alt_country', 'admin1', 'admin2', 'admin3',
+                   'admin4', 'population', 'altitude', 'gtopo30', 'tzname',
+                   'modified_date')
+    comma_split = lambda s: s.split(',')
+    date_parse = lambda s: datetime.date(*map(int, s.split('-')))
+    or_none = lambda x, s: x(s) if s else None
+    str_or_none = lambda s: or_none(str, s)
+    float_or_none = lambda s: or_none(float, s)
+    int_or_none = lambda s: or_none(int, s)
+    zones = {}
+
+    def tz_parse(tzname):
+        # Each zone is resolved once, and shared between locations
+        try:
+            return zones[tzname]
+        except KeyError:
+            zone = get_timezone(tzname)
+            if zone is None and timezones and tzname in timezones:
+                # Without zone rules only the standard offset is known
+                zone = _fixed_timezone(timezones[tzname][0])
+            zones[tzname] = zone
+            return zone
+    # Location is parsed first so that rows may be rejected early
+    field_parsers = (('geonameid', int_or_none), ('name', str_or_none),
+                     ('asciiname', str_or_none), ('alt_names', comma_split),
+                     ('feature_class', str_or_none),
+                     ('feature_code', str_or_none), ('country', str_or_none),
+                     ('alt_country', comma_split), ('admin1', str_or_none),
+                     ('admin2', str_or_none), ('admin3', str_or_none),
+                     ('admin4', str_or_none), ('population', int_or_none),
+                     ('altitude', int_or_none), ('gtopo30', int_or_none),
+                     ('tzname', str_or_none), ('modified_date', date_parse))
+    data = utils.prepare_csv_read(data, field_names, delimiter=r"	")
+    for row in data:
+        try:
+            row['latitude'] = float_or_none(row['latitude'])
+            row['longitude'] = float_or_none(row['longitude'])
+            if not filters.in_bbox(row['latitude'], row['longitude']):
+                continue
+            for name, parser in field_parsers:
+                row[name] = parser(row[name])
+        except ValueError:
+            raise utils.FileFormatError('geonames.org')
+        row['timezone'] = tz_parse(row['tzname'])
+        if filters.matches(row):
+            yield Location(**row)
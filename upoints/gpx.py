@@ -19,11 +19,9 @@
 
 import time
 
-from operator import attrgetter
-
 from lxml import etree
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 from upoints._version import web as ua_string
 
 
@@ -38,6 +36,9 @@ GPX_ELEM_ATTRIB = {
     '{http://www.w3.org/2001/XMLSchema-instance}schemaLocation': '%s http://www.topografix.com/GPX/1/1/gpx.xsd' % GPX_NS,
 }
 
+#: Count points in a segmented collection, for instrumentation
+_point_count = lambda segments: sum(len(segment) for segment in segments)
+
 class _GpxElem(point.TimedPoint):
 
     """Abstract class for representing an element from GPX data files.
@@ -85,6 +86,26 @@ class _GpxElem(point.TimedPoint):
             text.append('[%s]' % self.description)
         return ' '.join(text)
 
+    @classmethod
+    def parse_elem(cls, element):
+        """Parse a GPX point element.
+
+        :param etree.Element element: XML Element to parse
+        :rtype: ``_GpxElem``
+        :return: Object of the calling class representing parsed element
+
+        .. versionadded:: 0.13.0
+        """
+        texts = utils.child_texts(element)
+        elevation = texts.get('ele')
+        if elevation is not None:
+            elevation = float(elevation)
+        time = texts.get('time')
+        if time is not None:
+            time = utils.Timestamp.parse_isoformat(time)
+        return cls(element.get('lat'), element.get('lon'), texts.get('name'),
+                   texts.get('desc'), elevation, time)
+
     def togpx(self):
         """Generate a GPX waypoint element subtree.
 
@@ -120,6 +141,23 @@ class _SegWrap(list):
         if gpx_file:
             self.import_locations(gpx_file)
 
+    @property
+    def bounds(self):
+        """Bounding box of the locations in all segments.
+
+        .. seealso::
+
+           :attr:`point.Points.bounds`
+
+        :rtype: :class:`point.Bounds`
+
+        .. versionadded:: 0.13.0
+        """
+        bounds = point.Bounds()
+        for segment in self:
+            bounds.update(segment.bounds)
+        return bounds
+
     def distance(self, method='haversine'):
         """Calculate distances between locations in segments.
 
@@ -207,6 +245,26 @@ class _SegWrap(list):
         """
         return (segment.range(location, distance) for segment in self)
 
+    def within_corridor(self, route, distance):
+        """Find locations within a given distance of a route.
+
+        .. seealso::
+
+           :meth:`point.Points.within_corridor`
+
+        :type route: ``list`` of :class:`Point`, or :class:`point.Corridor`
+        :param route: Locations, or segments of locations, forming the route
+        :param float distance: Distance in kilometres
+        :rtype: ``list`` of ``list`` of ``Point`` objects within ``distance``
+            of ``route``
+        :return: Groups of points near the route per segment
+
+        .. versionadded:: 0.13.0
+        """
+        if not isinstance(route, point.Corridor):
+            route = point.Corridor(route, distance)
+        return (segment.within_corridor(route, distance) for segment in self)
+
     def destination(self, bearing, distance):
         """Calculate destination locations for given distance and bearings.
 
@@ -267,6 +325,53 @@ class _SegWrap(list):
         """
         return (segment.speed() for segment in self)
 
+    def track_stats(self, stop_speed=1):
+        """Calculate leg statistics per segment.
+
+        .. seealso::
+
+           :meth:`point.TimedPoints.track_stats`
+
+        :param float stop_speed: Speed below which a leg is treated as stopped
+        :rtype: ``generator`` of ``dict``
+        :return: Statistics for each segment
+
+        .. versionadded:: 0.13.0
+        """
+        return (segment.track_stats(stop_speed) for segment in self)
+
+    def resample(self, every_km=None, every_seconds=None):
+        """Resample locations at fixed intervals per segment.
+
+        .. seealso::
+
+           :meth:`point.TimedPoints.resample`
+
+        :param float every_km: Distance between samples in kilometres
+        :param float every_seconds: Time between samples in seconds
+        :rtype: ``generator`` of :class:`point.TimedPoints`
+        :return: Evenly spaced locations for each segment
+
+        .. versionadded:: 0.13.0
+        """
+        return (segment.resample(every_km, every_seconds)
+                for segment in self)
+
+    def densify(self, max_segment_km):
+        """Add locations so that no leg exceeds a given length per segment.
+
+        .. seealso::
+
+           :meth:`point.Points.densify`
+
+        :param float max_segment_km: Maximum length of a leg in kilometres
+        :rtype: ``generator`` of :class:`point.TimedPoints`
+        :return: Locations with additional points inserted in long legs
+
+        .. versionadded:: 0.13.0
+        """
+        return (segment.densify(max_segment_km) for segment in self)
+
 
 class _GpxMeta(object):
 
@@ -307,9 +412,14 @@ class _GpxMeta(object):
         self.bounds = bounds
         self.extensions = extensions
 
-    def togpx(self):
+    def togpx(self, bounds=None):
         """Generate a GPX metadata element subtree.
 
+        .. versionchanged:: 0.13.0
+           ``bounds`` argument added
+
+        :type bounds: :class:`point.Bounds`
+        :param bounds: Area to use if :attr:`bounds` is not set
         :rtype: :class:`etree.Element`
         :return: GPX metadata element
         """
@@ -362,17 +472,13 @@ class _GpxMeta(object):
         if self.keywords:
             metadata.append(create_elem('keywords', text=self.keywords))
         if self.bounds:
-            if not isinstance(self.bounds, dict):
-                latitudes = list(map(attrgetter('latitude'), self.bounds))
-                longitudes = list(map(attrgetter('longitude'), self.bounds))
-                bounds = {
-                    'minlat': str(min(latitudes)),
-                    'maxlat': str(max(latitudes)),
-                    'minlon': str(min(longitudes)),
-                    'maxlon': str(max(longitudes)),
-                }
-            else:
-                bounds = dict((k, str(v)) for k, v in self.bounds.items())
+            bounds = self.bounds
+        if bounds:
+            if isinstance(bounds, point.Bounds):
+                bounds = bounds.as_dict()
+            elif not isinstance(bounds, dict):
+                bounds = point.Bounds(bounds).as_dict()
+            bounds = dict((k, str(v)) for k, v in bounds.items())
             metadata.append(create_elem('bounds', bounds))
         if self.extensions:
             element = create_elem('extensions')
@@ -449,6 +555,8 @@ class Waypoints(point.TimedPoints):
     .. versionadded:: 0.8.0
     """
 
+    point_class = Waypoint
+
     def __init__(self, gpx_file=None, metadata=None):
         """Initialise a new ``Waypoints`` object."""
         super(Waypoints, self).__init__()
@@ -457,6 +565,7 @@ class Waypoints(point.TimedPoints):
         if gpx_file:
             self.import_locations(gpx_file)
 
+    @instrument.instrumented('gpx')
     def import_locations(self, gpx_file):
         """Import GPX data files.
 
@@ -481,7 +590,7 @@ class Waypoints(point.TimedPoints):
               </wpt>
             </gpx>
 
-        The reader uses the :mod:`ElementTree` module, so should be very fast
+        The reader uses :func:`utils.iterparse_xml`, so should be very fast
         when importing data.  The above file processed by ``import_locations()``
         will return the following ``list`` object::
 
@@ -496,34 +605,13 @@ class Waypoints(point.TimedPoints):
         .. _GPX 1.1 Schema Documentation: http://www.topografix.com/GPX/1/1/
         """
         self._gpx_file = gpx_file
-        data = utils.prepare_xml_read(gpx_file, objectify=True)
-
-        try:
-            self.metadata.import_metadata(data.metadata)
-        except AttributeError:
-            pass
-
-        for waypoint in data.wpt:
-            latitude = waypoint.get('lat')
-            longitude = waypoint.get('lon')
-            try:
-                name = waypoint.name.text
-            except AttributeError:
-                name = None
-            try:
-                description = waypoint.desc.text
-            except AttributeError:
-                description = None
-            try:
-                elevation = float(waypoint.ele.text)
-            except AttributeError:
-                elevation = None
-            try:
-                time = utils.Timestamp.parse_isoformat(waypoint.time.text)
-            except AttributeError:
-                time = None
-            self.append(Waypoint(latitude, longitude, name, description,
-                                 elevation, time))
+
+        def add_point(element):
+            self.append(Waypoint.parse_elem(element))
+
+        utils.iterparse_xml(gpx_file,
+                            {'gpx/metadata': self.metadata.import_metadata,
+                             'gpx/wpt': add_point})
 
     def export_gpx_file(self):
         """Generate GPX element tree from ``Waypoints`` object.
@@ -532,9 +620,7 @@ class Waypoints(point.TimedPoints):
         :return: GPX element tree depicting ``Waypoints`` object
         """
         gpx = create_elem('gpx', GPX_ELEM_ATTRIB)
-        if not self.metadata.bounds:
-            self.metadata.bounds = self[:]
-        gpx.append(self.metadata.togpx())
+        gpx.append(self.metadata.togpx(self.bounds))
         for place in self:
             gpx.append(place.togpx())
 
@@ -564,6 +650,7 @@ class Trackpoints(_SegWrap):
     .. versionadded:: 0.10.0
     """
 
+    @instrument.instrumented('gpx', _point_count)
     def import_locations(self, gpx_file):
         """Import GPX data files.
 
@@ -592,7 +679,7 @@ class Trackpoints(_SegWrap):
               </trk>
             </gpx>
 
-        The reader uses the :mod:`ElementTree` module, so should be very fast
+        The reader uses :func:`utils.iterparse_xml`, so should be very fast
         when importing data.  The above file processed by ``import_locations()``
         will return the following ``list`` object::
 
@@ -607,37 +694,17 @@ class Trackpoints(_SegWrap):
         .. _GPX 1.1 Schema Documentation: http://www.topografix.com/GPX/1/1/
         """
         self._gpx_file = gpx_file
-        data = utils.prepare_xml_read(gpx_file, objectify=True)
-
-        try:
-            self.metadata.import_metadata(data.metadata)
-        except AttributeError:
-            pass
-
-        for segment in data.trk.trkseg:
-            points = point.TimedPoints()
-            for trackpoint in segment.trkpt:
-                latitude = trackpoint.get('lat')
-                longitude = trackpoint.get('lon')
-                try:
-                    name = trackpoint.name.text
-                except AttributeError:
-                    name = None
-                try:
-                    description = trackpoint.desc.text
-                except AttributeError:
-                    description = None
-                try:
-                    elevation = float(trackpoint.ele.text)
-                except AttributeError:
-                    elevation = None
-                try:
-                    time = utils.Timestamp.parse_isoformat(trackpoint.time.text)
-                except AttributeError:
-                    time = None
-                points.append(Trackpoint(latitude, longitude, name,
-                                         description, elevation, time))
-            self.append(points)
+
+        def add_segment(element):
+            self.append(point.TimedPoints())
+
+        def add_point(element):
+            self[-1].append(Trackpoint.parse_elem(element))
+
+        utils.iterparse_xml(gpx_file,
+                            {'gpx/metadata': self.metadata.import_metadata,
+                             'gpx/trk/trkseg/trkpt': add_point},
+                            {'gpx/trk/trkseg': add_segment})
 
     def export_gpx_file(self):
         """Generate GPX element tree from ``Trackpoints``.
@@ -646,9 +713,7 @@ class Trackpoints(_SegWrap):
         :return: GPX element tree depicting ``Trackpoints`` objects
         """
         gpx = create_elem('gpx', GPX_ELEM_ATTRIB)
-        if not self.metadata.bounds:
-            self.metadata.bounds = [j for i in self for j in i]
-        gpx.append(self.metadata.togpx())
+        gpx.append(self.metadata.togpx(self.bounds))
         track = create_elem('trk')
         gpx.append(track)
         for segment in self:
@@ -683,6 +748,7 @@ class Routepoints(_SegWrap):
     .. versionadded:: 0.10.0
     """
 
+    @instrument.instrumented('gpx', _point_count)
     def import_locations(self, gpx_file):
         """Import GPX data files.
 
@@ -709,7 +775,7 @@ class Routepoints(_SegWrap):
               </rte>
             </gpx>
 
-        The reader uses the :mod:`ElementTree` module, so should be very fast
+        The reader uses :func:`utils.iterparse_xml`, so should be very fast
         when importing data.  The above file processed by ``import_locations()``
         will return the following ``list`` object::
 
@@ -724,37 +790,17 @@ class Routepoints(_SegWrap):
         .. _GPX 1.1 Schema Documentation: http://www.topografix.com/GPX/1/1/
         """
         self._gpx_file = gpx_file
-        data = utils.prepare_xml_read(gpx_file, objectify=True)
-
-        try:
-            self.metadata.import_metadata(data.metadata)
-        except AttributeError:
-            pass
-
-        for route in data.rte:
-            points = point.TimedPoints()
-            for routepoint in route.rtept:
-                latitude = routepoint.get('lat')
-                longitude = routepoint.get('lon')
-                try:
-                    name = routepoint.name.text
-                except AttributeError:
-                    name = None
-                try:
-                    description = routepoint.desc.text
-                except AttributeError:
-                    description = None
-                try:
-                    elevation = float(routepoint.ele.text)
-                except AttributeError:
-                    elevation = None
-                try:
-                    time = utils.Timestamp.parse_isoformat(routepoint.time.text)
-                except AttributeError:
-                    time = None
-                points.append(Routepoint(latitude, longitude, name,
-                                         description, elevation, time))
-            self.append(points)
+
+        def add_segment(element):
+            self.append(point.TimedPoints())
+
+        def add_point(element):
+            self[-1].append(Routepoint.parse_elem(element))
+
+        utils.iterparse_xml(gpx_file,
+                            {'gpx/metadata': self.metadata.import_metadata,
+                             'gpx/rte/rtept': add_point},
+                            {'gpx/rte': add_segment})
 
     def export_gpx_file(self):
         """Generate GPX element tree from :class:`Routepoints`
@@ -763,9 +809,7 @@ class Routepoints(_SegWrap):
         :return: GPX element tree depicting :class:`Routepoints` objects
         """
         gpx = create_elem('gpx', GPX_ELEM_ATTRIB)
-        if not self.metadata.bounds:
-            self.metadata.bounds = [j for i in self for j in i]
-        gpx.append(self.metadata.togpx())
+        gpx.append(self.metadata.togpx(self.bounds))
         for rte in self:
             chunk = create_elem('rte')
             gpx.append(chunk)
@@ -0,0 +1,270 @@
+#
+# coding=utf-8
+"""instrument - Opt-in timers and counters for dataset importers"""
+# Copyright © 2007-2014  James Rowe <jnrowe@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+__doc__ += """.
+
+Instrumentation is disabled by default, and the hooks in the importers reduce
+to a single attribute check until it is switched on::
+
+    >>> from upoints import (instrument, xearth)
+    >>> instrument.enable()
+    >>> markers = xearth.Xearths(['# Comment', '52.015 -0.221 "Home"'])
+    >>> counters = instrument.as_dict()['counters']
+    >>> counters['xearth.rows_parsed'], counters['xearth.rows_skipped']
+    (1, 1)
+    >>> instrument.disable()
+    >>> instrument.reset()
+
+Counter and timer names are grouped by the data source that recorded them,
+such as ``nmea`` or ``gpx``.  Sources record ``rows_parsed``,
+``rows_skipped``, ``bytes_read`` and, for NMEA data, ``checksum_failures``
+counters along with ``import`` and ``parse`` timers.
+
+.. versionadded:: 0.13.0
+"""
+
+import re
+import threading
+
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    from time import perf_counter as _clock
+except ImportError:  # Python 2
+    from time import time as _clock
+
+
+class Registry(object):
+
+    """Class for storing named counters and timers.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self):
+        """Initialise a new ``Registry`` object."""
+        self.enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        """Start recording values."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording values."""
+        self.enabled = False
+
+    def reset(self):
+        """Discard all recorded values."""
+        with self._lock:
+            self.counters = {}
+            self.timers = {}
+
+    @property
+    def source(self):
+        """Data source currently being imported in this thread.
+
+        :rtype: ``str``
+        """
+        return getattr(self._local, 'source', None) or 'upoints'
+
+    @source.setter
+    def source(self, value):
+        self._local.source = value
+
+    def count(self, name, value=1, source=None):
+        """Increment a counter.
+
+        :param str name: Counter name
+        :param int value: Amount to add
+        :param str source: Data source, defaults to the active source
+        """
+        if not self.enabled:
+            return
+        key = (source or self.source, name)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_time(self, name, seconds, source=None):
+        """Record a timing.
+
+        :param str name: Timer name
+        :param float seconds: Elapsed wall time
+        :param str source: Data source, defaults to the active source
+        """
+        if not self.enabled:
+            return
+        key = (source or self.source, name)
+        with self._lock:
+            calls, total = self.timers.get(key, (0, 0))
+            self.timers[key] = (calls + 1, total + seconds)
+
+    def timer(self, name, source=None):
+        """Context manager to time a block of code.
+
+        :param str name: Timer name
+        :param str source: Data source, defaults to the active source
+        :rtype: ``contextmanager``
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name, source)
+
+    @contextmanager
+    def _timer(self, name, source):
+        start = _clock()
+        try:
+            yield
+        finally:
+            self.add_time(name, _clock() - start, source)
+
+    def as_dict(self):
+        """Export recorded values.
+
+        :rtype: ``dict``
+        :return: ``counters`` mapping names to values, and ``timers``
+            mapping names to call counts and total seconds
+        """
+        with self._lock:
+            return {
+                'counters': dict(('%s.%s' % key, value)
+                                 for key, value in self.counters.items()),
+                'timers': dict(('%s.%s' % key,
+                                {'count': calls, 'seconds': total})
+                               for key, (calls, total)
+                               in self.timers.items()),
+            }
+
+    def prometheus(self, prefix='upoints'):
+        """Export recorded values in Prometheus text format.
+
+        :param str prefix: Prefix for metric names
+        :rtype: ``str``
+        :return: Prometheus exposition format metrics
+        """
+        with self._lock:
+            counters = sorted(self.counters.items(),
+                              key=lambda x: (x[0][1], x[0][0]))
+            timers = sorted(self.timers.items(),
+                            key=lambda x: (x[0][1], x[0][0]))
+        lines = []
+        metric = None
+        for (source, name), value in counters:
+            if not name == metric:
+                metric = name
+                lines.append('# TYPE %s_%s_total counter'
+                             % (prefix, _metric_name(name)))
+            lines.append('%s_%s_total{source="%s"} %d'
+                         % (prefix, _metric_name(name), source, value))
+        metric = None
+        for (source, name), (calls, total) in timers:
+            if not name == metric:
+                metric = name
+                lines.append('# TYPE %s_%s_seconds summary'
+                             % (prefix, _metric_name(name)))
+            lines.append('%s_%s_seconds_count{source="%s"} %d'
+                         % (prefix, _metric_name(name), source, calls))
+            lines.append('%s_%s_seconds_sum{source="%s"} %r'
+                         % (prefix, _metric_name(name), source, total))
+        return ''.join('%s\n' % line for line in lines)
+
+
+def _metric_name(name):
+    """Sanitise a name for use in Prometheus output.
+
+    :param str name: Counter or timer name
+    :rtype: ``str``
+    """
+    return re.sub('[^a-zA-Z0-9_]', '_', name)
+
+
+class _NullTimer(object):
+
+    """Do nothing context manager used when instrumentation is disabled."""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+#: Default registry, updated by the :mod:`upoints` importers
+REGISTRY = Registry()
+
+enable = REGISTRY.enable
+disable = REGISTRY.disable
+reset = REGISTRY.reset
+count = REGISTRY.count
+timer = REGISTRY.timer
+as_dict = REGISTRY.as_dict
+prometheus = REGISTRY.prometheus
+
+
+def instrumented(source, size=len):
+    """Decorator to instrument an ``import_locations()`` style method.
+
+    When instrumentation is enabled the method is timed under the ``import``
+    timer, the counters it updates are recorded against ``source``, and the
+    number of entries it adds are recorded in the ``rows_parsed`` counter.
+
+    :param str source: Data source name
+    :param size: Function to count entries in the instance, or ``None`` if
+        the method records ``rows_parsed`` itself
+    :rtype: ``function``
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(self, *args, **kwargs)
+            parent = getattr(REGISTRY._local, 'source', None)
+            REGISTRY.source = source
+            before = size(self) if size else 0
+            start = _clock()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                REGISTRY.add_time('import', _clock() - start)
+                if size:
+                    REGISTRY.count('rows_parsed', size(self) - before)
+                REGISTRY.source = parent
+        return wrapper
+    return decorator
+
+
+def counted_lines(lines):
+    """Count the size of lines as they are consumed.
+
+    :param iter lines: Lines to pass through
+    :rtype: ``generator``
+    :return: Unchanged lines, with their total length recorded in the
+        ``bytes_read`` counter once exhausted
+    """
+    total = 0
+    try:
+        for line in lines:
+            total += len(line)
+            yield line
+    finally:
+        REGISTRY.count('bytes_read', total)
@@ -21,7 +21,7 @@ import logging
 
 from lxml import etree
 
-from upoints import (point, trigpoints, utils)
+from upoints import (geofence, instrument, point, trigpoints, utils)
 
 KML_NS = 'http://earth.google.com/kml/2.2'
 etree.register_namespace('kml', KML_NS)
@@ -29,6 +29,31 @@ etree.register_namespace('kml', KML_NS)
 create_elem = utils.element_creator(KML_NS)
 
 
+def _tag(name):
+    """Qualify a tag name with the KML namespace.
+
+    :param str name: Local tag name
+    :rtype: ``str``
+    """
+    return '{%s}%s' % (KML_NS, name)
+
+
+def _format_coordinates(location):
+    """Format a location as a KML coordinate tuple.
+
+    :param trigpoints.Trigpoint location: Location to format
+    :rtype: ``str``
+    """
+    data = [str(location.longitude), str(location.latitude)]
+    altitude = getattr(location, 'altitude', None)
+    if altitude:
+        if int(altitude) == altitude:
+            data.append('%i' % altitude)
+        else:
+            data.append(str(altitude))
+    return ','.join(data)
+
+
 class Placemark(trigpoints.Trigpoint):
 
     """Class for representing a Placemark element from KML data files.
@@ -80,19 +105,355 @@ class Placemark(trigpoints.Trigpoint):
             placemark.description = create_elem('description',
                                                 text=self.description)
         placemark.Point = create_elem('Point')
-
-        data = [str(self.longitude), str(self.latitude)]
-        if self.altitude:
-            if int(self.altitude) == self.altitude:
-                data.append('%i' % self.altitude)
-            else:
-                data.append(str(self.altitude))
+        coordinates = _format_coordinates(self)
         placemark.Point.coordinates = create_elem('coordinates',
-                                                  text=','.join(data))
+                                                  text=coordinates)
 
         return placemark
 
 
+class LineString(point.Points):
+
+    """Class for representing a LineString or LinearRing from KML data files.
+
+    .. versionadded:: 0.13.0
+    """
+
+    point_class = trigpoints.Trigpoint
+
+    def __init__(self, points=None, name=None, description=None):
+        """Initialise a new ``LineString`` object.
+
+        :type points: ``list`` of :class:`trigpoints.Trigpoint`
+        :param points: Vertices of the line
+        :param str name: Name for line
+        :param str description: Line's description
+        """
+        super(LineString, self).__init__(points)
+        self.name = name
+        self.description = description
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``LineString`` object
+        """
+        return utils.repr_assist(self, {'points': self[:]})
+
+
+class Polygon(object):
+
+    """Class for representing a Polygon from KML data files.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, outer=None, inner=None, name=None, description=None):
+        """Initialise a new ``Polygon`` object.
+
+        :param LineString outer: Outer boundary of polygon
+        :type inner: ``list`` of :class:`LineString`
+        :param inner: Boundaries of holes in polygon
+        :param str name: Name for polygon
+        :param str description: Polygon's description
+        """
+        super(Polygon, self).__init__()
+        self.outer = outer
+        self.inner = inner if inner else []
+        self.name = name
+        self.description = description
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``Polygon`` object
+        """
+        return utils.repr_assist(self)
+
+    def to_geofence(self, spherical=None):
+        """Create a geofence from the polygon.
+
+        Locations within the inner boundaries are outside of the geofence.
+
+        :param bool spherical: Whether to test locations with great circle
+            edges, or ``None`` to choose based on the size of the polygon
+        :rtype: :class:`geofence.Polygon`
+        :return: Geofence for testing locations against the polygon
+        :raise ValueError: No outer boundary, or less than three vertices in
+            a boundary
+        """
+        if self.outer is None:
+            raise ValueError('Polygon has no outer boundary')
+        return geofence.Polygon(self.outer, self.name, spherical, self.inner)
+
+
+class MultiGeometry(list):
+
+    """Class for representing a MultiGeometry from KML data files.
+
+    Members are :class:`trigpoints.Trigpoint` objects for ``Point``
+    elements, or :class:`LineString`, :class:`Polygon` and
+    :class:`MultiGeometry` objects.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, geometries=None, name=None, description=None):
+        """Initialise a new ``MultiGeometry`` object.
+
+        :param list geometries: Member geometries
+        :param str name: Name for geometry collection
+        :param str description: Geometry collection's description
+        """
+        super(MultiGeometry, self).__init__()
+        if geometries:
+            self.extend(geometries)
+        self.name = name
+        self.description = description
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``MultiGeometry`` object
+        """
+        return utils.repr_assist(self, {'geometries': self[:]})
+
+
+class _CoordinateReader(object):
+
+    """Incremental parser for the text of ``coordinates`` elements.
+
+    Text is consumed in chunks as the XML parser produces it, with any
+    coordinate tuple split across chunks held back until it is complete.
+    """
+
+    def __init__(self):
+        """Initialise a new ``_CoordinateReader`` object."""
+        super(_CoordinateReader, self).__init__()
+        self.points = []
+        self._tail = ''
+
+    def feed(self, text):
+        """Parse a chunk of text.
+
+        :param str text: Text to parse
+        """
+        text = self._tail + text
+        chunks = text.split()
+        if chunks and not text[-1].isspace():
+            self._tail = chunks.pop()
+        else:
+            self._tail = ''
+        self._add(chunks)
+
+    def close(self):
+        """Parse any remaining text.
+
+        :rtype: ``list`` of :class:`trigpoints.Trigpoint`
+        :return: Parsed vertices
+        """
+        if self._tail:
+            self._add([self._tail])
+            self._tail = ''
+        return self.points
+
+    def _add(self, chunks):
+        """Convert coordinate tuples to locations.
+
+        :type chunks: ``list`` of ``str``
+        :param chunks: Longitude, latitude and optional altitude tuples
+        :raise ValueError: Invalid coordinate tuple
+        """
+        append = self.points.append
+        for chunk in chunks:
+            values = chunk.split(',')
+            if len(values) == 2:
+                append(trigpoints.Trigpoint(float(values[1]),
+                                            float(values[0]), None))
+            elif len(values) == 3:
+                append(trigpoints.Trigpoint(float(values[1]),
+                                            float(values[0]),
+                                            float(values[2])))
+            else:
+                raise ValueError('Unable to handle coordinates value %r'
+                                 % values)
+
+
+class _PlacemarkTarget(object):
+
+    """Parser target for streaming import of KML placemarks.
+
+    Elements are handled as the parser encounters them, and no tree is built
+    so memory use is independent of the size of the document.
+    """
+
+    def __init__(self, placemarks):
+        """Initialise a new ``_PlacemarkTarget`` object.
+
+        :param Placemarks placemarks: Object to add placemarks to
+        """
+        super(_PlacemarkTarget, self).__init__()
+        self._placemarks = placemarks
+        self._tags = []
+        self._place = None
+        self._text = None
+        self._coordinates = None
+        self._vertices = None
+        self._geometries = []
+
+    def start(self, tag, attrib):
+        tag = utils.local_name(tag)
+        parent = self._tags[-1] if self._tags else None
+        self._tags.append(tag)
+        if tag == 'Placemark':
+            self._place = {'name': None, 'description': None,
+                           'geometry': None}
+        elif self._place is None:
+            return
+        elif tag in ('name', 'description') and parent == 'Placemark':
+            self._text = []
+        elif tag == 'coordinates':
+            self._coordinates = _CoordinateReader()
+        elif tag == 'Polygon':
+            self._geometries.append(Polygon())
+        elif tag == 'MultiGeometry':
+            self._geometries.append(MultiGeometry())
+
+    def data(self, data):
+        if self._coordinates is not None:
+            self._coordinates.feed(data)
+        elif self._text is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        tag = self._tags.pop()
+        if self._place is None:
+            return
+        elif self._text is not None:
+            self._place[tag] = ''.join(self._text)
+            self._text = None
+        elif tag == 'coordinates':
+            self._vertices = self._coordinates.close()
+            self._coordinates = None
+        elif tag == 'Point':
+            if self._vertices:
+                self._add(self._vertices[0])
+            self._vertices = None
+        elif tag == 'LineString':
+            self._add(LineString(self._vertices))
+            self._vertices = None
+        elif tag == 'LinearRing':
+            ring = LineString(self._vertices)
+            self._vertices = None
+            parent = self._tags[-1]
+            if parent == 'innerBoundaryIs':
+                self._geometries[-1].inner.append(ring)
+            elif parent == 'outerBoundaryIs':
+                self._geometries[-1].outer = ring
+            else:
+                # A ring outside of a polygon is just a closed line
+                self._add(ring)
+        elif tag in ('Polygon', 'MultiGeometry'):
+            self._add(self._geometries.pop())
+        elif tag == 'Placemark':
+            self._placemarks._add_placemark(**self._place)
+            self._place = None
+
+    def _add(self, geometry):
+        """Attach a completed geometry to its parent.
+
+        :param geometry: Completed geometry
+        """
+        if self._geometries and \
+                isinstance(self._geometries[-1], MultiGeometry):
+            self._geometries[-1].append(geometry)
+        else:
+            self._place['geometry'] = geometry
+
+    def close(self):
+        pass
+
+
+def _write_coordinates(xf, points, chunk_size):
+    """Write a ``coordinates`` element incrementally.
+
+    :param etree.xmlfile xf: Output to write to
+    :type points: ``list`` of :class:`trigpoints.Trigpoint`
+    :param points: Locations to write
+    :param int chunk_size: Number of coordinate tuples to write at a time
+    """
+    with xf.element(_tag('coordinates')):
+        for i in range(0, len(points), chunk_size):
+            if i:
+                xf.write(' ')
+            xf.write(' '.join(map(_format_coordinates,
+                                  points[i:i + chunk_size])))
+
+
+def _geometry_element(geometry):
+    """Generate a KML geometry element subtree.
+
+    :param geometry: Geometry to convert
+    :rtype: :class:`etree.Element`
+    :return: KML geometry element
+    """
+    def coordinates(points):
+        return create_elem('coordinates',
+                           text=' '.join(map(_format_coordinates, points)))
+
+    if isinstance(geometry, LineString):
+        element = create_elem('LineString')
+        element.append(coordinates(geometry))
+    elif isinstance(geometry, Polygon):
+        element = create_elem('Polygon')
+        rings = [('outerBoundaryIs', geometry.outer)]
+        rings.extend(('innerBoundaryIs', ring) for ring in geometry.inner)
+        for boundary, ring in rings:
+            ring_element = create_elem('LinearRing')
+            ring_element.append(coordinates(ring))
+            boundary_element = create_elem(boundary)
+            boundary_element.append(ring_element)
+            element.append(boundary_element)
+    elif isinstance(geometry, MultiGeometry):
+        element = create_elem('MultiGeometry')
+        for member in geometry:
+            element.append(_geometry_element(member))
+    else:
+        element = create_elem('Point')
+        element.append(coordinates([geometry]))
+    return element
+
+
+def _write_geometry(xf, geometry, chunk_size):
+    """Write a geometry element incrementally.
+
+    :param etree.xmlfile xf: Output to write to
+    :param geometry: Geometry to write
+    :param int chunk_size: Number of coordinate tuples to write at a time
+    """
+    if isinstance(geometry, LineString):
+        with xf.element(_tag('LineString')):
+            _write_coordinates(xf, geometry, chunk_size)
+    elif isinstance(geometry, Polygon):
+        with xf.element(_tag('Polygon')):
+            rings = [('outerBoundaryIs', geometry.outer)]
+            rings.extend(('innerBoundaryIs', ring) for ring in geometry.inner)
+            for boundary, ring in rings:
+                with xf.element(_tag(boundary)):
+                    with xf.element(_tag('LinearRing')):
+                        _write_coordinates(xf, ring, chunk_size)
+    elif isinstance(geometry, MultiGeometry):
+        with xf.element(_tag('MultiGeometry')):
+            for member in geometry:
+                _write_geometry(xf, member, chunk_size)
+    else:
+        with xf.element(_tag('Point')):
+            _write_coordinates(xf, [geometry], chunk_size)
+
+
 class Placemarks(point.KeyedPoints):
 
     """Class for representing a group of :class:`Placemark` objects.
@@ -100,13 +461,19 @@ class Placemarks(point.KeyedPoints):
     .. versionadded:: 0.6.0
     """
 
+    point_class = Placemark
+
     def __init__(self, kml_file=None):
         """Initialise a new ``Placemarks`` object."""
         super(Placemarks, self).__init__()
         self._kml_file = kml_file
+        #: Placemarks with ``LineString``, ``Polygon`` or ``MultiGeometry``
+        #: geometries
+        self.shapes = {}
         if kml_file:
             self.import_locations(kml_file)
 
+    @instrument.instrumented('kml')
     def import_locations(self, kml_file):
         """Import KML data files.
 
@@ -134,9 +501,16 @@ class Placemarks(point.KeyedPoints):
                 </Document>
             </kml>
 
-        The reader uses the :mod:`ElementTree` module, so should be very fast
-        when importing data.  The above file processed by
-        ``import_locations()`` will return the following ``dict`` object::
+        Placemarks with ``LineString``, ``Polygon`` or ``MultiGeometry``
+        geometries are stored in the ``shapes`` attribute as
+        :class:`LineString`, :class:`Polygon` and :class:`MultiGeometry`
+        objects.
+
+        The document is parsed incrementally, and coordinates are converted as
+        the parser reads them, so geometries with very large numbers of
+        vertices can be imported without holding the document's text in
+        memory.  The above file processed by ``import_locations()`` will
+        return the following ``dict`` object::
 
             {"Home": Placemark(52.015, -0.221, 60),
              "Cambridge": Placemark(52.167, 0.390, None)}
@@ -145,44 +519,97 @@ class Placemarks(point.KeyedPoints):
         :param kml_file: KML data to read
         :rtype: ``dict``
         :return: Named locations with optional comments
+        :raise ValueError: Invalid coordinate tuple
+
+        .. versionchanged:: 0.13.0
+           ``LineString``, ``Polygon`` and ``MultiGeometry`` support
 
         .. _KML Reference:
            http://code.google.com/apis/kml/documentation/kmlreference.html
         """
         self._kml_file = kml_file
-        data = utils.prepare_xml_read(kml_file, objectify=True)
-
-        for place in data.Document.Placemark:
-            name = place.name.text
-            coords = place.Point.coordinates.text
-            if coords is None:
-                logging.info('No coordinates found for %r entry' % name)
-                continue
-            coords = coords.split(',')
-            if len(coords) == 2:
-                longitude, latitude = coords
-                altitude = None
-            elif len(coords) == 3:
-                longitude, latitude, altitude = coords
-            else:
-                raise ValueError('Unable to handle coordinates value %r'
-                                 % coords)
-            try:
-                description = place.description
-            except AttributeError:
-                description = None
-            self[name] = Placemark(latitude, longitude, altitude, name,
-                                   description)
+        parser = etree.XMLParser(target=_PlacemarkTarget(self),
+                                 huge_tree=True)
+        with instrument.timer('parse'):
+            for chunk in utils.prepare_xml_feed(kml_file):
+                parser.feed(chunk)
+            parser.close()
+
+    def _add_placemark(self, name, description, geometry):
+        """Store an imported placemark.
+
+        :param str name: Name of placemark
+        :param str description: Placemark's description
+        :param geometry: Placemark's geometry
+        """
+        if not geometry:
+            logging.info('No coordinates found for %r entry' % name)
+            instrument.count('rows_skipped')
+        elif isinstance(geometry, trigpoints.Trigpoint):
+            self[name] = Placemark(geometry.latitude, geometry.longitude,
+                                   geometry.altitude, name, description)
+        else:
+            geometry.name = name
+            geometry.description = description
+            self.shapes[name] = geometry
 
     def export_kml_file(self):
         """Generate KML element tree from ``Placemarks``.
 
+        Entries in ``shapes`` are included after the point placemarks.  A
+        ``LinearRing`` outside of a ``Polygon`` is imported as a
+        :class:`LineString`, and is exported as one.
+
         :rtype: :class:`etree.ElementTree`
         :return: KML element tree depicting ``Placemarks``
+
+        .. versionchanged:: 0.13.0
+           ``shapes`` support
         """
         kml = create_elem('kml')
         kml.Document = create_elem('Document')
         for place in sorted(self.values(), key=lambda x: x.name):
             kml.Document.append(place.tokml())
+        for shape in sorted(self.shapes.values(), key=lambda x: x.name):
+            placemark = create_elem('Placemark')
+            if shape.name:
+                placemark.set('id', shape.name)
+                placemark.append(create_elem('name', text=shape.name))
+            if shape.description:
+                placemark.append(create_elem('description',
+                                             text=shape.description))
+            placemark.append(_geometry_element(shape))
+            kml.Document.append(placemark)
 
         return etree.ElementTree(kml)
+
+    def write_kml(self, output, chunk_size=1000):
+        """Write ``Placemarks`` and ``shapes`` as a KML document.
+
+        Unlike :meth:`export_kml_file` the document is written incrementally,
+        so the text for geometries with very large numbers of vertices is
+        never held in memory.  Placemarks are written in the order they are
+        stored.
+
+        :type output: ``file`` or ``str``
+        :param output: File or filename to write to
+        :param int chunk_size: Number of coordinate tuples to write at a time
+
+        .. versionadded:: 0.13.0
+        """
+        with etree.xmlfile(output, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element(_tag('kml'), nsmap={None: KML_NS}):
+                with xf.element(_tag('Document')):
+                    places = list(self.values())
+                    places.extend(self.shapes.values())
+                    for place in places:
+                        attrib = {'id': place.name} if place.name else {}
+                        with xf.element(_tag('Placemark'), attrib):
+                            if place.name:
+                                with xf.element(_tag('name')):
+                                    xf.write(place.name)
+                            if place.description:
+                                with xf.element(_tag('description')):
+                                    xf.write(place.description)
+                            _write_geometry(xf, place, chunk_size)
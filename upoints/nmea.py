@@ -20,10 +20,59 @@
 import datetime
 import logging
 
+from binascii import hexlify
+from collections import namedtuple
 from functools import reduce
 from operator import xor
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
+from upoints.compat import basestring
+
+try:
+    _from_bytes = int.from_bytes
+except AttributeError:  # Python 2
+    _from_bytes = lambda data, order: int(hexlify(data) or b'0', 16)
+
+#: Shifts and masks for folding an integer in half, down to a single byte
+_FOLDS = tuple((8 * 2 ** i, 2 ** (8 * 2 ** i) - 1) for i in range(9, -1, -1))
+
+
+def _xor_bytes(data):
+    """XOR all the bytes in a buffer together.
+
+    Instead of looping over each byte the buffer is converted to a single
+    integer, and then repeatedly folded in half until only a byte remains.
+
+    :type data: ``bytes``, ``bytearray`` or ``memoryview``
+    :param data: Data to process
+    :rtype: ``int``
+    """
+    value = _from_bytes(data, 'little')
+    while value >> 8192:
+        # Longer than any of the precomputed folds
+        shift = (value.bit_length() + 15) // 16 * 8
+        value = (value >> shift) ^ (value & ((1 << shift) - 1))
+    for shift, mask in _FOLDS:
+        if value >> shift:
+            value = (value >> shift) ^ (value & mask)
+    return value
+
+
+def _payload(sentence):
+    """Strip the framing from a NMEA 0183 sentence.
+
+    :type sentence: ``str``, ``bytes`` or ``memoryview``
+    :param sentence: NMEA 0183 formatted sentence
+    :rtype: ``tuple``
+    :return: Sentence data between "$" and "*", and checksum text if any
+    """
+    if isinstance(sentence, memoryview):
+        sentence = sentence.tobytes()
+    start = 1 if sentence[:1] in ('$', b'$') else 0
+    end = sentence.rfind('*' if isinstance(sentence, basestring) else b'*')
+    if end == -1:
+        return sentence[start:], None
+    return sentence[start:end], sentence[end + 1:end + 3]
 
 
 def calc_checksum(sentence):
@@ -32,12 +81,58 @@ def calc_checksum(sentence):
     NMEA checksums are a simple XOR of all the characters in the sentence
     between the leading "$" symbol, and the "*" checksum separator.
 
-    :param str sentence: NMEA 0183 formatted sentence
+    .. versionchanged:: 0.13.0
+       ``bytes``, ``bytearray`` and ``memoryview`` sentences are supported
+
+    :type sentence: ``str``, ``bytes`` or ``memoryview``
+    :param sentence: NMEA 0183 formatted sentence
+    """
+    data = _payload(sentence)[0]
+    if isinstance(data, basestring) and not isinstance(data, bytes):
+        try:
+            data = data.encode('latin-1')
+        except UnicodeEncodeError:
+            return reduce(xor, map(ord, data))
+    return _xor_bytes(data)
+
+
+def valid_sentences(sentences, types=None, checksum=True):
+    """Filter NMEA 0183 sentences, checking their checksums.
+
+    Sentences are filtered by type before their checksums are tested, so
+    unwanted sentences are never processed.  Sentences may be text or
+    ``bytes``, and byte sentences are checked without decoding them.
+
+    :type sentences: ``list`` of ``str`` or ``bytes``
+    :param sentences: NMEA 0183 formatted sentences
+    :type types: ``set`` of ``str``
+    :param types: Sentence types to keep from any talker, such as ``GGA``,
+        or identifiers to keep from a single talker, such as ``GPGGA``, or
+        ``None`` to keep all sentences
+    :param bool checksum: Whether checksums should be tested
+    :rtype: ``list`` of ``str`` or ``bytes``
+    :return: Data from each kept sentence, without framing or checksum
+    :raise ValueError: Sentence has a missing or invalid checksum
     """
-    if sentence.startswith('$'):
-        sentence = sentence[1:]
-    sentence = sentence.split('*')[0]
-    return reduce(xor, map(ord, sentence))
+    if types is not None:
+        types = set(types) | set(i.encode('ascii') for i in types)
+    for sentence in sentences:
+        data, expected = _payload(sentence)
+        if types is not None and data[2:5] not in types \
+                and data[:5] not in types:
+            continue
+        if checksum:
+            if not expected:
+                instrument.count('checksum_failures')
+                raise ValueError('Sentence has no checksum')
+            if isinstance(data, bytes):
+                value = _xor_bytes(data)
+            else:
+                value = calc_checksum(data)
+            if not value == int(expected, 16):
+                instrument.count('checksum_failures')
+                raise ValueError('Sentence has invalid checksum')
+        yield data
 
 
 def nmea_latitude(latitude):
@@ -452,6 +547,252 @@ class Waypoint(point.Point):
         return Waypoint(latitude, longitude, name)
 
 
+def parse_time(text):
+    """Parse a NMEA-formatted time.
+
+    :param str text: Time in HHMMSS, with optional fractional seconds
+    :rtype: ``datetime.time``
+    :return: Time represented by ``text``
+    """
+    return datetime.time(int(text[:2]), int(text[2:4]), int(text[4:6]),
+                         int(round(float(text[6:] or 0) * 1000000)))
+
+
+def _groups(values, converters):
+    """Decode repeated groups of fields.
+
+    :param list values: Field values for all groups
+    :param tuple converters: Converter for each field in a group
+    :rtype: ``list`` of ``tuple``
+    :return: Decoded values for each group, skipping empty groups
+    """
+    size = len(converters)
+    groups = []
+    for i in range(0, len(values), size):
+        chunk = values[i:i + size]
+        if any(chunk):
+            groups.append(tuple(convert(value) if value else None
+                                for convert, value in zip(converters, chunk)))
+    return groups
+
+
+def compile_decoder(name, fields):
+    """Compile a declarative sentence specification to a decoder.
+
+    Each field is given as a ``(name, converter)`` pair, with a converter of
+    ``None`` for fields that should be skipped such as unit markers.  Runs
+    of a field are given as ``(name, converter, count)``, and decode to
+    a list of the non-empty values.  Repeated groups of fields are given as
+    ``(name, (converter, ...), count)``, and decode to a list of tuples for
+    the non-empty groups.
+
+    The specification is turned in to a single function when it is
+    compiled, so decoding a sentence doesn't need to walk the specification.
+
+    :param str name: Name of record type to create
+    :param tuple fields: Specification for each field in the sentence
+    :rtype: ``function``
+    :return: Decoder taking the elements of a sentence, including the
+        identifier, and returning a record with a ``talker`` field and a field
+        for each non-skipped entry in ``fields``
+    """
+    names = ['talker']
+    values = ['elements[0][:2]']
+    namespace = {'_groups': _groups}
+    index = 1
+    for number, field in enumerate(fields):
+        converter = field[1]
+        count = field[2] if len(field) == 3 else None
+        width = count * len(converter) if isinstance(converter, tuple) \
+            else count or 1
+        if converter is not None:
+            local = 'convert_%d' % number
+            namespace[local] = converter
+            names.append(field[0])
+            if isinstance(converter, tuple):
+                values.append('_groups(elements[%d:%d], %s)'
+                              % (index, index + width, local))
+            elif count:
+                values.append('[%s(x) for x in elements[%d:%d] if x]'
+                              % (local, index, index + width))
+            else:
+                values.append('%s(elements[%d]) if elements[%d] else None'
+                              % (local, index, index))
+        index += width
+    namespace['record'] = record = namedtuple(name, names)
+    source = '\n'.join([
+        'def decode(elements):',
+        '    if len(elements) < %d:' % index,
+        "        elements = elements + [''] * (%d - len(elements))" % index,
+        '    return record(%s)' % ', '.join(values),
+    ])
+    exec(source, namespace)
+    decode = namespace['decode']
+    decode.record = record
+    return decode
+
+
+#: Sentence decoders, keyed by sentence type
+PARSERS = {}
+
+
+def register_parser(sentence_type, parser):
+    """Register a decoder for a sentence type.
+
+    Decoders are used for sentences from any talker, so registering a
+    ``GGA`` decoder handles ``GPGGA``, ``GNGGA`` and ``GLGGA`` sentences.
+
+    :param str sentence_type: Sentence type, such as ``GGA``
+    :param parser: Class with a ``parse_elements`` method, or function taking
+        the elements of a sentence including its identifier
+    """
+    if hasattr(parser, 'parse_elements'):
+        parse_elements = parser.parse_elements
+        parser = lambda elements: parse_elements(elements[1:])
+    PARSERS[sentence_type] = parser
+
+
+def parse_sentence(sentence, checksum=True):
+    """Decode a single NMEA 0183 sentence.
+
+    :param str sentence: NMEA 0183 formatted sentence
+    :param bool checksum: Whether the checksum should be tested
+    :return: Decoded sentence
+    :raise ValueError: Invalid checksum, or unknown sentence type
+    """
+    for values in valid_sentences([sentence], checksum=checksum):
+        if isinstance(values, bytes):
+            values = values.decode('ascii')
+        elements = values.split(',')
+        try:
+            parser = PARSERS[elements[0][2:5]]
+        except KeyError:
+            raise ValueError('Unknown sentence type %r' % elements[0])
+        return parser(elements)
+
+
+register_parser('GGA', Fix)
+register_parser('GLL', LoranPosition)
+register_parser('RMC', Position)
+register_parser('WPL', Waypoint)
+
+#: GSA, DOP and active satellites
+ActiveSatellites = compile_decoder('ActiveSatellites', (
+    ('mode', str),
+    ('fix_type', int),
+    ('satellites', int, 12),
+    ('pdop', float),
+    ('hdop', float),
+    ('vdop', float),
+))
+#: GSV, satellites in view with ``(prn, elevation, azimuth, snr)`` groups
+SatellitesInView = compile_decoder('SatellitesInView', (
+    ('messages', int),
+    ('message', int),
+    ('visible', int),
+    ('satellites', (int, int, int, int), 4),
+))
+#: VTG, track made good and ground speed
+CourseSpeed = compile_decoder('CourseSpeed', (
+    ('track', float),
+    ('true', None),
+    ('magnetic_track', float),
+    ('magnetic', None),
+    ('knots', float),
+    ('knots_unit', None),
+    ('speed', float),
+    ('speed_unit', None),
+    ('mode', str),
+))
+#: ZDA, time and date
+TimeDate = compile_decoder('TimeDate', (
+    ('time', parse_time),
+    ('day', int),
+    ('month', int),
+    ('year', int),
+    ('zone_hours', int),
+    ('zone_minutes', int),
+))
+#: HDT, true heading
+Heading = compile_decoder('Heading', (
+    ('heading', float),
+    ('true', None),
+))
+
+register_parser('GSA', ActiveSatellites)
+register_parser('GSV', SatellitesInView)
+register_parser('VTG', CourseSpeed)
+register_parser('ZDA', TimeDate)
+register_parser('HDT', Heading)
+
+#: Sentence types imported by default, as they contain locations
+LOCATION_TYPES = ('GGA', 'GLL', 'RMC', 'WPL')
+
+
+def iter_locations(gpsdata_file, checksum=True, types=LOCATION_TYPES,
+                   predicate=None, bbox=None):
+    """Lazily parse NMEA 0183 data files.
+
+    Sentences carry few enough fields that they are filtered once decoded,
+    and ``predicate`` is called with the decoded sentence.  Sentences
+    without a location never match a ``bbox``.
+
+    :type gpsdata_file: ``file``, ``list`` or ``str``
+    :param gpsdata_file: NMEA data to read
+    :param bool checksum: Whether checksums should be tested
+    :type types: ``list`` of ``str``
+    :param types: Sentence types to import, from those in :data:`PARSERS`
+    :param function predicate: Function called with each decoded sentence,
+        returning ``False`` for sentences to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select sentences
+        from
+    :rtype: ``generator``
+    :return: Matching decoded sentences
+    :raise ValueError: Unknown sentence type in ``types``
+
+    .. versionadded:: 0.13.0
+    """
+    try:
+        parsers = dict((i, PARSERS[i]) for i in types)
+    except KeyError as error:
+        raise ValueError('Unknown sentence type %r' % error.args[0])
+    filters = utils.RecordFilter(predicate, bbox)
+    data = utils.prepare_read(gpsdata_file)
+
+    if not checksum:
+        logging.warning('Disabling the checksum tests should only be used'
+                        'when the device is incapable of emitting the '
+                        'correct values!')
+    # The standard tells us lines should end in \r\n even though some
+    # devices break this, but Python's standard file object solves this
+    # for us anyway.  However, be careful if you implement your own
+    # opener.
+    lines = [0]
+
+    def count_lines(data):
+        for line in data:
+            lines[0] += 1
+            yield line
+
+    parsed = 0
+    try:
+        for values in valid_sentences(count_lines(data), parsers, checksum):
+            if isinstance(values, bytes):
+                values = values.decode('ascii')
+            elements = values.split(',')
+            sentence = parsers[elements[0][2:5]](elements)
+            parsed += 1
+            if filters:
+                if not filters.in_bbox(getattr(sentence, 'latitude', None),
+                                       getattr(sentence, 'longitude', None)):
+                    continue
+                if not filters.matches(sentence):
+                    continue
+            yield sentence
+    finally:
+        instrument.count('rows_skipped', lines[0] - parsed)
+
 class Locations(point.Points):
 
     """Class for representing a group of GPS location objects.
@@ -466,7 +807,9 @@ class Locations(point.Points):
         if gpsdata_file:
             self.import_locations(gpsdata_file)
 
-    def import_locations(self, gpsdata_file, checksum=True):
+    @instrument.instrumented('nmea')
+    def import_locations(self, gpsdata_file, checksum=True,
+                         types=LOCATION_TYPES):
         r"""Import GPS NMEA-formatted data files
 
         ``import_locations()`` returns a list of `Fix` objects representing the
@@ -513,42 +856,242 @@ class Locations(point.Points):
            their "extensions" to the standard.
         .. todo:: Add optional check for message length, on by default
 
+        Sentences are matched by type regardless of their talker, so data from
+        multi-constellation receivers emitting ``GNGGA`` sentences is handled
+        in the same way as ``GPGGA``.
+
+        .. versionchanged:: 0.13.0
+           ``types`` argument added, and sentences from all talkers imported
+
         :type gpsdata_file: ``file``, ``list`` or ``str``
         :param gpsdata_file: NMEA data to read
         :param bool checksum: Whether checksums should be tested
+        :type types: ``list`` of ``str``
+        :param types: Sentence types to import, from those in :data:`PARSERS`
         :rtype: ``list``
         :return: Series of locations taken from the data
 
         .. _the official documentation: http://en.wikipedia.org/wiki/NMEA_0183
         """
         self._gpsdata_file = gpsdata_file
-        data = utils.prepare_read(gpsdata_file)
-
-        parsers = {
-            'GPGGA': Fix,
-            'GPRMC': Position,
-            'GPWPL': Waypoint,
-            'GPGLL': LoranPosition,
-            'LCGLL': LoranPosition,
-        }
-
-        if not checksum:
-            logging.warning('Disabling the checksum tests should only be used'
-                            'when the device is incapable of emitting the '
-                            'correct values!')
-        for line in data:
-            # The standard tells us lines should end in \r\n even though some
-            # devices break this, but Python's standard file object solves this
-            # for us anyway.  However, be careful if you implement your own
-            # opener.
-            if not line[1:6] in parsers:
-                continue
-            if checksum:
-                values, checksum = line[1:].split('*')
-                if not calc_checksum(values) == int(checksum, 16):
-                    raise ValueError('Sentence has invalid checksum')
-            else:
-                values = line[1:].split('*')[0]
-            elements = values.split(',')
-            parser = getattr(parsers[elements[0]], 'parse_elements')
-            self.append(parser(elements[1:]))
+        self.extend(iter_locations(gpsdata_file, checksum, types))
+
+    def track(self):
+        """Merge fix and position sentences in to timed track records.
+
+        .. seealso::
+
+           :func:`merge_epochs`
+
+        :rtype: :class:`Track`
+        :return: One record for each epoch in the data
+
+        .. versionadded:: 0.13.0
+        """
+        return Track(list(merge_epochs(self)))
+
+
+class TrackRecord(point.TimedPoint):
+
+    """Class for representing the merged sentences for a single epoch.
+
+    .. versionadded:: 0.13.0
+    """
+
+    __slots__ = ('speed', 'track', 'altitude', 'satellites', 'dilution',
+                 'quality')
+
+    def __init__(self, time, latitude, longitude, speed=None, track=None,
+                 altitude=None, satellites=None, dilution=None, quality=None):
+        """Initialise a new ``TrackRecord`` object.
+
+        :param datetime.datetime time: Time the fix was taken
+        :param float latitude: Fix's latitude
+        :param float longitude: Fix's longitude
+        :param float speed: Ground speed in knots
+        :param float track: Track angle
+        :param float altitude: Altitude above MSL
+        :param int satellites: Number of tracked satellites
+        :param float dilution: Horizontal dilution at reported position
+        :param int quality: Mode under which the fix was taken
+        """
+        super(TrackRecord, self).__init__(latitude, longitude, time=time)
+        self.speed = speed
+        self.track = track
+        self.altitude = altitude
+        self.satellites = satellites
+        self.dilution = dilution
+        self.quality = quality
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``TrackRecord`` object
+        """
+        return utils.repr_assist(self)
+
+
+class Track(point.TimedPoints):
+
+    """Class for representing a series of merged NMEA epochs.
+
+    .. versionadded:: 0.13.0
+    """
+
+    point_class = TrackRecord
+
+
+def _dated(date, time, reference, before):
+    """Combine a date and time, allowing for a change of day.
+
+    :param datetime.date date: Date from a nearby epoch
+    :param datetime.time time: Time of epoch
+    :param datetime.datetime reference: Time of the nearby epoch
+    :param bool before: Whether the epoch is before ``reference``
+    :rtype: ``datetime.datetime``
+    """
+    result = datetime.datetime.combine(date, time)
+    if reference:
+        if not before and result < reference - datetime.timedelta(hours=12):
+            result += datetime.timedelta(days=1)
+        elif before and result > reference + datetime.timedelta(hours=12):
+            result -= datetime.timedelta(days=1)
+    return result
+
+
+def _group_epochs(sentences):
+    """Group fix and position sentences by time.
+
+    :type sentences: ``list`` of :class:`Fix` and :class:`Position`
+    :param sentences: Decoded sentences, other types are ignored
+    :rtype: ``list`` of ``tuple``
+    :return: Time, fix and position for each group of sentences
+    """
+    epoch = None
+    fix = position = None
+    for sentence in sentences:
+        if not isinstance(sentence, (Fix, Position)):
+            continue
+        if epoch is not None and not sentence.time == epoch:
+            yield epoch, fix, position
+            fix = position = None
+        epoch = sentence.time
+        if isinstance(sentence, Fix):
+            fix = sentence
+        else:
+            position = sentence
+    if epoch is not None:
+        yield epoch, fix, position
+
+
+def _epochs(sentences):
+    """Date groups of fix and position sentences.
+
+    Epochs flagged as invalid by either sentence are dropped.  Dates are
+    taken from position sentences, and carried forward to epochs with only
+    a fix.  Epochs seen before the first date are held until a date is
+    available, and have no time if the data contains no dates.
+
+    :type sentences: ``list`` of :class:`Fix` and :class:`Position`
+    :param sentences: Decoded sentences, other types are ignored
+    :rtype: ``list`` of ``tuple``
+    :return: Time, fix and position for each epoch
+    """
+    undated = []
+    last = None
+    for time, fix, position in _group_epochs(sentences):
+        if (fix and not fix.quality) or (position and not position.status):
+            continue
+        if position and position.date:
+            stamp = _dated(position.date, time, None, False)
+        elif last:
+            stamp = _dated(last.date(), time, last, False)
+        else:
+            undated.append((time, fix, position))
+            continue
+        if undated:
+            following = stamp
+            dated = []
+            for earlier, earlier_fix, earlier_position in reversed(undated):
+                following = _dated(following.date(), earlier, following, True)
+                dated.append((following, earlier_fix, earlier_position))
+            for record in reversed(dated):
+                yield record
+            undated = []
+        last = stamp
+        yield stamp, fix, position
+    for _, fix, position in undated:
+        yield None, fix, position
+
+
+def _merged_values(epoch):
+    """Combine the values from an epoch's sentences.
+
+    :param tuple epoch: Time, fix and position for epoch
+    :rtype: ``tuple``
+    :return: Arguments for :class:`TrackRecord`
+    """
+    time, fix, position = epoch
+    location = fix or position
+    if position:
+        speed, track = position.speed, position.track
+    else:
+        speed = track = None
+    if fix:
+        return (time, location.latitude, location.longitude, speed, track,
+                fix.altitude, fix.satellites, fix.dilution, fix.quality)
+    return (time, location.latitude, location.longitude, speed, track, None,
+            None, None, None)
+
+
+def merge_epochs(sentences):
+    """Merge fix and position sentences in to timed track records.
+
+    Receivers emit GGA and RMC sentences for each epoch, and the records
+    combine the date from the position with the time, speed and track, and
+    the altitude, satellite count and dilution from the fix.  Sentences are
+    processed as they arrive, so ``sentences`` may be a generator reading
+    from a live device.
+
+    :type sentences: ``list`` of :class:`Fix` and :class:`Position`
+    :param sentences: Decoded sentences, other types are ignored
+    :rtype: ``list`` of :class:`TrackRecord`
+    :return: One record for each valid epoch
+
+    .. versionadded:: 0.13.0
+    """
+    for epoch in _epochs(sentences):
+        yield TrackRecord(*_merged_values(epoch))
+
+
+def merge_columns(sentences):
+    """Merge fix and position sentences in to columns.
+
+    This produces the same result as ``Track(merge_epochs(sentences))``
+    followed by :meth:`~point.Points.to_columns`, without creating
+    a :class:`TrackRecord` for each epoch.
+
+    .. seealso::
+
+       :func:`merge_epochs`
+
+    :type sentences: ``list`` of :class:`Fix` and :class:`Position`
+    :param sentences: Decoded sentences, other types are ignored
+    :rtype: ``dict``
+    :return: Column name to :func:`utils.encode_column` column mapping
+
+    .. versionadded:: 0.13.0
+    """
+    names = ('time', 'latitude', 'longitude', 'speed', 'track', 'altitude',
+             'satellites', 'dilution', 'quality')
+    values = list(zip(*[_merged_values(epoch)
+                        for epoch in _epochs(sentences)]))
+    if not values:
+        values = [()] * len(names)
+    columns = dict((name, utils.encode_column(list(column)))
+                   for name, column in zip(names, values))
+    count = len(values[0])
+    columns['units'] = utils.encode_column(['metric'] * count)
+    columns['timezone'] = utils.encode_column([0] * count)
+    return columns
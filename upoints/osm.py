@@ -17,21 +17,47 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from operator import attrgetter
+from __future__ import division
 
+import errno
+import hashlib
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from io import BytesIO
+
+try:
+    from http.client import (HTTPConnection, HTTPException, HTTPSConnection)
+except ImportError:  # Python 2
+    from httplib import (HTTPConnection, HTTPException, HTTPSConnection)
+try:
+    from queue import (Empty, Queue)
+except ImportError:  # Python 2
+    from Queue import (Empty, Queue)
 try:
+    from urllib.parse import urlsplit
     from urllib.request import urlopen
 except ImportError:  # Python 2
     from urllib import urlopen
+    from urlparse import urlsplit
 
 from lxml import etree
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 from upoints._version import web as ua_string
 from upoints.compat import mangle_repr_type
 
 create_elem = utils.element_creator()
 
+#: OpenStreetMap API endpoint for area requests
+API_URL = 'http://api.openstreetmap.org/api/0.5/map'
+#: Maximum latitude representable in map tiles
+TILE_LATITUDE_LIMIT = 85.0511287798
+
 
 def _parse_flags(element):
     """Parse OSM XML element for generic data.
@@ -46,13 +72,8 @@ def _parse_flags(element):
     if timestamp:
         timestamp = utils.Timestamp.parse_isoformat(timestamp)
     tags = {}
-    try:
-        for tag in element['tag']:
-            key = tag.get('k')
-            value = tag.get('v')
-            tags[key] = value
-    except AttributeError:
-        pass
+    for tag in element.iterfind('tag'):
+        tags[tag.get('k')] = tag.get('v')
 
     return visible, user, timestamp, tags
 
@@ -97,14 +118,94 @@ def get_area_url(location, distance):
     :return: URL that can be used to fetch the OSM data within ``distance`` of
         ``location``
     """
-    locations = [location.destination(i, distance) for i in range(0, 360, 90)]
-    latitudes = list(map(attrgetter('latitude'), locations))
-    longitudes = list(map(attrgetter('longitude'), locations))
+    bounds = area_bounds(location, distance)
+    bounds = (bounds.west, bounds.south, bounds.east, bounds.north)
+
+    return '%s?bbox=%s' % (API_URL, ','.join(map(str, bounds)))
+
+
+def area_bounds(location, distance):
+    """Calculate the bounding box used for an area request.
+
+    .. seealso::
+
+       :func:`get_area_url`
+
+    :param Point location: Centre of the region
+    :param int distance: Boundary distance in kilometres
+    :rtype: :class:`point.Bounds`
+    :return: Box whose edges touch a circle of ``distance`` radius
+
+    .. versionadded:: 0.13.0
+    """
+    return point.Bounds(location.destination(i, distance)
+                        for i in range(0, 360, 90))
 
-    bounds = (min(longitudes), min(latitudes), max(longitudes), max(latitudes))
 
-    return ('http://api.openstreetmap.org/api/0.5/map?bbox='
-            + ','.join(map(str, bounds)))
+def tile_index(latitude, longitude, zoom):
+    """Find the map tile containing a location.
+
+    Tiles use the common slippy map numbering, with ``2 ** zoom`` tiles on
+    each axis.
+
+    :param float latitude: Location's latitude
+    :param float longitude: Location's longitude
+    :param int zoom: Tile zoom level
+    :rtype: ``tuple`` of ``int``
+    :return: Tile column and row
+
+    .. versionadded:: 0.13.0
+    """
+    count = 2 ** zoom
+    latitude = max(-TILE_LATITUDE_LIMIT, min(TILE_LATITUDE_LIMIT, latitude))
+    rad_latitude = math.radians(latitude)
+    column = int((longitude + 180) / 360 * count)
+    row = int((1 - math.log(math.tan(rad_latitude)
+                            + 1 / math.cos(rad_latitude)) / math.pi)
+              / 2 * count)
+    return min(column, count - 1), min(row, count - 1)
+
+
+def tile_bounds(zoom, column, row):
+    """Calculate the area covered by a map tile.
+
+    :param int zoom: Tile zoom level
+    :param int column: Tile column
+    :param int row: Tile row
+    :rtype: :class:`point.Bounds`
+    :return: Area covered by tile
+
+    .. versionadded:: 0.13.0
+    """
+    count = 2 ** zoom
+    latitude = lambda r: math.degrees(math.atan(math.sinh(math.pi
+                                                          * (1 - 2 * r
+                                                             / count))))
+    bounds = point.Bounds()
+    bounds.add(latitude(row + 1), column / count * 360 - 180)
+    bounds.add(latitude(row), (column + 1) / count * 360 - 180)
+    return bounds
+
+
+def area_tiles(bounds, zoom):
+    """Find the map tiles covering an area.
+
+    :param point.Bounds bounds: Area to cover
+    :param int zoom: Tile zoom level
+    :rtype: ``list`` of ``tuple`` of ``int``
+    :return: Zoom level, column and row for each tile
+
+    .. versionadded:: 0.13.0
+    """
+    count = 2 ** zoom
+    west, north = tile_index(bounds.north, bounds.west, zoom)
+    east, south = tile_index(bounds.south, bounds.east, zoom)
+    if west <= east:
+        columns = range(west, east + 1)
+    else:
+        columns = list(range(west, count)) + list(range(0, east + 1))
+    return [(zoom, column, row) for column in columns
+            for row in range(north, south + 1)]
 
 
 class Node(point.Point):
@@ -180,13 +281,19 @@ class Node(point.Point):
         """
         return get_area_url(self, distance)
 
-    def fetch_area_osm(self, distance):
+    def fetch_area_osm(self, distance, fetcher=None):
         """Fetch, and import, an OSM region.
 
+        .. versionchanged:: 0.13.0
+           ``fetcher`` argument added
+
         :param int distance: Boundary distance in kilometres
+        :param AreaFetcher fetcher: Tiled and cached fetcher to use
         :rtype: :class:`Osm`
         :return: All the data OSM has on a region imported for use
         """
+        if fetcher:
+            return fetcher.fetch(self, distance)
         return Osm(urlopen(get_area_url(self, distance)))
 
     @staticmethod
@@ -266,6 +373,23 @@ class Way(point.Points):
 
         return ''.join(text)
 
+    def geometry(self, nodes):
+        """Resolve the way's node references to locations.
+
+        :type nodes: :class:`Osm` or ``dict``
+        :param nodes: Region containing the way's nodes, or a mapping of node
+            identifiers to :class:`Node` objects
+        :rtype: :class:`point.Points`
+        :return: Locations forming the way, suitable for use as a route
+        :raise KeyError: Node missing from ``nodes``
+
+        .. versionadded:: 0.13.0
+        """
+        if isinstance(nodes, Osm):
+            nodes = dict((node.ident, node) for node in nodes
+                         if isinstance(node, Node))
+        return point.Points([nodes[int(node)] for node in self])
+
     def toosm(self):
         """Generate a OSM way element subtree.
 
@@ -308,6 +432,8 @@ class Osm(point.Points):
     .. versionadded:: 0.9.0
     """
 
+    point_class = Node
+
     def __init__(self, osm_file=None):
         """Initialise a new ``Osm`` object."""
         super(Osm, self).__init__()
@@ -317,6 +443,7 @@ class Osm(point.Points):
         self.generator = ua_string
         self.version = '0.5'
 
+    @instrument.instrumented('osm')
     def import_locations(self, osm_file):
         """Import OSM data files.
 
@@ -344,7 +471,7 @@ class Osm(point.Points):
               </way>
             </osm>
 
-        The reader uses the :mod:`ElementTree` module, so should be very fast
+        The reader uses :func:`utils.iterparse_xml`, so should be very fast
         when importing data.  The above file processed by
         ``import_locations()`` will return the following `Osm` object::
 
@@ -371,24 +498,29 @@ class Osm(point.Points):
             http://wiki.openstreetmap.org/wiki/OSM_Protocol_Version_0.5/DTD
         """
         self._osm_file = osm_file
-        data = utils.prepare_xml_read(osm_file, objectify=True)
-
+        roots = []
+
+        def check_root(element):
+            roots.append(element)
+            self.version = element.get('version')
+            if not self.version:
+                raise ValueError('No specified OSM version')
+            elif not self.version == '0.5':
+                raise ValueError('Unsupported OSM version %r' % self.version)
+            self.generator = element.get('generator')
+
+        def add_node(element):
+            self.append(Node.parse_elem(element))
+
+        def add_way(element):
+            self.append(Way.parse_elem(element))
+
+        utils.iterparse_xml(osm_file,
+                            {'osm/node': add_node, 'osm/way': add_way},
+                            {'osm': check_root})
         # This would be a lot simpler if OSM exports defined a namespace
-        if not data.tag == 'osm':
-            raise ValueError("Root element %r is not `osm'" % data.tag)
-        self.version = data.get('version')
-        if not self.version:
-            raise ValueError('No specified OSM version')
-        elif not self.version == '0.5':
-            raise ValueError('Unsupported OSM version %r' % data)
-
-        self.generator = data.get('generator')
-
-        for elem in data.getchildren():
-            if elem.tag == 'node':
-                self.append(Node.parse_elem(elem))
-            elif elem.tag == 'way':
-                self.append(Way.parse_elem(elem))
+        if not roots:
+            raise ValueError("Root element is not `osm'")
 
     def export_osm_file(self):
         """Generate OpenStreetMap element tree from `Osm`"""
@@ -397,3 +529,366 @@ class Osm(point.Points):
         osm.extend(obj.toosm() for obj in self)
 
         return etree.ElementTree(osm)
+
+    def to_columns(self):
+        """Export nodes as typed columns.
+
+        .. seealso::
+
+           :meth:`point.Points.to_columns`
+
+        .. note::
+           ``Way`` objects have no location of their own, and are not
+           included in the output.
+
+        :rtype: ``dict``
+        :return: Column name to column mapping
+
+        .. versionadded:: 0.13.0
+        """
+        return point._to_columns([obj for obj in self
+                                  if isinstance(obj, Node)], Node)
+
+
+class TileCache(object):
+
+    """Class for storing fetched map tiles on disk.
+
+    Entries older than ``ttl`` seconds are discarded when read, and the
+    oldest entries are removed when the cache grows beyond ``max_size``
+    bytes.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, directory=None, ttl=86400, max_size=64 * 1024 * 1024):
+        """Initialise a new ``TileCache`` object.
+
+        :param str directory: Location of cache, defaults to a ``upoints``
+            directory in the system's temporary directory
+        :param int ttl: Maximum age of entries in seconds
+        :param int max_size: Maximum total size of entries in bytes
+        """
+        super(TileCache, self).__init__()
+        if not directory:
+            directory = os.path.join(tempfile.gettempdir(), 'upoints', 'osm')
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        try:
+            os.makedirs(directory)
+        except OSError as error:
+            if not error.errno == errno.EEXIST:
+                raise
+
+    def _path(self, key):
+        """Generate file name for a cache entry.
+
+        :param str key: Entry name
+        :rtype: ``str``
+        """
+        return os.path.join(self.directory, '%s.osm' % key)
+
+    def get(self, key):
+        """Fetch an entry from the cache.
+
+        :param str key: Entry name
+        :rtype: ``bytes``
+        :return: Cached data, or ``None`` if missing or expired
+        """
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.unlink(path)
+                return None
+            with open(path, 'rb') as cache_file:
+                return cache_file.read()
+        except (IOError, OSError):
+            return None
+
+    def put(self, key, data):
+        """Store an entry in the cache.
+
+        :param str key: Entry name
+        :param bytes data: Data to store
+        """
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as cache_file:
+            cache_file.write(data)
+        os.rename(temp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries, and the oldest until below ``max_size``."""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.osm'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if now - stat.st_mtime > self.ttl:
+                    os.unlink(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                # Removed by another process
+                continue
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        """Remove all entries."""
+        for name in os.listdir(self.directory):
+            if name.endswith('.osm'):
+                os.unlink(os.path.join(self.directory, name))
+
+
+class _ConnectionPool(object):
+
+    """Class for reusing keep-alive HTTP connections to a server.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, url, timeout=30):
+        """Initialise a new ``_ConnectionPool`` object.
+
+        :param str url: Server URL
+        :param int timeout: Socket timeout in seconds
+        """
+        super(_ConnectionPool, self).__init__()
+        parts = urlsplit(url)
+        if parts.scheme == 'https':
+            self._connection = HTTPSConnection
+        else:
+            self._connection = HTTPConnection
+        self.host = parts.netloc
+        self.path = parts.path
+        self.timeout = timeout
+        self._idle = Queue()
+
+    def get(self, query):
+        """Fetch data from the server.
+
+        A request on a reused connection that fails, because the server has
+        closed it, is retried once on a new connection.
+
+        :param str query: Query string for the request
+        :rtype: ``bytes``
+        :return: Response body
+        :raise IOError: Server returned an error
+        """
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except Empty:
+            connection, reused = None, False
+        while True:
+            if not connection:
+                connection = self._connection(self.host, timeout=self.timeout)
+            try:
+                connection.request('GET', '%s?%s' % (self.path, query),
+                                   headers={'User-Agent': ua_string})
+                response = connection.getresponse()
+                data = response.read()
+            except (HTTPException, socket.error):
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = None, False
+                continue
+            break
+        if response.will_close:
+            connection.close()
+        else:
+            self._idle.put(connection)
+        if not response.status == 200:
+            raise IOError('HTTP error %d fetching %r'
+                          % (response.status, query))
+        return data
+
+    def close(self):
+        """Close idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+
+class AreaFetcher(object):
+
+    """Class for fetching OSM regions as cached map tiles.
+
+    Areas are split in to map tiles at a fixed zoom level, so that nearby
+    requests share cached data, and missing tiles are fetched concurrently
+    over a pool of keep-alive connections.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, url=API_URL, cache=None, zoom=14, connections=4,
+                 timeout=30, max_tiles=256):
+        """Initialise a new ``AreaFetcher`` object.
+
+        :param str url: OSM API ``map`` endpoint
+        :param TileCache cache: Cache for fetched tiles, if any
+        :param int zoom: Tile zoom level
+        :param int connections: Maximum number of concurrent requests
+        :param int timeout: Socket timeout in seconds
+        :param int max_tiles: Maximum number of tiles for a single request
+        """
+        super(AreaFetcher, self).__init__()
+        self.url = url
+        self.cache = cache
+        self.zoom = zoom
+        self.connections = connections
+        self.max_tiles = max_tiles
+        self._pool = _ConnectionPool(url, timeout)
+        self._prefix = hashlib.md5(url.encode('utf-8')).hexdigest()[:8]
+
+    def _key(self, tile):
+        """Generate cache key for a tile.
+
+        :param tuple tile: Zoom level, column and row
+        :rtype: ``str``
+        """
+        return '%s-%d-%d-%d' % ((self._prefix, ) + tuple(tile))
+
+    def fetch_tiles(self, tiles):
+        """Fetch tile data, from the cache where possible.
+
+        :type tiles: ``list`` of ``tuple`` of ``int``
+        :param tiles: Zoom level, column and row for each tile
+        :rtype: ``dict``
+        :return: Tile to OSM data mapping
+        :raise IOError: Fetching a tile failed
+        """
+        results = {}
+        missing = Queue()
+        for tile in set(tiles):
+            data = self.cache.get(self._key(tile)) if self.cache else None
+            if data is None:
+                missing.put(tile)
+            else:
+                results[tile] = data
+        errors = []
+
+        def worker():
+            while True:
+                try:
+                    tile = missing.get_nowait()
+                except Empty:
+                    return
+                bounds = tile_bounds(*tile)
+                query = 'bbox=%s,%s,%s,%s' % (bounds.west, bounds.south,
+                                              bounds.east, bounds.north)
+                try:
+                    data = self._pool.get(query)
+                except (HTTPException, IOError, socket.error) as error:
+                    errors.append(error)
+                    return
+                if self.cache:
+                    self.cache.put(self._key(tile), data)
+                results[tile] = data
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(min(self.connections, missing.qsize()))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def fetch_bounds(self, bounds):
+        """Fetch an OSM region covering an area.
+
+        :param point.Bounds bounds: Area to fetch
+        :rtype: :class:`Osm`
+        :return: Merged data from all tiles covering ``bounds``
+        :raise ValueError: Area covers more than ``max_tiles`` tiles
+        """
+        return self.fetch_many_bounds([bounds])[0]
+
+    def fetch(self, location, distance):
+        """Fetch an OSM region around a location.
+
+        .. seealso::
+
+           :func:`get_area_url`
+
+        :param Point location: Centre of the region
+        :param int distance: Boundary distance in kilometres
+        :rtype: :class:`Osm`
+        :return: Merged data from all tiles covering the region
+        """
+        return self.fetch_bounds(area_bounds(location, distance))
+
+    def fetch_many(self, areas):
+        """Fetch several OSM regions, sharing tiles between them.
+
+        :type areas: ``list`` of ``tuple``
+        :param areas: Location and distance pairs
+        :rtype: ``list`` of :class:`Osm`
+        :return: Merged data for each region
+        """
+        return self.fetch_many_bounds([area_bounds(location, distance)
+                                       for location, distance in areas])
+
+    def fetch_many_bounds(self, areas):
+        """Fetch OSM regions covering several areas.
+
+        :type areas: ``list`` of :class:`point.Bounds`
+        :param areas: Areas to fetch
+        :rtype: ``list`` of :class:`Osm`
+        :return: Merged data for each area
+        :raise ValueError: An area covers more than ``max_tiles`` tiles
+        """
+        area_tile_lists = []
+        for bounds in areas:
+            tiles = area_tiles(bounds, self.zoom)
+            if len(tiles) > self.max_tiles:
+                raise ValueError('Area requires %d tiles, limit is %d'
+                                 % (len(tiles), self.max_tiles))
+            area_tile_lists.append(tiles)
+        data = self.fetch_tiles([tile for tiles in area_tile_lists
+                                 for tile in tiles])
+        parsed = dict((tile, Osm(BytesIO(value)))
+                      for tile, value in data.items())
+        return [merge_osm(parsed[tile] for tile in tiles)
+                for tiles in area_tile_lists]
+
+    def close(self):
+        """Close pooled connections."""
+        self._pool.close()
+
+
+def merge_osm(regions):
+    """Merge OSM regions, dropping duplicate elements.
+
+    :type regions: ``list`` of :class:`Osm`
+    :param regions: Regions to merge
+    :rtype: :class:`Osm`
+    :return: Elements from all regions, in order of first appearance
+
+    .. versionadded:: 0.13.0
+    """
+    merged = Osm()
+    seen = set()
+    for region in regions:
+        for element in region:
+            key = (type(element), element.ident)
+            if key not in seen:
+                seen.add(key)
+                merged.append(element)
+    return merged
@@ -25,10 +25,14 @@ __doc__ += """.
 .. versionadded:: 0.1.0
 """
 
+import datetime
+import heapq
 import math
 
+from array import array
+
 from upoints import utils
-from upoints.compat import mangle_repr_type
+from upoints.compat import (basestring, mangle_repr_type)
 
 
 def _manage_location(attr):
@@ -92,10 +96,15 @@ class Point(object):
         :param float longitude: Location's longitude
         :param str angle: Type for specified angles
         :param str units: Units type to be used for distances
-        :param int timezone: Offset from UTC in minutes
+        :type timezone: ``int`` or ``datetime.tzinfo``
+        :param timezone: Offset from UTC in minutes, or time zone of location
         :raise ValueError: Unknown value for ``angle``
         :raise ValueError: Unknown value for ``units``
         :raise ValueError: Invalid value for ``latitude`` or ``longitude``
+
+        .. versionchanged:: 0.13.0
+           ``timezone`` may be a ``datetime.tzinfo`` object, so that daylight
+           saving time is honoured by the sun event methods
         """
         super(Point, self).__init__()
         if angle in ('degrees', 'radians'):
@@ -453,6 +462,25 @@ class Point(object):
         return utils.sun_events(self.latitude, self.longitude, date,
                                 self.timezone, zenith)
 
+    def sun_events_series(self, dates, zenith=None):
+        """Calculate sunrise and sunset times for many dates.
+
+        .. seealso::
+
+           :func:`utils.sun_events_series`
+
+        :type dates: ``list`` of :class:`datetime.date`
+        :param dates: Dates to calculate rise and set for
+        :param str zenith: Calculate rise/set events, or twilight times
+        :rtype: ``list`` of ``tuple`` of :class:`datetime.time`
+        :return: The time for the rise and set events on each date in the
+            specified timezone
+
+        .. versionadded:: 0.13.0
+        """
+        return utils.sun_events_series(self.latitude, self.longitude, dates,
+                                       self.timezone, zenith)
+
     # Inverse and forward are the common functions expected by people that are
     # familiar with geodesics.
     def inverse(self, other):
@@ -494,6 +522,918 @@ class TimedPoint(Point):
         self.time = time
 
 
+class Bounds(object):
+
+    """Class for representing the bounding box of a group of locations.
+
+    Boxes that cross the antimeridian have a ``west`` edge greater than their
+    ``east`` edge, and longitudes are always added to whichever side extends
+    the box the least.
+
+    .. versionadded:: 0.13.0
+    """
+
+    __slots__ = ('south', 'north', 'west', 'east')
+
+    def __init__(self, points=None):
+        """Initialise a new ``Bounds`` object.
+
+        :type points: ``list`` of :class:`Point`
+        :param points: Locations to include in the box
+        """
+        super(Bounds, self).__init__()
+        self.south = self.north = self.west = self.east = None
+        if points:
+            self.extend(points)
+
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String representation of ``Bounds`` object
+        """
+        return 'Bounds(south=%r, north=%r, west=%r, east=%r)' \
+            % (self.south, self.north, self.west, self.east)
+
+    def __bool__(self):
+        """Check whether the box contains any locations.
+
+        :rtype: ``bool``
+        """
+        return self.south is not None
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        return isinstance(other, Bounds) and \
+            (self.south, self.north, self.west, self.east) == \
+            (other.south, other.north, other.west, other.east)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    @property
+    def crosses_antimeridian(self):
+        """Whether the box crosses the antimeridian.
+
+        :rtype: ``bool``
+        """
+        return self.west is not None and self.west > self.east
+
+    def add(self, latitude, longitude):
+        """Extend the box to include a location.
+
+        :param float latitude: Location's latitude
+        :param float longitude: Location's longitude
+        """
+        if self.south is None:
+            self.south = self.north = latitude
+            self.west = self.east = longitude
+            return
+        if latitude < self.south:
+            self.south = latitude
+        elif latitude > self.north:
+            self.north = latitude
+        if not self.contains_longitude(longitude):
+            if (longitude - self.east) % 360 <= (self.west - longitude) % 360:
+                self.east = longitude
+            else:
+                self.west = longitude
+
+    def add_point(self, point):
+        """Extend the box to include a location object.
+
+        Objects that aren't :class:`Point` instances, such as OSM ways, are
+        ignored.
+
+        :param Point point: Location to include
+        """
+        if isinstance(point, Point):
+            self.add(point.latitude, point.longitude)
+
+    def extend(self, points):
+        """Extend the box to include several locations.
+
+        :type points: ``list`` of :class:`Point`
+        :param points: Locations to include
+        """
+        for point in points:
+            if isinstance(point, Point):
+                self.add(point.latitude, point.longitude)
+
+    def update(self, other):
+        """Extend the box to include another box.
+
+        :param Bounds other: Box to include
+        """
+        if not other:
+            return
+        if not self:
+            self.south, self.north = other.south, other.north
+            self.west, self.east = other.west, other.east
+            return
+        self.south = min(self.south, other.south)
+        self.north = max(self.north, other.north)
+        # Keep the smallest arc eastwards from one of the western edges to
+        # one of the eastern edges that covers both longitude ranges
+        ranges = ((self.west, self.east), (other.west, other.east))
+        best = None
+        for west, _ in ranges:
+            for _, east in ranges:
+                width = _longitude_span(west, east)
+                if best is not None and width >= best[0]:
+                    continue
+                if all((start - west) % 360 + _longitude_span(start, end)
+                       <= width for start, end in ranges):
+                    best = (width, west, east)
+        if best is None:
+            self.west, self.east = -180, 180
+        else:
+            _, self.west, self.east = best
+
+    def contains_longitude(self, longitude):
+        """Test whether a longitude is within the box.
+
+        :param float longitude: Longitude to test
+        :rtype: ``bool``
+        """
+        if self.west <= self.east:
+            return self.west <= longitude <= self.east
+        else:
+            return longitude >= self.west or longitude <= self.east
+
+    def contains(self, latitude, longitude):
+        """Test whether a location is within the box.
+
+        :param float latitude: Latitude to test
+        :param float longitude: Longitude to test
+        :rtype: ``bool``
+        """
+        return bool(self) and self.south <= latitude <= self.north \
+            and self.contains_longitude(longitude)
+
+    def __contains__(self, point):
+        return self.contains(point.latitude, point.longitude)
+
+    def _on_edge(self, point):
+        """Test whether removing a location could shrink the box.
+
+        :param Point point: Location to test
+        :rtype: ``bool``
+        """
+        return isinstance(point, Point) and \
+            (point.latitude in (self.south, self.north)
+             or point.longitude in (self.west, self.east))
+
+    def as_dict(self):
+        """Generate GPX style bounds.
+
+        :rtype: ``dict``
+        :return: ``minlat``, ``maxlat``, ``minlon`` and ``maxlon`` values
+        """
+        return {'minlat': self.south, 'maxlat': self.north,
+                'minlon': self.west, 'maxlon': self.east}
+
+
+def _longitude_span(west, east):
+    """Calculate the width of a longitude range.
+
+    :param float west: Western edge of the range
+    :param float east: Eastern edge of the range
+    :rtype: ``float``
+    :return: Degrees eastwards from ``west`` to ``east``
+    """
+    return east - west if west <= east else east - west + 360
+
+
+def _unit_vector(latitude, longitude):
+    """Convert a location to a unit vector.
+
+    :param float latitude: Location's latitude in degrees
+    :param float longitude: Location's longitude in degrees
+    :rtype: ``tuple`` of ``float``
+    :return: Cartesian co-ordinates of location on a unit sphere
+    """
+    latitude = math.radians(latitude)
+    longitude = math.radians(longitude)
+    cos_latitude = math.cos(latitude)
+    return (cos_latitude * math.cos(longitude),
+            cos_latitude * math.sin(longitude), math.sin(latitude))
+
+
+def _polylines(route):
+    """Split a route in to lists of locations.
+
+    :param route: Locations, or segments of locations
+    :rtype: ``list`` of ``list`` of :class:`Point`
+    :return: Polylines forming the route
+    """
+    route = list(route)
+    if route and not isinstance(route[0], Point):
+        return [list(segment) for segment in route]
+    return [route]
+
+
+def _arc_extremes(segment):
+    """Find latitudes where a great circle arc bulges beyond its ends.
+
+    :param tuple segment: End points, normal and bounding plane normals of
+        the arc, as produced by :meth:`Corridor._segment`
+    :rtype: ``list`` of ``float``
+    :return: Latitude of the arc's most poleward points, if within the arc
+    """
+    _, _, normal, after_start, before_end = segment
+    if not normal:
+        return []
+    nx, ny, nz = normal
+    vx, vy, vz = -nz * nx, -nz * ny, 1 - nz * nz
+    length = math.sqrt(vx * vx + vy * vy + vz * vz)
+    if length < 1e-15:
+        return []
+    latitudes = []
+    for sign in (1, -1):
+        vertex = (sign * vx, sign * vy, sign * vz)
+        if _dot(vertex, after_start) >= 0 and _dot(vertex, before_end) >= 0:
+            latitudes.append(math.degrees(math.asin(
+                max(-1, min(1, vertex[2] / length)))))
+    return latitudes
+
+
+class _BoxGrid(object):
+
+    """Class for indexing bounding boxes by grid cell.
+
+    The cell size is chosen from the median box extent, so that most boxes
+    only cover a handful of cells.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, boxes):
+        """Initialise a new ``_BoxGrid`` object.
+
+        :type boxes: ``list`` of ``tuple``
+        :param boxes: South, north, west and east edges for each box, with
+            ``None`` for longitudes when the box covers all longitudes
+        """
+        super(_BoxGrid, self).__init__()
+        extents = sorted(max(north - south,
+                             360 if west is None else (east - west) % 360)
+                         for south, north, west, east in boxes)
+        size = max(extents[len(extents) // 2], 1e-3) if extents else 90
+        self.columns = int(math.ceil(360 / min(size, 90)))
+        self.size = 360 / self.columns
+        self.cells = cells = {}
+        for index, (south, north, west, east) in enumerate(boxes):
+            rows = range(int(math.floor(south / self.size)),
+                         int(math.floor(north / self.size)) + 1)
+            if west is None:
+                columns = range(self.columns)
+            else:
+                first = int(math.floor((west + 180) / self.size))
+                last = int(math.floor((west + (east - west) % 360 + 180)
+                                      / self.size))
+                columns = set(i % self.columns
+                              for i in range(first, last + 1))
+            for row in rows:
+                for column in columns:
+                    cells.setdefault((row, column), []).append(index)
+
+    def candidates(self, latitude, longitude):
+        """Find boxes that may contain a location.
+
+        :param float latitude: Location's latitude
+        :param float longitude: Location's longitude
+        :rtype: ``list`` of ``int``
+        :return: Indexes of boxes overlapping location's cell
+        """
+        return self.cells.get((int(math.floor(latitude / self.size)),
+                               int(math.floor((longitude + 180)
+                                              / self.size))
+                               % self.columns), ())
+
+
+class _SphereGrid(object):
+
+    """Class for finding the nearest locations on the sphere.
+
+    Locations are indexed in a grid of cubes on the unit sphere, as in
+    :func:`_cluster`, with the cube size chosen so that each cube holds a few
+    locations.  Searches visit shells of cubes around the query until no
+    unvisited cube can hold a closer location.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, points):
+        """Initialise a new ``_SphereGrid`` object.
+
+        :type points: ``list`` of :class:`Point`
+        :param points: Locations to index
+        """
+        super(_SphereGrid, self).__init__()
+        self.vectors = [_unit_vector(i.latitude, i.longitude) for i in points]
+        # Roughly four locations for each cube crossing the sphere's surface,
+        # shrunk for locations clustered in a small area
+        size = min(2, math.sqrt(16 * math.pi / max(len(self.vectors), 1)))
+        while True:
+            cells = {}
+            for index, (x, y, z) in enumerate(self.vectors):
+                cells.setdefault((int(math.floor(x / size)),
+                                  int(math.floor(y / size)),
+                                  int(math.floor(z / size))), []).append(index)
+            crowding = len(self.vectors) / max(len(cells), 1)
+            if crowding <= 8 or size < 1e-6:
+                break
+            size /= math.sqrt(crowding / 4)
+        self.size = size
+        self.extent = int(math.ceil(2 / size)) + 1
+        self.cells = cells
+        # Locations only occupy a thin layer of cubes, so range searches
+        # walk columns of cubes instead of every cube in a block
+        self.columns = columns = {}
+        for (x, y, z), members in cells.items():
+            columns.setdefault((x, y), []).append((z, members))
+
+    def _shell(self, key, radius):
+        """Find the members of cubes in a shell around a cube.
+
+        :param tuple key: Central cube
+        :param int radius: Distance in cubes from central cube
+        :rtype: ``list`` of ``int``
+        :return: Indexes of locations in the shell
+        """
+        cells = self.cells
+        x, y, z = key
+        if 26 * radius * radius > len(cells):
+            # Cheaper to filter the occupied cubes than walk the shell
+            return [index for (i, j, k), members in cells.items()
+                    if max(abs(i - x), abs(j - y), abs(k - z)) == radius
+                    for index in members]
+        found = []
+        sides = range(-radius, radius + 1)
+        for i in sides:
+            for j in sides:
+                if radius in (abs(i), abs(j)):
+                    depths = sides
+                else:
+                    depths = (-radius, radius) if radius else (0, )
+                for k in depths:
+                    found.extend(cells.get((x + i, y + j, z + k), ()))
+        return found
+
+    def nearest(self, latitude, longitude, k=1):
+        """Find the nearest locations to a position.
+
+        :param float latitude: Position's latitude
+        :param float longitude: Position's longitude
+        :param int k: Number of locations to find
+        :rtype: ``list`` of ``tuple`` of ``int`` and ``float``
+        :return: Indexes of the nearest locations, and their angular
+            distances in radians, nearest first
+        """
+        size = self.size
+        vectors = self.vectors
+        ax, ay, az = _unit_vector(latitude, longitude)
+        key = (int(math.floor(ax / size)), int(math.floor(ay / size)),
+               int(math.floor(az / size)))
+        # Once shells hold more cubes than are occupied every shell is a scan
+        # of all the cubes, and scanning the locations once is cheaper.  This
+        # is the case for queries far from clustered locations, or for
+        # requests for most of the locations.
+        limit = min(self.extent, int(math.sqrt(len(self.cells) / 26)))
+        heap = []
+        radius = 0
+        if k >= len(vectors):
+            radius = limit + 1
+        while radius <= limit:
+            # Cubes in the next shell are at least radius - 1 cubes away
+            if len(heap) == k and -heap[0][0] <= ((radius - 1) * size) ** 2:
+                break
+            for index in self._shell(key, radius):
+                bx, by, bz = vectors[index]
+                chord = (ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2
+                if len(heap) < k:
+                    heapq.heappush(heap, (-chord, index))
+                elif chord < -heap[0][0]:
+                    heapq.heapreplace(heap, (-chord, index))
+            radius += 1
+        else:
+            found = heapq.nsmallest(k, (((ax - bx) ** 2 + (ay - by) ** 2 +
+                                         (az - bz) ** 2, index)
+                                        for index, (bx, by, bz)
+                                        in enumerate(vectors)))
+            heap = [(-chord, index) for chord, index in found]
+        return [(index, 2 * math.asin(min(1, math.sqrt(chord) / 2)))
+                for chord, index in sorted((-chord, index)
+                                           for chord, index in heap)]
+
+    def within(self, latitude, longitude, angle):
+        """Find locations within an angular distance of a position.
+
+        :param float latitude: Position's latitude
+        :param float longitude: Position's longitude
+        :param float angle: Angular distance in radians
+        :rtype: ``list`` of ``tuple`` of ``int`` and ``float``
+        :return: Indexes of the locations, and their angular distances in
+            radians, nearest first
+        """
+        size = self.size
+        vectors = self.vectors
+        ax, ay, az = _unit_vector(latitude, longitude)
+        key = (int(math.floor(ax / size)), int(math.floor(ay / size)),
+               int(math.floor(az / size)))
+        limit = 2 * math.sin(min(angle, math.pi) / 2)
+        radius = min(int(math.ceil(limit / size)), self.extent)
+        x, y, z = key
+        columns = self.columns
+        candidates = []
+        for i in range(x - radius, x + radius + 1):
+            for j in range(y - radius, y + radius + 1):
+                column = columns.get((i, j))
+                if column:
+                    candidates.extend(members for k, members in column
+                                      if abs(k - z) <= radius)
+        limit *= limit
+        found = []
+        for members in candidates:
+            for index in members:
+                bx, by, bz = vectors[index]
+                chord = (ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2
+                if chord <= limit:
+                    found.append((chord, index))
+        found.sort()
+        return [(index, 2 * math.asin(min(1, math.sqrt(chord) / 2)))
+                for chord, index in found]
+
+
+class Corridor(object):
+
+    """Class for testing proximity of locations to a route.
+
+    Locations are compared against the great circle segments of a route
+    using cross-track distances, with segments only considered for locations
+    in grid cells that their padded bounding box overlaps.  An instance can
+    be reused to test several sets of locations against the same route.
+
+    .. versionadded:: 0.13.0
+    """
+
+    def __init__(self, route, distance):
+        """Initialise a new ``Corridor`` object.
+
+        :param route: Locations, or segments of locations, forming the route
+        :param float distance: Width of the corridor either side of the route
+            in kilometres
+        :raise ValueError: Route contains no locations
+        """
+        super(Corridor, self).__init__()
+        self.distance = distance
+        self._angle = distance / utils.BODY_RADIUS
+        self._sin_angle = math.sin(self._angle)
+        self._chord = (2 * math.sin(self._angle / 2)) ** 2
+        self.segments = []
+        boxes = []
+        for polyline in _polylines(route):
+            vectors = [_unit_vector(i.latitude, i.longitude)
+                       for i in polyline]
+            if len(polyline) == 1:
+                polyline = polyline * 2
+                vectors = vectors * 2
+            for i in range(len(polyline) - 1):
+                self.segments.append(self._segment(vectors[i],
+                                                   vectors[i + 1]))
+                boxes.append(self._box(polyline[i], polyline[i + 1],
+                                       self.segments[-1]))
+        if not self.segments:
+            raise ValueError('Route contains no locations')
+        self._grid = _BoxGrid(boxes)
+
+    @staticmethod
+    def _segment(start, end):
+        """Precalculate vectors for testing a segment.
+
+        :param tuple start: Unit vector for start of segment
+        :param tuple end: Unit vector for end of segment
+        :rtype: ``tuple``
+        :return: End points, normal of the great circle, and normals of the
+            planes bounding the segment
+        """
+        ax, ay, az = start
+        bx, by, bz = end
+        nx, ny, nz = ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+        length = math.sqrt(nx * nx + ny * ny + nz * nz)
+        if length < 1e-15:
+            return (start, end, None, None, None)
+        normal = (nx / length, ny / length, nz / length)
+        nx, ny, nz = normal
+        after_start = (ny * az - nz * ay, nz * ax - nx * az, nx * ay - ny * ax)
+        before_end = (by * nz - bz * ny, bz * nx - bx * nz, bx * ny - by * nx)
+        return (start, end, normal, after_start, before_end)
+
+    def _box(self, start, end, segment):
+        """Calculate a segment's bounding box, padded by corridor width.
+
+        :param Point start: Start of segment
+        :param Point end: End of segment
+        :param tuple segment: Precalculated segment vectors
+        :rtype: ``tuple`` of ``float``
+        :return: South, north, west and east edges, with ``None`` for
+            longitudes when the box covers all longitudes
+        """
+        bounds = Bounds([start, end])
+        for latitude in _arc_extremes(segment):
+            bounds.south = min(bounds.south, latitude)
+            bounds.north = max(bounds.north, latitude)
+        padding = math.degrees(self._angle)
+        south = bounds.south - padding
+        north = bounds.north + padding
+        if south <= -90 or north >= 90:
+            return (max(south, -90), min(north, 90), None, None)
+        ratio = self._sin_angle / math.cos(math.radians(max(-south, north)))
+        if ratio >= 1:
+            return (south, north, None, None)
+        padding = math.degrees(math.asin(ratio))
+        if (bounds.east - bounds.west) % 360 + 2 * padding >= 360:
+            return (south, north, None, None)
+        return (south, north, bounds.west - padding, bounds.east + padding)
+
+    def _angles(self, vector, candidates):
+        """Calculate angular distances from a location to segments.
+
+        :param tuple vector: Unit vector for location
+        :param list candidates: Indexes of segments to test
+        :rtype: ``list`` of ``float``
+        :return: Angular distance to each segment in radians
+        """
+        angles = []
+        for index in candidates:
+            start, end, normal, after_start, before_end = \
+                self.segments[index]
+            if normal and _dot(vector, after_start) >= 0 \
+                    and _dot(vector, before_end) >= 0:
+                angle = math.asin(min(1, abs(_dot(vector, normal))))
+            else:
+                angle = 2 * math.asin(min(1, math.sqrt(
+                    min(_chord(vector, start), _chord(vector, end))) / 2))
+            angles.append(angle)
+        return angles
+
+    def contains(self, latitude, longitude):
+        """Test whether a location is within the corridor.
+
+        :param float latitude: Latitude to test
+        :param float longitude: Longitude to test
+        :rtype: ``bool``
+        """
+        candidates = self._grid.candidates(latitude, longitude)
+        if not candidates:
+            return False
+        vector = _unit_vector(latitude, longitude)
+        sin_angle = self._sin_angle
+        chord = self._chord
+        for index in candidates:
+            start, end, normal, after_start, before_end = \
+                self.segments[index]
+            if normal and _dot(vector, after_start) >= 0 \
+                    and _dot(vector, before_end) >= 0:
+                if abs(_dot(vector, normal)) <= sin_angle:
+                    return True
+            elif _chord(vector, start) <= chord \
+                    or _chord(vector, end) <= chord:
+                return True
+        return False
+
+    def __contains__(self, point):
+        return self.contains(point.latitude, point.longitude)
+
+    def distance_to(self, point):
+        """Calculate the distance from a location to the route.
+
+        :param Point point: Location to calculate distance from
+        :rtype: ``float``
+        :return: Distance to the nearest segment in kilometres, or ``None``
+            if location is outside the corridor
+        """
+        candidates = self._grid.candidates(point.latitude, point.longitude)
+        if not candidates:
+            return None
+        angle = min(self._angles(_unit_vector(point.latitude,
+                                              point.longitude),
+                                 candidates))
+        if angle > self._angle:
+            return None
+        return angle * utils.BODY_RADIUS
+
+
+def _dot(first, second):
+    """Calculate the dot product of two vectors.
+
+    :param tuple first: First vector
+    :param tuple second: Second vector
+    :rtype: ``float``
+    """
+    return first[0] * second[0] + first[1] * second[1] + first[2] * second[2]
+
+
+def _chord(first, second):
+    """Calculate the squared chord length between two unit vectors.
+
+    :param tuple first: First vector
+    :param tuple second: Second vector
+    :rtype: ``float``
+    """
+    return (first[0] - second[0]) ** 2 + (first[1] - second[1]) ** 2 \
+        + (first[2] - second[2]) ** 2
+
+
+def _slerp(start, end, angle, fraction):
+    """Interpolate along the great circle between two unit vectors.
+
+    :param tuple start: Unit vector for start of arc
+    :param tuple end: Unit vector for end of arc
+    :param float angle: Angle between ``start`` and ``end`` in radians
+    :param float fraction: Distance along arc, as a fraction of ``angle``
+    :rtype: ``tuple`` of ``float``
+    :return: Latitude and longitude of interpolated location
+    """
+    sin_angle = math.sin(angle)
+    if sin_angle < 1e-12:
+        start_weight, end_weight = 1 - fraction, fraction
+    else:
+        start_weight = math.sin((1 - fraction) * angle) / sin_angle
+        end_weight = math.sin(fraction * angle) / sin_angle
+    x = start_weight * start[0] + end_weight * end[0]
+    y = start_weight * start[1] + end_weight * end[1]
+    z = start_weight * start[2] + end_weight * end[2]
+    return (math.degrees(math.atan2(z, math.sqrt(x * x + y * y))),
+            math.degrees(math.atan2(y, x)))
+
+
+def _legs(points):
+    """Calculate unit vectors and great circle angles for legs of a track.
+
+    :type points: ``list`` of :class:`Point`
+    :param points: Locations forming track
+    :rtype: ``list`` of ``tuple``
+    :return: Start vector, end vector and angle in radians for each leg
+    """
+    vectors = [_unit_vector(i.latitude, i.longitude) for i in points]
+    legs = []
+    for start, end in zip(vectors, vectors[1:]):
+        ax, ay, az = start
+        bx, by, bz = end
+        cross = math.sqrt((ay * bz - az * by) ** 2 + (az * bx - ax * bz) ** 2
+                          + (ax * by - ay * bx) ** 2)
+        legs.append((start, end, math.atan2(cross, _dot(start, end))))
+    return legs
+
+
+def _interpolate_time(start, end, fraction):
+    """Interpolate between two times.
+
+    :param datetime.datetime start: Start time
+    :param datetime.datetime end: End time
+    :param float fraction: Fraction of duration to move
+    :rtype: :class:`datetime.datetime`
+    :return: Interpolated time, or ``None`` if either time is unknown
+    """
+    if start is None or end is None:
+        return None
+    return start + datetime.timedelta(
+        seconds=utils.total_seconds(end - start) * fraction)
+
+
+def _resample(points, measures, step, times=None):
+    """Interpolate locations at fixed intervals along a track.
+
+    :type points: ``list`` of :class:`Point`
+    :param points: Locations forming track
+    :param list measures: Cumulative distance or time at each location
+    :param float step: Interval between samples, in ``measures`` units
+    :param list times: Time for each location, if known
+    :rtype: ``list`` of ``tuple``
+    :return: Latitude, longitude and time for each sample
+    """
+    if len(points) == 1:
+        # A lone location has no legs, but is still the first sample
+        return [(points[0].latitude, points[0].longitude,
+                 times[0] if times else None)]
+    samples = []
+    target = measures[0]
+    for i, (start, end, angle) in enumerate(_legs(points)):
+        length = measures[i + 1] - measures[i]
+        while target <= measures[i + 1]:
+            if length > 0:
+                fraction = (target - measures[i]) / length
+            else:
+                fraction = 0
+            latitude, longitude = _slerp(start, end, angle, fraction)
+            time = _interpolate_time(times[i], times[i + 1], fraction) \
+                if times else None
+            samples.append((latitude, longitude, time))
+            target = measures[0] + len(samples) * step
+    return samples
+
+
+def _spherical_mean(vectors):
+    """Calculate the mean location of unit vectors on the sphere.
+
+    :type vectors: ``list`` of ``tuple``
+    :param vectors: Unit vectors to average
+    :rtype: :class:`Point`
+    :return: Location of the normalised vector sum
+    """
+    x = sum(i[0] for i in vectors)
+    y = sum(i[1] for i in vectors)
+    z = sum(i[2] for i in vectors)
+    if x * x + y * y + z * z < 1e-24:
+        # Evenly spread around the sphere, so any member will do
+        x, y, z = vectors[0]
+    return Point(math.degrees(math.atan2(z, math.sqrt(x * x + y * y))),
+                 math.degrees(math.atan2(y, x)))
+
+
+def _cluster(points, eps_km, min_points, method):
+    """Group locations in to clusters.
+
+    Locations are indexed in a grid of cubes on the unit sphere, sized so
+    that all neighbours within ``eps_km`` of a location are in the adjacent
+    cubes.
+
+    :type points: ``list`` of :class:`Point`
+    :param points: Locations to cluster
+    :param float eps_km: Cell size or neighbourhood radius in kilometres
+    :param int min_points: Minimum number of locations in a cluster
+    :param str method: ``grid`` or ``dbscan``
+    :rtype: ``tuple`` of ``array`` and ``list``
+    :return: Cluster label for each location, with ``-1`` for noise, and
+        centroid for each cluster
+    :raise ValueError: Unknown value for ``method``, or ``eps_km`` isn't
+        positive
+    """
+    if method not in ('grid', 'dbscan'):
+        raise ValueError('Unknown method type %r' % method)
+    if not eps_km > 0:
+        raise ValueError('Cluster distance must be positive')
+    size = 2 * math.sin(min(eps_km / utils.BODY_RADIUS, math.pi) / 2)
+    limit = size * size
+    vectors = []
+    cells = {}
+    cell_keys = []
+    for index, location in enumerate(points):
+        if isinstance(location, Point):
+            vector = _unit_vector(location.latitude, location.longitude)
+            key = (int(math.floor(vector[0] / size)),
+                   int(math.floor(vector[1] / size)),
+                   int(math.floor(vector[2] / size)))
+            cells.setdefault(key, []).append(index)
+        else:
+            vector = key = None
+        vectors.append(vector)
+        cell_keys.append(key)
+    labels = array('l', [-1]) * len(vectors)
+
+    if method == 'grid':
+        clusters = []
+        for key in cell_keys:
+            members = cells.get(key)
+            if members and len(members) >= min_points:
+                for index in members:
+                    labels[index] = len(clusters)
+                clusters.append(members)
+                del cells[key]
+    else:
+        nearby_cache = {}
+
+        def nearby(key):
+            # Locations in the adjacent cells, shared by all of a cell's
+            # members
+            if key not in nearby_cache:
+                x, y, z = key
+                nearby_cache[key] = [index
+                                     for i in (x - 1, x, x + 1)
+                                     for j in (y - 1, y, y + 1)
+                                     for k in (z - 1, z, z + 1)
+                                     for index in cells.get((i, j, k), ())]
+            return nearby_cache[key]
+
+        def neighbours(index):
+            ax, ay, az = vectors[index]
+            found = []
+            for other in nearby(cell_keys[index]):
+                bx, by, bz = vectors[other]
+                if (ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2 <= limit:
+                    found.append(other)
+            return found
+
+        visited = [key is None for key in cell_keys]
+        clusters = []
+        for index in range(len(vectors)):
+            if visited[index]:
+                continue
+            visited[index] = True
+            found = neighbours(index)
+            if len(found) < min_points:
+                continue
+            label = len(clusters)
+            members = [index]
+            labels[index] = label
+            queue = found
+            while queue:
+                other = queue.pop()
+                if labels[other] == -1 and not other == index:
+                    labels[other] = label
+                    members.append(other)
+                if not visited[other]:
+                    visited[other] = True
+                    expansion = neighbours(other)
+                    if len(expansion) >= min_points:
+                        queue.extend(expansion)
+            clusters.append(members)
+    centroids = [_spherical_mean([vectors[i] for i in members])
+                 for members in clusters]
+    return labels, centroids
+
+
+def _point_slots(point_class):
+    """Find the stored attributes for a point class.
+
+    :param type point_class: :class:`Point` subclass to inspect
+    :rtype: ``list`` of ``str``
+    :return: Slot names, excluding those derived from other slots
+    """
+    slots = []
+    for cls in reversed(point_class.__mro__):
+        names = getattr(cls, '__slots__', ())
+        # A lone slot may be given as a bare string
+        if isinstance(names, basestring):
+            names = (names, )
+        for slot in names:
+            if slot not in slots and slot not in ('_angle', '_rad_latitude',
+                                                  '_rad_longitude'):
+                slots.append(slot)
+    return slots
+
+
+def _to_columns(points, point_class=Point):
+    """Encode locations as typed columns.
+
+    :type points: ``list`` of :class:`Point`
+    :param points: Locations to encode
+    :param type point_class: Class to take attributes from, if ``points``
+        contains more than one type of location
+    :rtype: ``dict``
+    :return: Column name to :func:`utils.encode_column` column mapping
+    """
+    classes = set(type(point) for point in points)
+    if len(classes) == 1:
+        point_class = classes.pop()
+    columns = {}
+    for slot in _point_slots(point_class):
+        columns[slot.lstrip('_')] = \
+            utils.encode_column([getattr(point, slot, None)
+                                 for point in points])
+    return columns
+
+
+def _from_columns(columns, point_class):
+    """Decode locations from typed columns.
+
+    :param dict columns: Columns produced by :func:`_to_columns`
+    :param type point_class: Class to create locations with
+    :rtype: ``list`` of :class:`Point`
+    :return: Decoded locations
+    """
+    defaults = {'units': 'metric', 'timezone': 0}
+    slots = _point_slots(point_class)
+    values = []
+    for slot in slots:
+        name = slot.lstrip('_')
+        if name in columns:
+            values.append(utils.decode_column(columns[name]))
+        elif name in ('latitude', 'longitude'):
+            raise ValueError('No %s column' % name)
+        else:
+            values.append(None)
+    length = len(columns['latitude']['data'])
+    values = [[defaults.get(slot)] * length if column is None else column
+              for slot, column in zip(slots, values)]
+
+    points = []
+    for row in zip(*values):
+        point = point_class.__new__(point_class)
+        point._angle = 'degrees'
+        for slot, value in zip(slots, row):
+            if slot in ('_latitude', '_longitude'):
+                point._set_location(slot[1:], value)
+            else:
+                setattr(point, slot, value)
+        points.append(point)
+    return points
+
+
 @mangle_repr_type
 class Points(list):
 
@@ -502,6 +1442,12 @@ class Points(list):
     .. versionadded:: 0.2.0
     """
 
+    #: Class used for locations created by :meth:`from_columns`
+    point_class = Point
+
+    #: Bounding box, maintained once it has been requested
+    _bounds = None
+
     def __init__(self, points=None, parse=False, units='metric'):
         """Initialise a new ``Points`` object.
 
@@ -545,6 +1491,132 @@ class Points(list):
                 latitude, longitude = utils.from_grid_locator(location)
             self.append(Point(latitude, longitude, self.units))
 
+    @property
+    def bounds(self):
+        """Bounding box of the locations.
+
+        The box is calculated when first requested, and then kept up to date
+        as locations are added.  Removing a location from the edge of the box
+        causes it to be recalculated on the next request.
+
+        .. note::
+           Changes to the coordinates of locations already in the collection
+           are not tracked.
+
+        :rtype: :class:`Bounds`
+
+        .. versionadded:: 0.13.0
+        """
+        if self._bounds is None:
+            self._bounds = Bounds(self)
+        return self._bounds
+
+    def _removed(self, point):
+        """Invalidate bounding box if a removed location was on its edge.
+
+        :param Point point: Location removed from the collection
+        """
+        if self._bounds is not None and self._bounds._on_edge(point):
+            self._bounds = None
+
+    def append(self, point):
+        super(Points, self).append(point)
+        if self._bounds is not None:
+            self._bounds.add_point(point)
+
+    def insert(self, index, point):
+        super(Points, self).insert(index, point)
+        if self._bounds is not None:
+            self._bounds.add_point(point)
+
+    def extend(self, points):
+        if self._bounds is not None:
+            points = list(points)
+            self._bounds.extend(points)
+        super(Points, self).extend(points)
+
+    def __iadd__(self, points):
+        self.extend(points)
+        return self
+
+    def __imul__(self, count):
+        super(Points, self).__imul__(count)
+        if not self:
+            self._bounds = None
+        return self
+
+    def __setitem__(self, index, value):
+        if self._bounds is not None:
+            if isinstance(index, slice):
+                self._bounds = None
+            else:
+                self._removed(self[index])
+        super(Points, self).__setitem__(index, value)
+        if self._bounds is not None:
+            self._bounds.add_point(value)
+
+    def __delitem__(self, index):
+        if self._bounds is not None:
+            if isinstance(index, slice):
+                self._bounds = None
+            else:
+                self._removed(self[index])
+        super(Points, self).__delitem__(index)
+
+    # Python 2 uses these for simple slices, bypassing the item methods
+    def __setslice__(self, i, j, sequence):
+        self.__setitem__(slice(i, j), sequence)
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(i, j))
+
+    def pop(self, index=-1):
+        point = super(Points, self).pop(index)
+        self._removed(point)
+        return point
+
+    def remove(self, point):
+        super(Points, self).remove(point)
+        self._removed(point)
+
+    def clear(self):
+        del self[:]
+
+    def to_columns(self):
+        """Export locations as typed columns.
+
+        Each stored attribute of the locations becomes a column, encoded with
+        :func:`utils.encode_column`.  Coordinates are always stored in degrees
+        in ``float64`` ``latitude`` and ``longitude`` columns.
+
+        :rtype: ``dict``
+        :return: Column name to column mapping
+
+        .. versionadded:: 0.13.0
+        """
+        return _to_columns(self, self.point_class)
+
+    @classmethod
+    def from_columns(cls, columns, point_class=None):
+        """Import locations from typed columns.
+
+        .. seealso::
+
+           :meth:`to_columns`
+
+        :param dict columns: Column name to column mapping
+        :param type point_class: Class to create locations with, defaults to
+            :attr:`point_class`
+        :rtype: ``Points``
+        :return: Locations created from ``columns``
+        :raise ValueError: Missing ``latitude`` or ``longitude`` column
+
+        .. versionadded:: 0.13.0
+        """
+        points = cls()
+        points.extend(_from_columns(columns, point_class or cls.point_class))
+        return points
+
     def distance(self, method='haversine'):
         """Calculate distances between locations.
 
@@ -598,6 +1670,115 @@ class Points(list):
         """
         return (self[i].midpoint(self[i + 1]) for i in range(len(self) - 1))
 
+    def cluster(self, eps_km, min_points=2, method='dbscan'):
+        """Group locations in to clusters.
+
+        The ``grid`` method clusters locations that share a grid cell
+        ``eps_km`` wide, and is a fast approximation for binning large
+        collections.  The ``dbscan`` method performs density-based
+        clustering, where clusters grow from locations with at least
+        ``min_points`` locations, including themselves, within ``eps_km``.
+
+        :param float eps_km: Cell size or neighbourhood radius in kilometres
+        :param int min_points: Minimum number of locations in a cluster, or
+            in a neighbourhood for ``dbscan``
+        :param str method: Clustering method, ``grid`` or ``dbscan``
+        :rtype: ``tuple`` of ``array`` and ``list`` of :class:`Point`
+        :return: Cluster label for each location, with ``-1`` for locations
+            not in any cluster, and the spherical mean of each cluster
+        :raise ValueError: Unknown value for ``method``
+
+        .. versionadded:: 0.13.0
+        """
+        return _cluster(self, eps_km, min_points, method)
+
+    def _interpolated(self, locations):
+        """Create a collection of interpolated locations.
+
+        :type locations: ``list`` of ``tuple`` or :class:`Point`
+        :param locations: Latitude, longitude and time for new locations, or
+            existing :class:`Point` objects
+        :rtype: :class:`Points`
+        """
+        return Points([x if isinstance(x, Point) else Point(x[0], x[1])
+                       for x in locations])
+
+    def resample(self, every_km=None, every_seconds=None):
+        """Resample locations at fixed intervals along great circle paths.
+
+        Samples are spaced evenly from the first location, so the final
+        location is only included if it falls on an interval.
+
+        .. seealso::
+
+           :meth:`densify`
+
+        :param float every_km: Distance between samples in kilometres
+        :param float every_seconds: Time between samples, only supported
+            by :class:`TimedPoints`
+        :rtype: :class:`Points`
+        :return: Evenly spaced locations along the track
+        :raise ValueError: Neither or both of ``every_km`` and
+            ``every_seconds`` given, or interval isn't positive
+        :raise NotImplementedError: Locations don't have a time
+
+        .. versionadded:: 0.13.0
+        """
+        if (every_km is None) == (every_seconds is None):
+            raise ValueError('One of every_km or every_seconds is required')
+        if not (every_km if every_seconds is None else every_seconds) > 0:
+            raise ValueError('Sample interval must be positive')
+        if every_seconds is not None:
+            raise NotImplementedError('Points objects have no time '
+                                      'attribute')
+        return self._interpolated(self._resample_distance(every_km))
+
+    def _resample_distance(self, every_km, times=None):
+        """Resample locations at fixed distances.
+
+        :param float every_km: Distance between samples in kilometres
+        :param list times: Time for each location, if known
+        :rtype: ``list`` of ``tuple``
+        :return: Latitude, longitude and time for each sample
+        """
+        if not self:
+            return []
+        measures = [0]
+        for _, _, angle in _legs(self):
+            measures.append(measures[-1] + angle * utils.BODY_RADIUS)
+        return _resample(self, measures, every_km, times)
+
+    def densify(self, max_segment_km):
+        """Add locations so that no leg exceeds a given length.
+
+        Original locations are kept, and legs are split evenly along their
+        great circle path.  This is useful for drawing long legs on maps
+        with projections where great circles are curved.  For
+        :class:`TimedPoints` the times of new locations are interpolated
+        within each leg, where known.
+
+        :param float max_segment_km: Maximum length of a leg in kilometres
+        :rtype: :class:`Points`
+        :return: Locations with additional points inserted in long legs
+        :raise ValueError: ``max_segment_km`` isn't positive
+
+        .. versionadded:: 0.13.0
+        """
+        if not max_segment_km > 0:
+            raise ValueError('Maximum segment length must be positive')
+        times = [getattr(x, 'time', None) for x in self]
+        locations = self[:1]
+        for i, (start, end, angle) in enumerate(_legs(self)):
+            count = int(math.ceil(angle * utils.BODY_RADIUS / max_segment_km))
+            for step in range(1, count):
+                fraction = step / count
+                latitude, longitude = _slerp(start, end, angle, fraction)
+                time = _interpolate_time(times[i], times[i + 1], fraction) \
+                    if times else None
+                locations.append((latitude, longitude, time))
+            locations.append(self[i + 1])
+        return self._interpolated(locations)
+
     def range(self, location, distance):
         """Test whether locations are within a given range of ``location``
 
@@ -608,6 +1789,26 @@ class Points(list):
         """
         return (x for x in self if location.__eq__(x, distance))
 
+    def within_corridor(self, route, distance):
+        """Find locations within a given distance of a route.
+
+        .. seealso::
+
+           :class:`Corridor`
+
+        :type route: ``list`` of :class:`Point`, or :class:`Corridor`
+        :param route: Locations, or segments of locations, forming the route
+        :param float distance: Distance in kilometres, ignored if ``route``
+            is a :class:`Corridor`
+        :rtype: ``list`` of :class:`Point`
+        :return: Points within ``distance`` of any segment of ``route``
+
+        .. versionadded:: 0.13.0
+        """
+        if not isinstance(route, Corridor):
+            route = Corridor(route, distance)
+        return (x for x in self if isinstance(x, Point) and x in route)
+
     def destination(self, bearing, distance):
         """Calculate destination locations for given distance and bearings.
 
@@ -660,22 +1861,219 @@ class Points(list):
 
 
 class TimedPoints(Points):
+    point_class = TimedPoint
+
+    def _times(self):
+        """Fetch times for locations.
+
+        :rtype: ``list`` of :class:`datetime.datetime`
+        :return: Time for each location
+        :raise NotImplementedError: Location without a time
+        """
+        try:
+            times = [i.time for i in self]
+        except AttributeError:
+            times = [None]
+        if None in times:
+            raise NotImplementedError('Not all Point objects include time '
+                                      'attribute')
+        return times
+
+    def _interpolated(self, locations):
+        """Create a collection of interpolated locations.
+
+        :type locations: ``list`` of ``tuple`` or :class:`Point`
+        :param locations: Latitude, longitude and time for new locations, or
+            existing :class:`Point` objects
+        :rtype: :class:`TimedPoints`
+        """
+        return TimedPoints([x if isinstance(x, Point)
+                            else TimedPoint(x[0], x[1], time=x[2])
+                            for x in locations])
+
+    def resample(self, every_km=None, every_seconds=None):
+        """Resample locations at fixed distance or time intervals.
+
+        Locations are interpolated along great circle paths, and times are
+        interpolated linearly within each leg.
+
+        .. seealso::
+
+           :meth:`Points.resample`
+
+        :param float every_km: Distance between samples in kilometres
+        :param float every_seconds: Time between samples in seconds
+        :rtype: :class:`TimedPoints`
+        :return: Evenly spaced locations along the track
+        :raise ValueError: Neither or both of ``every_km`` and
+            ``every_seconds`` given, or interval isn't positive
+        :raise NotImplementedError: Location without a time
+
+        .. versionadded:: 0.13.0
+        """
+        if (every_km is None) == (every_seconds is None):
+            raise ValueError('One of every_km or every_seconds is required')
+        if not (every_km if every_seconds is None else every_seconds) > 0:
+            raise ValueError('Sample interval must be positive')
+        if not self:
+            return TimedPoints()
+        times = self._times()
+        if every_km is not None:
+            samples = self._resample_distance(every_km, times)
+        else:
+            measures = [utils.total_seconds(time - times[0])
+                        for time in times]
+            if any(b < a for a, b in zip(measures, measures[1:])):
+                raise ValueError('Times must not decrease')
+            samples = _resample(self, measures, every_seconds, times)
+        return self._interpolated(samples)
+
     def speed(self):
         """Calculate speed between :class:`Points`
 
+        .. versionchanged:: 0.13.0
+           Durations include days and microseconds, and legs with no duration
+           produce ``None``
+
         :rtype: ``list`` of ``float``
         :return: Speed between :class:`Point` elements in km/h
         """
         if not len(self) > 1:
             raise RuntimeError('More than one location is required')
-        try:
-            times = [i.time for i in self]
-        except AttributeError:
-            raise NotImplementedError('Not all Point objects include time '
-                                      'attribute')
+        times = self._times()
+
+        durations = (utils.total_seconds(times[i + 1] - times[i])
+                     for i in range(len(times) - 1))
+        return (distance / (duration / 3600) if duration else None
+                for distance, duration in zip(self.distance(), durations))
+
+    def track_stats(self, stop_speed=1):
+        """Calculate statistics for each leg of a track.
+
+        All values are calculated in a single pass, reusing the trigonometric
+        values for each location in the distance, bearing and speed
+        calculations.  Leg values are listed in order, with ``None`` where
+        a value can't be calculated such as the speed over a leg without
+        a duration or the bearing change into the first leg.
+
+        Elevations are taken from an ``elevation`` attribute, if locations
+        have one.
+
+        :param float stop_speed: Speed below which a leg is treated as stopped
+        :rtype: ``dict``
+        :return: ``distance``, ``duration`` in seconds, ``speed`` in distance
+            units per hour, ``acceleration`` in distance units per hour per
+            second, ``bearing``, ``bearing_change`` and ``elevation`` change
+            lists for each leg, along with ``total_distance``,
+            ``total_duration``, ``elevation_gain``, ``elevation_loss``,
+            ``moving_time`` and ``stopped_time`` totals
+        :raise NotImplementedError: Location without a time
+
+        .. versionadded:: 0.13.0
+        """
+        times = self._times()
+        if self and self[0].units == 'imperial':
+            radius = utils.BODY_RADIUS / utils.STATUTE_MILE
+        elif self and self[0].units == 'nautical':
+            radius = utils.BODY_RADIUS / utils.NAUTICAL_MILE
+        else:
+            radius = utils.BODY_RADIUS
+
+        distances = []
+        durations = []
+        speeds = []
+        accelerations = []
+        bearings = []
+        bearing_changes = []
+        elevations = []
+        stats = {
+            'distance': distances,
+            'duration': durations,
+            'speed': speeds,
+            'acceleration': accelerations,
+            'bearing': bearings,
+            'bearing_change': bearing_changes,
+            'elevation': elevations,
+            'total_distance': 0,
+            'total_duration': 0,
+            'elevation_gain': 0,
+            'elevation_loss': 0,
+            'moving_time': 0,
+            'stopped_time': 0,
+        }
+        if len(self) < 2:
+            return stats
+
+        sin, cos, atan2, sqrt = math.sin, math.cos, math.atan2, math.sqrt
+        previous = self[0]
+        prev_lat = previous.rad_latitude
+        prev_lon = previous.rad_longitude
+        prev_sin = sin(prev_lat)
+        prev_cos = cos(prev_lat)
+        prev_ele = getattr(previous, 'elevation', None)
+        prev_time = times[0]
+        prev_speed = prev_duration = prev_bearing = None
+        for location, time in zip(self[1:], times[1:]):
+            lat = location.rad_latitude
+            lon = location.rad_longitude
+            lat_sin = sin(lat)
+            lat_cos = cos(lat)
+            lon_diff = lon - prev_lon
+
+            temp = sin((lat - prev_lat) / 2) ** 2 + \
+                prev_cos * lat_cos * sin(lon_diff / 2) ** 2
+            distance = 2 * radius * atan2(sqrt(temp), sqrt(1 - temp))
+            distances.append(distance)
+            stats['total_distance'] += distance
+
+            duration = utils.total_seconds(time - prev_time)
+            durations.append(duration)
+            stats['total_duration'] += duration
+            speed = distance / (duration / 3600) if duration else None
+            speeds.append(speed)
+            if speed is None or prev_speed is None \
+                    or not prev_duration + duration:
+                accelerations.append(None)
+            else:
+                accelerations.append((speed - prev_speed)
+                                     / ((prev_duration + duration) / 2))
+            if speed is not None:
+                if speed < stop_speed:
+                    stats['stopped_time'] += duration
+                else:
+                    stats['moving_time'] += duration
+
+            if distance:
+                bearing = math.degrees(atan2(
+                    sin(lon_diff) * lat_cos,
+                    prev_cos * lat_sin - prev_sin * lat_cos * cos(lon_diff)))
+                bearing = (bearing + 360) % 360
+            else:
+                bearing = None
+            bearings.append(bearing)
+            if bearing is None or prev_bearing is None:
+                bearing_changes.append(None)
+            else:
+                bearing_changes.append((bearing - prev_bearing + 180) % 360
+                                       - 180)
+
+            elevation = getattr(location, 'elevation', None)
+            if elevation is None or prev_ele is None:
+                elevations.append(None)
+            else:
+                change = elevation - prev_ele
+                elevations.append(change)
+                if change > 0:
+                    stats['elevation_gain'] += change
+                else:
+                    stats['elevation_loss'] -= change
 
-        return (distance / ((times[i + 1] - times[i]).seconds / 3600)
-                for i, distance in enumerate(self.distance()))
+            prev_lat, prev_lon, prev_sin, prev_cos = lat, lon, lat_sin, lat_cos
+            prev_ele, prev_time = elevation, time
+            prev_speed, prev_duration = speed, duration
+            if bearing is not None:
+                prev_bearing = bearing
+        return stats
 
 
 @mangle_repr_type
@@ -686,6 +2084,12 @@ class KeyedPoints(dict):
     .. versionadded:: 0.2.0
     """
 
+    #: Class used for locations created by :meth:`from_columns`
+    point_class = Point
+
+    #: Bounding box, maintained once it has been requested
+    _bounds = None
+
     def __init__(self, points=None, parse=False, units='metric'):
         """Initialise a new ``KeyedPoints`` object.
 
@@ -729,6 +2133,110 @@ class KeyedPoints(dict):
                 latitude, longitude = utils.from_grid_locator(location)
             self[identifier] = Point(latitude, longitude, self.units)
 
+    @property
+    def bounds(self):
+        """Bounding box of the locations.
+
+        .. seealso::
+
+           :attr:`Points.bounds`
+
+        :rtype: :class:`Bounds`
+
+        .. versionadded:: 0.13.0
+        """
+        if self._bounds is None:
+            self._bounds = Bounds(self.values())
+        return self._bounds
+
+    def _removed(self, point):
+        """Invalidate bounding box if a removed location was on its edge.
+
+        :param Point point: Location removed from the collection
+        """
+        if self._bounds is not None and self._bounds._on_edge(point):
+            self._bounds = None
+
+    def __setitem__(self, key, value):
+        if self._bounds is not None:
+            if key in self:
+                self._removed(self[key])
+        super(KeyedPoints, self).__setitem__(key, value)
+        if self._bounds is not None:
+            self._bounds.add_point(value)
+
+    def __delitem__(self, key):
+        if self._bounds is not None and key in self:
+            self._removed(self[key])
+        super(KeyedPoints, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        if self._bounds is None:
+            super(KeyedPoints, self).update(*args, **kwargs)
+        else:
+            for key, value in dict(*args, **kwargs).items():
+                self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        point = super(KeyedPoints, self).pop(key, *args)
+        self._removed(point)
+        return point
+
+    def popitem(self):
+        key, point = super(KeyedPoints, self).popitem()
+        self._removed(point)
+        return key, point
+
+    def clear(self):
+        super(KeyedPoints, self).clear()
+        self._bounds = None
+
+    def to_columns(self):
+        """Export keys and locations as typed columns.
+
+        .. seealso::
+
+           :meth:`Points.to_columns`
+
+        :rtype: ``dict``
+        :return: Column name to column mapping, with the keys in the ``key``
+            column
+
+        .. versionadded:: 0.13.0
+        """
+        keys = list(self)
+        columns = _to_columns([self[key] for key in keys], self.point_class)
+        columns['key'] = utils.encode_column(keys)
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns, point_class=None):
+        """Import keys and locations from typed columns.
+
+        .. seealso::
+
+           :meth:`to_columns`
+
+        :param dict columns: Column name to column mapping
+        :param type point_class: Class to create locations with, defaults to
+            :attr:`point_class`
+        :rtype: ``KeyedPoints``
+        :return: Locations created from ``columns``
+        :raise ValueError: Missing ``latitude`` or ``longitude`` column
+
+        .. versionadded:: 0.13.0
+        """
+        points = cls()
+        points.update(zip(utils.decode_column(columns['key']),
+                          _from_columns(columns,
+                                        point_class or cls.point_class)))
+        return points
+
     def distance(self, order, method='haversine'):
         """Calculate distances between locations.
 
@@ -798,6 +2306,49 @@ class KeyedPoints(dict):
         """
         return (x for x in self.items() if location.__eq__(x[1], distance))
 
+    def within_corridor(self, route, distance):
+        """Find locations within a given distance of a route.
+
+        .. seealso::
+
+           :class:`Corridor`
+
+        :type route: ``list`` of :class:`Point`, or :class:`Corridor`
+        :param route: Locations, or segments of locations, forming the route
+        :param float distance: Distance in kilometres, ignored if ``route``
+            is a :class:`Corridor`
+        :rtype: ``list`` of ``tuple`` of key and :class:`Point`
+        :return: Points within ``distance`` of any segment of ``route``
+
+        .. versionadded:: 0.13.0
+        """
+        if not isinstance(route, Corridor):
+            route = Corridor(route, distance)
+        return (x for x in self.items() if x[1] in route)
+
+    def cluster(self, eps_km, min_points=2, method='dbscan'):
+        """Group locations in to clusters.
+
+        .. seealso::
+
+           :meth:`Points.cluster`
+
+        :param float eps_km: Cell size or neighbourhood radius in kilometres
+        :param int min_points: Minimum number of locations in a cluster, or
+            in a neighbourhood for ``dbscan``
+        :param str method: Clustering method, ``grid`` or ``dbscan``
+        :rtype: ``tuple`` of ``dict`` and ``list`` of :class:`Point`
+        :return: Cluster label for each key, with ``-1`` for locations not in
+            any cluster, and the spherical mean of each cluster
+        :raise ValueError: Unknown value for ``method``
+
+        .. versionadded:: 0.13.0
+        """
+        keys = list(self.keys())
+        labels, centroids = _cluster([self[key] for key in keys], eps_km,
+                                     min_points, method)
+        return dict(zip(keys, labels)), centroids
+
     def destination(self, bearing, distance):
         """Calculate destination locations for given distance and bearings.
 
@@ -23,9 +23,9 @@ __doc__ += """.
 .. versionadded:: 0.2.0
 """
 
-from functools import partial
+import math
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 
 
 class Trigpoint(point.Point):
@@ -96,6 +96,15 @@ class Trigpoints(point.KeyedPoints):
     .. versionadded:: 0.5.1
     """
 
+    point_class = Trigpoint
+
+    #: Altitudes in metres dividing trigpoints in to bands for line of sight
+    #: searches
+    altitude_bands = (25, 50, 100, 200, 400, 800)
+
+    #: Spatial indexes, built when first queried
+    _grid = None
+
     def __init__(self, marker_file=None):
         """Initialise a new ``Trigpoints`` object."""
         super(Trigpoints, self).__init__()
@@ -103,6 +112,115 @@ class Trigpoints(point.KeyedPoints):
         if marker_file:
             self.import_locations(marker_file)
 
+    def __setitem__(self, key, value):
+        self._grid = None
+        super(Trigpoints, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._grid = None
+        super(Trigpoints, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._grid = None
+        super(Trigpoints, self).update(*args, **kwargs)
+
+    def pop(self, key, *args):
+        self._grid = None
+        return super(Trigpoints, self).pop(key, *args)
+
+    def popitem(self):
+        self._grid = None
+        return super(Trigpoints, self).popitem()
+
+    def clear(self):
+        self._grid = None
+        super(Trigpoints, self).clear()
+
+    def _build_grid(self):
+        """Index trigpoints for proximity searches.
+
+        Line of sight searches use separate indexes for each of
+        :attr:`altitude_bands`, so that low trigpoints are only considered
+        within their shorter reach.
+
+        :rtype: ``tuple``
+        :return: Identities and trigpoints with their spatial index, and
+            highest altitude, identities and trigpoints, and spatial index
+            for each altitude band
+        """
+        if self._grid is None:
+            items = list(self.items())
+            bands = {}
+            for item in items:
+                altitude = item[1].altitude or 0
+                band = len([i for i in self.altitude_bands if altitude > i])
+                bands.setdefault(band, []).append(item)
+            bands = [(max(i[1].altitude or 0 for i in band_items), band_items,
+                      point._SphereGrid([i[1] for i in band_items]))
+                     for _, band_items in sorted(bands.items())]
+            self._grid = (items,
+                          point._SphereGrid([trigpoint
+                                             for _, trigpoint in items]),
+                          bands)
+        return self._grid
+
+    def nearest(self, location, k=1):
+        """Find the nearest trigpoints to a location.
+
+        :param point.Point location: Location to search around
+        :param int k: Number of trigpoints to find
+        :rtype: ``list`` of ``tuple`` of identity and :class:`Trigpoint`
+        :return: Nearest trigpoints, nearest first
+        :raise ValueError: ``k`` isn't positive
+
+        .. versionadded:: 0.13.0
+        """
+        if not k >= 1:
+            raise ValueError('Number of trigpoints must be positive')
+        items, grid, _ = self._build_grid()
+        return [items[index] for index, _ in
+                grid.nearest(location.latitude, location.longitude, k)]
+
+    def visible_from(self, location, altitude=None, ellipsoid='WGS84'):
+        """Find trigpoints with line of sight potential from a location.
+
+        Trigpoints are selected when the sum of their horizon distance and
+        the location's is larger than the distance between them, using the
+        Earth's radius at the location from :func:`utils.calc_radius`.
+        Intervening terrain and atmospheric refraction are not considered,
+        and trigpoints with unknown altitudes are treated as being at sea
+        level.
+
+        :param point.Point location: Location to search around
+        :param float altitude: Location's altitude in metres, defaults to the
+            location's ``altitude`` attribute if it has one
+        :param str ellipsoid: Ellipsoid model to use for the Earth's radius
+        :rtype: ``list`` of ``tuple`` of identity and :class:`Trigpoint`
+        :return: Trigpoints possibly visible from the location, nearest first
+
+        .. versionadded:: 0.13.0
+        """
+        if altitude is None:
+            altitude = getattr(location, 'altitude', None) or 0
+        radius = utils.calc_radius(location.latitude, ellipsoid)
+        horizon = _horizon(altitude, radius)
+        visible = []
+        for highest, items, grid in self._build_grid()[2]:
+            limit = (horizon + _horizon(highest, radius)) / radius
+            for index, angle in grid.within(location.latitude,
+                                            location.longitude, limit):
+                trigpoint = items[index][1]
+                if trigpoint is location:
+                    continue
+                # Inline _horizon(), as this is called for every candidate
+                height = max(trigpoint.altitude or 0, 0) / 1000
+                if angle * radius - horizon <= \
+                        math.sqrt(2 * radius * height + height * height):
+                    visible.append((angle, items[index]))
+        visible.sort(key=lambda x: x[0])
+        return [item for _, item in visible]
+
+    @instrument.instrumented('trigpoints')
     def import_locations(self, marker_file):
         """Import trigpoint database files.
 
@@ -138,26 +256,66 @@ class Trigpoints(point.KeyedPoints):
         .. _alltrigs-wgs84.txt: http://www.haroldstreet.org.uk/trigpoints/
         """
         self._marker_file = marker_file
-        field_names = ('tag', 'identity', 'latitude', 'longitude', 'altitude',
-                       'name')
-        pos_parse = lambda x, s: float(s[1:]) if s[0] == x else 0 - float(s[1:])
-        latitude_parse = partial(pos_parse, 'N')
-        longitude_parse = partial(pos_parse, 'E')
+        for identity, trigpoint in iter_trigpoints(marker_file):
+            self[identity] = trigpoint
+
+
+def _horizon(altitude, radius):
+    """Calculate the distance to the horizon.
+
+    :param float altitude: Height above the surface in metres
+    :param float radius: Radius of the Earth in kilometres
+    :rtype: ``float``
+    :return: Distance to the horizon in kilometres
+    """
+    height = max(altitude, 0) / 1000
+    return math.sqrt(2 * radius * height + height * height)
+
+
+def iter_trigpoints(marker_file, predicate=None, bbox=None):
+    """Lazily parse `alltrigs-wgs84.txt`_ trigpoint database files.
+
+    Rows outside of ``bbox`` are rejected once their location has been
+    parsed, before the remaining fields are converted.  The record passed to
+    ``predicate`` contains the keyword arguments of :class:`Trigpoint`.
+
+    :type marker_file: ``file``, ``list`` or ``str``
+    :param marker_file: Trigpoint data to read
+    :param function predicate: Function called with each row's parsed
+        fields, returning ``False`` for rows to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select rows from
+    :rtype: ``generator`` of ``tuple``
+    :return: Identities and :class:`Trigpoint` objects for matching rows
+
+    .. versionadded:: 0.13.0
+
+    .. _alltrigs-wgs84.txt: http://www.haroldstreet.org.uk/trigpoints/
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    predicate = filters.predicate
+
+    for row in utils.prepare_csv_rows(marker_file):
+        # The 506514 entry contains a spurious comma, and the overflow
+        # field is simply ignored
+        if len(row) < 6 or not row[0] == 'W':
+            instrument.count('rows_skipped')
+            continue
+        _, identity, latitude, longitude, altitude, name = row[:6]
+        latitude = float(latitude[1:]) if latitude[0] == 'N' \
+            else 0 - float(latitude[1:])
+        longitude = float(longitude[1:]) if longitude[0] == 'E' \
+            else 0 - float(longitude[1:])
+        if filters.south is not None and \
+                not filters.in_bbox(latitude, longitude):
+            continue
         # A value of 8888.0 denotes unavailable data
-        altitude_parse = lambda s: None if s.strip() == '8888.0' else float(s)
-        field_parsers = (str, int, latitude_parse, longitude_parse,
-                         altitude_parse, str)
-
-        data = utils.prepare_csv_read(marker_file, field_names)
-
-        for row in (x for x in data if x['tag'] == 'W'):
-            for name, parser in zip(field_names, field_parsers):
-                row[name] = parser(row[name])
-            del row['tag']
-            try:
-                self[row['identity']] = Trigpoint(**row)
-            except TypeError:
-                # Workaround formatting error in 506514 entry that contains
-                # spurious comma
-                del row[None]
-                self[row['identity']] = Trigpoint(**row)
+        altitude = None if altitude.strip() == '8888.0' else float(altitude)
+        identity = int(identity)
+        if predicate is not None and \
+                not predicate({'identity': identity, 'latitude': latitude,
+                               'longitude': longitude, 'altitude': altitude,
+                               'name': name}):
+            continue
+        yield identity, Trigpoint(latitude, longitude, altitude, name,
+                                  identity)
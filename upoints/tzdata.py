@@ -19,7 +19,7 @@
 
 from operator import attrgetter
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 from upoints.compat import mangle_repr_type
 
 
@@ -80,6 +80,8 @@ class Zones(point.Points):
     .. versionadded:: 0.6.0
     """
 
+    point_class = Zone
+
     def __init__(self, zone_file=None):
         """Initialise a new Zones object."""
         super(Zones, self).__init__()
@@ -87,6 +89,7 @@ class Zones(point.Points):
         if zone_file:
             self.import_locations(zone_file)
 
+    @instrument.instrumented('tzdata')
     def import_locations(self, zone_file):
         """Parse zoneinfo zone description data files.
 
@@ -120,14 +123,7 @@ class Zones(point.Points):
         .. _standard distribution site: ftp://elsie.nci.nih.gov/pub/
         """
         self._zone_file = zone_file
-        field_names = ('country', 'location', 'zone', 'comments')
-
-        data = utils.prepare_csv_read(zone_file, field_names, delimiter=r"	")
-
-        for row in (x for x in data if not x['country'].startswith('#')):
-            if row['comments']:
-                row['comments'] = row['comments'].split(', ')
-            self.append(Zone(**row))
+        self.extend(iter_zones(zone_file))
 
     def dump_zone_file(self):
         """Generate a zoneinfo compatible zone description table.
@@ -146,3 +142,39 @@ class Zones(point.Points):
                 text.append('	%s' % ', '.join(zone.comments))
             data.append(''.join(text))
         return data
+
+
+def iter_zones(zone_file, predicate=None, bbox=None):
+    """Lazily parse zoneinfo zone description data files.
+
+    The record passed to ``predicate`` contains the keyword arguments of
+    :class:`Zone`.
+
+    :type zone_file: ``file``, ``list`` or ``str``
+    :param zone_file: ``zone.tab`` data to read
+    :param function predicate: Function called with each row's parsed
+        fields, returning ``False`` for rows to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select rows from
+    :rtype: ``generator`` of :class:`Zone`
+    :return: Matching zone descriptions
+
+    .. versionadded:: 0.13.0
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    field_names = ('country', 'location', 'zone', 'comments')
+
+    data = utils.prepare_csv_read(zone_file, field_names, delimiter=r"	")
+
+    for row in data:
+        if row['country'].startswith('#'):
+            instrument.count('rows_skipped')
+            continue
+        if filters.south is not None:
+            location = utils.from_iso6709(row['location'] + '/')
+            if not filters.in_bbox(*location[:2]):
+                continue
+        if row['comments']:
+            row['comments'] = row['comments'].split(', ')
+        if filters.matches(row):
+            yield Zone(**row)
@@ -22,12 +22,18 @@ from __future__ import division
 #: Address for use in messages
 __bug_report__ = 'James Rowe <jnrowe@gmail.com>'
 
+import bz2
 import csv
 import datetime
+import gzip
 import inspect
+import io
 import math
+import numbers
 import re
+import zipfile
 
+from array import array
 from functools import reduce
 
 from lxml import etree
@@ -35,7 +41,13 @@ from lxml import objectify as _objectify
 
 from operator import add
 
-from upoints.compat import (basestring, mangle_repr_type)
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+from upoints import instrument
+from upoints.compat import (basestring, lru_cache, mangle_repr_type)
 
 
 #: Body radii of various solar system objects
@@ -151,32 +163,144 @@ def repr_assist(obj, remap=None):
     return "%s(%s)" % (obj.__class__.__name__, ', '.join(data))
 
 
+#: Leading bytes of supported compressed formats
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+
+def _peek(stream, size):
+    """Read leading bytes from a binary stream without consuming them.
+
+    :param stream: Binary file like object
+    :param int size: Number of bytes to read
+    :rtype: ``bytes``
+    :return: Leading bytes, or an empty string if the stream can neither
+        peek nor seek
+    """
+    if hasattr(stream, 'peek'):
+        return stream.peek(size)[:size]
+    try:
+        position = stream.tell()
+        head = stream.read(size)
+        stream.seek(position)
+    except (AttributeError, IOError, ValueError):
+        return b''
+    return head
+
+
+def _decompress(stream, compression):
+    """Wrap a binary stream with a streaming decompressor.
+
+    :param stream: Binary file like object
+    :param str compression: Compression format from :data:`COMPRESSION_MAGIC`
+    :rtype: ``file`` like object
+    :return: Stream of decompressed data
+    :raise ValueError: Unsupported compression, or multi-file zip archive
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression == 'bz2':
+        return bz2.BZ2File(stream)
+    elif compression == 'xz':
+        if not lzma:
+            raise ValueError('xz compressed data requires the lzma module')
+        return lzma.LZMAFile(stream)
+    elif compression == 'zip':
+        archive = zipfile.ZipFile(stream)
+        members = [info for info in archive.infolist()
+                   if not info.filename.endswith('/')]
+        if not len(members) == 1:
+            raise ValueError('Zip archives must contain a single file, found '
+                             '%d' % len(members))
+        return archive.open(members[0])
+    raise ValueError('Unknown compression %r' % compression)
+
+
+def prepare_stream(data, binary=False):
+    """Open a file, transparently decompressing its contents.
+
+    gzip, bzip2, xz and zip compressed data is detected from its leading
+    bytes, and decompressed incrementally as the stream is read so that large
+    archives never need to be held in memory or written to disk.  Zip
+    archives must contain a single file.
+
+    File objects are only examined if they are opened in binary mode, text
+    mode objects are returned unchanged.
+
+    :type data: ``file`` like object or ``str``
+    :param data: File object or filename to open
+    :param bool binary: Return a binary stream, instead of text
+    :rtype: ``file`` like object
+    :return: Stream of decompressed data
+    :raise TypeError: Invalid value for data
+    :raise ValueError: Unsupported compressed data
+
+    .. versionadded:: 0.13.0
+    """
+    if isinstance(data, basestring):
+        data = open(data, 'rb')
+    elif not hasattr(data, 'read'):
+        raise TypeError('Unable to handle data of type %r' % type(data))
+    elif not isinstance(data.read(0), bytes):
+        return data
+    head = _peek(data, 6)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            data = _decompress(data, compression)
+            break
+    if binary:
+        return data
+    if not hasattr(data, 'readable'):
+        # Python 2's file objects predate the io module
+        data = io.open(data.fileno(), 'rb', closefd=False)
+    return io.TextIOWrapper(data)
+
+
 def prepare_read(data, method='readlines', mode='r'):
     """Prepare various input types for parsing.
 
+    Files are iterated lazily when ``method`` is ``readlines``, and
+    compressed files are handled by :func:`prepare_stream`.
+
+    .. versionchanged:: 0.13.0
+       Lines are no longer read in to a list, and compressed data is
+       supported
+
     :type data: ``file`` like object, ``list``, ``str``
     :param data: Data to read
     :param str method: Method to process data with
     :param str mode: Custom mode to process with, if data is a file
     :rtype: ``list``
-    :return: List suitable for parsing
+    :return: Iterable of lines, or the text when ``method`` is ``read``
     :raise TypeError: Invalid value for data
     """
-    if hasattr(data, 'readlines'):
-        data = getattr(data, method)()
-    elif isinstance(data, list):
+    if isinstance(data, list):
         if method == 'read':
-            return ''.join(data)
-    elif isinstance(data, basestring):
-        data = getattr(open(data, mode), method)()
+            data = ''.join(data)
+    elif isinstance(data, basestring) or hasattr(data, 'readlines'):
+        data = prepare_stream(data, 'b' in mode)
+        if not method == 'readlines':
+            data = getattr(data, method)()
     else:
         raise TypeError('Unable to handle data of type %r' % type(data))
+    if instrument.REGISTRY.enabled:
+        if method == 'read':
+            instrument.count('bytes_read', len(data))
+        else:
+            data = instrument.counted_lines(data)
     return data
 
 
 def prepare_csv_read(data, field_names, *args, **kwargs):
     """Prepare various input types for CSV parsing.
 
+    .. versionchanged:: 0.13.0
+       Compressed data is supported
+
     :type data: ``file`` like object, ``list``, ``str``
     :param data: Data to read
     :type field_names: ``tuple`` of ``str``
@@ -185,18 +309,41 @@ def prepare_csv_read(data, field_names, *args, **kwargs):
     :return: CSV reader suitable for parsing
     :raise TypeError: Invalid value for data
     """
-    if hasattr(data, 'readlines') or isinstance(data, list):
+    if isinstance(data, list):
         pass
-    elif isinstance(data, basestring):
-        data = open(data)
+    elif hasattr(data, 'readlines') or isinstance(data, basestring):
+        data = prepare_stream(data)
     else:
         raise TypeError('Unable to handle data of type %r' % type(data))
+    if instrument.REGISTRY.enabled:
+        data = instrument.counted_lines(data)
     return csv.DictReader(data, field_names, *args, **kwargs)
 
 
+def prepare_csv_rows(data, *args, **kwargs):
+    """Prepare various input types for tuple based CSV parsing.
+
+    Rows are produced as lists of fields, which avoids the cost of building a
+    ``dict`` for each row in :func:`prepare_csv_read` for importers that
+    handle fields by position.
+
+    :type data: ``file`` like object, ``list``, ``str``
+    :param data: Data to read
+    :rtype: `csv.reader`
+    :return: CSV reader suitable for parsing
+    :raise TypeError: Invalid value for data
+
+    .. versionadded:: 0.13.0
+    """
+    return csv.reader(prepare_read(data), *args, **kwargs)
+
+
 def prepare_xml_read(data, objectify=False):
     """Prepare various input types for XML parsing.
 
+    .. versionchanged:: 0.13.0
+       Compressed data is supported
+
     :type data: ``file`` like object, ``list``, ``str``
     :param data: Data to read
     :type objectify: bool
@@ -206,15 +353,236 @@ def prepare_xml_read(data, objectify=False):
     :raise TypeError: Invalid value for data
     """
     mod = _objectify if objectify else etree
-    if hasattr(data, 'readlines'):
-        data = mod.parse(data).getroot()
-    elif isinstance(data, list):
-        data = mod.fromstring(''.join(data))
-    elif isinstance(data, basestring):
-        data = mod.parse(open(data)).getroot()
+    if isinstance(data, list):
+        data = ''.join(data)
+        instrument.count('bytes_read', len(data))
+        with instrument.timer('parse'):
+            return mod.fromstring(data)
+    elif isinstance(data, basestring) or hasattr(data, 'readlines'):
+        data = prepare_stream(data, True)
     else:
         raise TypeError('Unable to handle data of type %r' % type(data))
-    return data
+    with instrument.timer('parse'):
+        root = mod.parse(data).getroot()
+    if instrument.REGISTRY.enabled:
+        try:
+            instrument.count('bytes_read', data.tell())
+        except (AttributeError, IOError, ValueError):
+            # Unseekable streams, such as pipes, can't report their position
+            pass
+    return root
+
+
+def prepare_xml_feed(data, size=65536):
+    """Prepare various input types for incremental XML parsing.
+
+    The chunks are suitable for passing to an :class:`etree.XMLParser`'s
+    ``feed()`` method, so that documents can be processed without holding
+    their text in memory.  Compressed data is handled by
+    :func:`prepare_stream`.
+
+    :type data: ``file`` like object, ``list``, ``str``
+    :param data: Data to read
+    :param int size: Size of chunks to read from files
+    :rtype: ``list`` of ``str``
+    :return: Chunks of the document
+    :raise TypeError: Invalid value for data
+
+    .. versionadded:: 0.13.0
+    """
+    if isinstance(data, list):
+        chunks = iter(data)
+    else:
+        data = prepare_stream(data, True)
+        chunks = iter(lambda: data.read(size), data.read(0))
+    if instrument.REGISTRY.enabled:
+        chunks = instrument.counted_lines(chunks)
+    return chunks
+
+
+class RecordFilter(object):
+
+    """Filter for parsed records, applied before location objects are built.
+
+    Bounding boxes may be :class:`point.Bounds` objects, or ``(south, west,
+    north, east)`` tuples.  Boxes with a ``west`` edge greater than their
+    ``east`` edge cross the antimeridian.
+
+    .. versionadded:: 0.13.0
+    """
+
+    __slots__ = ('predicate', 'south', 'west', 'north', 'east')
+
+    def __init__(self, predicate=None, bbox=None):
+        """Initialise a new ``RecordFilter`` object.
+
+        :param function predicate: Function called with a ``dict`` of each
+            record's parsed fields, returning ``False`` for records to skip
+        :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+        :param bbox: Area to select records from
+        """
+        super(RecordFilter, self).__init__()
+        self.predicate = predicate
+        if bbox is None:
+            self.south = self.west = self.north = self.east = None
+        elif isinstance(bbox, (list, tuple)):
+            self.south, self.west, self.north, self.east = bbox
+        else:
+            self.south, self.west, self.north, self.east = \
+                bbox.south, bbox.west, bbox.north, bbox.east
+
+    def __bool__(self):
+        """Check whether any filtering is required.
+
+        :rtype: ``bool``
+        """
+        return self.predicate is not None or self.south is not None
+    __nonzero__ = __bool__
+
+    def in_bbox(self, latitude, longitude):
+        """Test whether a location is within the bounding box.
+
+        Records without a location are never within a bounding box.
+
+        :param float latitude: Location's latitude
+        :param float longitude: Location's longitude
+        :rtype: ``bool``
+        """
+        if self.south is None:
+            return True
+        if latitude is None or longitude is None \
+                or not self.south <= latitude <= self.north:
+            return False
+        if self.west <= self.east:
+            return self.west <= longitude <= self.east
+        else:
+            return longitude >= self.west or longitude <= self.east
+
+    def matches(self, record):
+        """Test a record's fields against the predicate.
+
+        :param dict record: Parsed fields of the record
+        :rtype: ``bool``
+        """
+        return self.predicate is None or bool(self.predicate(record))
+
+
+def local_name(tag):
+    """Strip the namespace from an element's tag.
+
+    :param str tag: Tag in ``{namespace}name`` form, or unqualified
+    :rtype: ``str``
+    :return: Tag without namespace
+
+    .. versionadded:: 0.13.0
+    """
+    return tag.rpartition('}')[2]
+
+
+def child_texts(element):
+    """Collect the text of an element's children in a single pass.
+
+    This is considerably cheaper than separate ``find()`` calls, or
+    attribute lookups with :mod:`lxml.objectify`, for each optional child.
+
+    :param etree.Element element: Element to read
+    :rtype: ``dict``
+    :return: Local tag names of children mapped to their text, for the first
+        occurrence of each tag
+
+    .. versionadded:: 0.13.0
+    """
+    texts = {}
+    for child in element:
+        tag = child.tag
+        if isinstance(tag, basestring):
+            texts.setdefault(local_name(tag), child.text)
+    return texts
+
+
+def iterparse_xml(data, handlers, starts=None):
+    """Parse XML incrementally, passing selected elements to handlers.
+
+    Handlers are selected by paths of local tag names from the root element,
+    such as ``gpx/trk/trkseg/trkpt``, with namespaces ignored.  Each handler
+    in ``handlers`` is called with the complete :class:`etree.Element` when
+    its closing tag is read, and the element is then cleared.  Descendants of
+    elements in ``handlers`` are only available through the element, and are
+    not matched against paths themselves.  Handlers in ``starts`` are called
+    when an element's opening tag is read, when only its attributes are
+    available.
+
+    Completed elements are discarded as parsing proceeds, so memory use
+    depends on the size of the handled elements rather than the size of the
+    document.
+
+    :type data: ``file`` like object, ``list``, ``str``
+    :param data: Data to read
+    :param dict handlers: Paths mapped to functions to call with completed
+        elements
+    :param dict starts: Paths mapped to functions to call with opened
+        elements
+    :raise TypeError: Invalid value for data
+    :raise etree.XMLSyntaxError: Malformed XML
+
+    .. versionadded:: 0.13.0
+    """
+    if not starts:
+        starts = {}
+    chunks = prepare_xml_feed(data)
+    # Only request events for elements that can appear in paths, so that the
+    # children of handled elements are never passed back to Python
+    tags = set()
+    depths = {}
+    for path in list(handlers) + list(starts):
+        tags.update(path.split('/'))
+        depths[path] = path.count('/')
+    parser = etree.XMLPullParser(events=('start', 'end'), huge_tree=True,
+                                 tag=['{*}%s' % tag for tag in tags])
+    paths = []
+    # Depth within the handled element currently being read
+    nested = 0
+    with instrument.timer('parse'):
+        while True:
+            chunk = next(chunks, None)
+            if chunk is None:
+                parser.close()
+            else:
+                parser.feed(chunk)
+            for event, element in parser.read_events():
+                if nested:
+                    if event == 'start':
+                        nested += 1
+                        continue
+                    nested -= 1
+                    if nested:
+                        continue
+                    handlers[paths.pop()](element)
+                elif event == 'start':
+                    tag = element.tag.rpartition('}')[2]
+                    path = paths[-1] + '/' + tag if paths else tag
+                    paths.append(path)
+                    if path not in depths:
+                        continue
+                    # Elements without events can hide an unexpected parent
+                    depth = 0
+                    for _ in element.iterancestors():
+                        depth += 1
+                    if not depth == depths[path]:
+                        continue
+                    if path in starts:
+                        starts[path](element)
+                    if path in handlers:
+                        nested = 1
+                    continue
+                else:
+                    paths.pop()
+                element.clear()
+                # Drop completed siblings, which have already been cleared
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            if chunk is None:
+                break
 
 
 def element_creator(namespace=None):
@@ -246,6 +614,100 @@ def element_creator(namespace=None):
 
     return create_elem
 
+
+try:
+    array('q')
+    #: Type code for 64-bit integer columns
+    _INT64 = 'q'
+except ValueError:  # Python 2
+    _INT64 = 'l'
+
+
+def encode_column(values):
+    """Encode values as a typed column.
+
+    Columns are ``dict`` objects with a ``type`` and ``data`` entry.  Numeric
+    values are stored in :class:`array.array` buffers, which can be wrapped
+    without copying by consumers that understand the buffer protocol, such as
+    ``numpy.frombuffer()`` or ``pyarrow.py_buffer()``.  Strings are
+    dictionary encoded with ``int32`` indices into a ``dictionary`` list, and
+    other values are stored in an ``object`` list.  If any values are
+    ``None`` a ``mask`` buffer is added, with ``1`` for valid entries.
+
+    :param list values: Values to encode
+    :rtype: ``dict``
+    :return: Column description
+
+    .. versionadded:: 0.13.0
+    """
+    present = [value for value in values if value is not None]
+    if not present:
+        kind = 'object'
+    elif all(isinstance(value, bool) for value in present):
+        kind = 'bool'
+    elif all(isinstance(value, numbers.Integral)
+             and not isinstance(value, bool) for value in present):
+        kind = 'int'
+    elif all(isinstance(value, (float, numbers.Integral))
+             and not isinstance(value, bool) for value in present):
+        kind = 'float64'
+    elif all(isinstance(value, basestring) for value in present):
+        kind = 'dictionary'
+    else:
+        kind = 'object'
+
+    if kind == 'object':
+        return {'type': kind, 'data': list(values)}
+
+    column = {}
+    if len(present) < len(values):
+        column['mask'] = array('B', [value is not None for value in values])
+        values = [0 if value is None else value for value in values]
+    if kind == 'dictionary':
+        dictionary = {}
+        for value in present:
+            dictionary.setdefault(value, len(dictionary))
+        column['dictionary'] = sorted(dictionary, key=dictionary.get)
+        column['data'] = array('i', [dictionary.get(value, 0)
+                                     for value in values])
+    elif kind == 'int':
+        column['data'] = array(_INT64, values)
+        kind = 'int%d' % (column['data'].itemsize * 8)
+    elif kind == 'bool':
+        column['data'] = array('B', values)
+    else:
+        column['data'] = array('d', values)
+    column['type'] = kind
+    return column
+
+
+def decode_column(column):
+    """Decode a typed column in to values.
+
+    .. seealso::
+
+       :func:`encode_column`
+
+    :param dict column: Column description
+    :rtype: ``list``
+    :return: Values stored in column
+
+    .. versionadded:: 0.13.0
+    """
+    data = column['data']
+    if column['type'] == 'dictionary':
+        dictionary = column['dictionary']
+        values = [dictionary[index] for index in data]
+    elif column['type'] == 'bool':
+        values = [bool(value) for value in data]
+    else:
+        values = list(data)
+    mask = column.get('mask')
+    if mask is not None:
+        values = [value if valid else None
+                  for value, valid in zip(values, mask)]
+    return values
+
 #}
 
 
@@ -357,9 +819,11 @@ class TzOffset(datetime.tzinfo):
         .. _ISO 8601: http://www.cl.cam.ac.uk/~mgk25/iso-time.html
         """
         super(TzOffset, self).__init__()
-        hours, minutes = map(int, tzstring.split(':'))
+        hours, minutes = map(int, tzstring.lstrip('+-').split(':'))
 
         self.__offset = datetime.timedelta(hours=hours, minutes=minutes)
+        if tzstring.startswith('-'):
+            self.__offset = -self.__offset
 
     def __repr__(self):
         """Self-documenting string representation.
@@ -386,12 +850,10 @@ class TzOffset(datetime.tzinfo):
         :rtype: ``str``
         :return: Human-readable timezone definition
         """
-        offset = self.utcoffset()
-        hours, minutes = divmod(offset.seconds / 60, 60)
-        if offset.days == -1:
-            hours = -24 + hours
+        offset = total_seconds(self.utcoffset()) // 60
+        hours, minutes = divmod(abs(offset), 60)
 
-        return '%+03i:%02i' % (hours, minutes)
+        return '%s%02i:%02i' % ('-' if offset < 0 else '+', hours, minutes)
 
     def utcoffset(self, dt=None):
         """Return the offset in minutes from UTC.
@@ -429,18 +891,54 @@ class Timestamp(datetime.datetime):
         :return: Parsed timestamp
         """
         if len(timestamp) == 20:
-            zone = TzOffset('+00:00')
+            zone = _zone_offset('+00:00')
             timestamp = timestamp[:-1]
         elif len(timestamp) == 24:
-            zone = TzOffset('%s:%s' % (timestamp[-5:-2], timestamp[-2:]))
+            zone = _zone_offset('%s:%s' % (timestamp[-5:-2], timestamp[-2:]))
             timestamp = timestamp[:-5]
         elif len(timestamp) == 25:
-            zone = TzOffset(timestamp[-6:])
+            zone = _zone_offset(timestamp[-6:])
             timestamp = timestamp[:-6]
+        if timestamp[4:5] == timestamp[7:8] == '-' \
+                and timestamp[10:11] == 'T' \
+                and timestamp[13:14] == timestamp[16:17] == ':' \
+                and timestamp[:4].isdigit():
+            # Fixed width fields can be sliced, which is far cheaper than
+            # strptime
+            return Timestamp(int(timestamp[:4]), int(timestamp[5:7]),
+                             int(timestamp[8:10]), int(timestamp[11:13]),
+                             int(timestamp[14:16]), int(timestamp[17:19]),
+                             tzinfo=zone)
         timestamp = Timestamp.strptime(timestamp, '%Y-%m-%dT%H:%M:%S')
         timestamp = timestamp.replace(tzinfo=zone)
         return timestamp
 
+
+@lru_cache(maxsize=64)
+def _zone_offset(tzstring):
+    """Create a shared :class:`TzOffset` for a timezone definition.
+
+    :param str tzstring: `ISO 8601`_ style timezone definition
+    :rtype: :class:`TzOffset`
+
+    .. _ISO 8601: http://www.cl.cam.ac.uk/~mgk25/iso-time.html
+    """
+    return TzOffset(tzstring)
+
+
+def total_seconds(delta):
+    """Calculate the length of a time delta in seconds.
+
+    ``timedelta.total_seconds()`` is only available from Python 2.7.
+
+    :param datetime.timedelta delta: Time delta to convert
+    :rtype: ``float``
+    :return: Length of ``delta`` in seconds
+
+    .. versionadded:: 0.13.0
+    """
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1000000
+
 #}
 
 #{ Coordinate conversion utilities
@@ -745,64 +1243,130 @@ def to_grid_locator(latitude, longitude, precision='square'):
     return ''.join(locator)
 
 
+def _coordinate_pattern(name, hemispheres):
+    """Build regular expression fragment for a single coordinate.
+
+    :param str name: Group name prefix for coordinate
+    :param str hemispheres: Valid hemisphere suffixes for coordinate
+    :rtype: ``str``
+    :return: Pattern matching decimal, DMS or NOAA style coordinate, with
+        optional hemisphere
+    """
+    # NOAA's ``DD-MM-SSH`` style has optional, and sometimes blank, seconds
+    # so it is only accepted with a hemisphere
+    return r'''
+        (?:(?P<%(name)s_d>\d+)[^\d\s](?P<%(name)s_m>\d+)[^\d\s]
+           (?P<%(name)s_s>\d+)[s"]
+         |(?P<%(name)s_nd>\d+)-\s*(?P<%(name)s_nm>\d+)
+           (?:-\s*(?P<%(name)s_ns>\d*))?(?=\s*[%(hemispheres)s])
+         |(?P<%(name)s>[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?))
+        (?:\s*(?P<%(name)s_h>[%(hemispheres)s]))?
+    ''' % {'name': name, 'hemispheres': hemispheres}
+
+#: Single pass parser for all supported location formats
+location_matcher = re.compile(r'''
+    ^\s*(?:
+        (?P<locator>[A-R]{2}\d{2}(?:[a-xA-X]{2}(?:\d{2})?)?)
+      |
+        %s (?:\s*[;,]\s*|\s+) %s
+    )\s*$
+    ''' % (_coordinate_pattern('latitude', 'NS'),
+           _coordinate_pattern('longitude', 'EW')), re.VERBOSE)
+
+#: Parser for a single coordinate, with a hemisphere to denote its axis
+coordinate_matcher = re.compile(r'^\s*%s\s*$'
+                                % _coordinate_pattern('angle', 'NSEW'),
+                                re.VERBOSE)
+
+
+def _match_coordinate(groups, name, negative):
+    """Convert matched coordinate groups to decimal degrees.
+
+    :param dict groups: Named groups from :data:`location_matcher`
+    :param str name: Group name prefix for coordinate
+    :param str negative: Hemisphere suffixes for negative values
+    :rtype: ``float``
+    :return: Coordinate in decimal degrees
+    """
+    if groups[name]:
+        value = float(groups[name])
+    else:
+        if groups[name + '_d']:
+            units = ('_d', '_m', '_s')
+        else:
+            units = ('_nd', '_nm', '_ns')
+        degrees, minutes, seconds = [groups[name + unit] for unit in units]
+        # Matched fields are unsigned, so there is no need for to_dd()'s
+        # sign handling
+        value = int(degrees) + int(minutes) / 60 + int(seconds or 0) / 3600
+    hemisphere = groups[name + '_h']
+    if hemisphere and hemisphere in negative:
+        value = -value
+    return value
+
+
+@lru_cache(maxsize=4096)
 def parse_location(location):
     """Parse latitude and longitude from string location.
 
+    Decimal, hemisphere suffixed, DMS and Maidenhead locator formats are
+    recognised in a single pass, and results are cached as location strings
+    tend to be repeated in real data.
+
+    .. versionchanged:: 0.13.0
+       Maidenhead locators, and NOAA style ``DD-MM-SSH`` coordinates are also
+       parsed
+
     :param str location: String to parse
     :rtype: ``tuple`` of ``float`` objects
-    :return: Latitude and longitude of location
+    :return: Latitude and longitude of location, or ``None`` if ``location``
+        isn't recognised
     """
+    matches = location_matcher.match(location)
+    if not matches:
+        return None
+    groups = matches.groupdict()
+    if groups['locator']:
+        return from_grid_locator(groups['locator'])
+    return (_match_coordinate(groups, 'latitude', 'S'),
+            _match_coordinate(groups, 'longitude', 'W'))
 
-    def split_dms(text, hemisphere):
-        """Split degrees, minutes and seconds string.
 
-        :param str text: Text to split
-        :rtype: ``float``
-        :return: Decimal degrees
-        """
-        out = []
-        sect = []
-        for i in text:
-            if i.isdigit():
-                sect.append(i)
-            else:
-                out.append(sect)
-                sect = []
-        d, m, s = [float(''.join(i)) for i in out]
-        if hemisphere in 'SW':
-            d, m, s = [-1 * x for x in (d, m, s)]
-        return to_dd(d, m, s)
-
-    for sep in ';, ':
-        chunks = location.split(sep)
-        if len(chunks) == 2:
-            if chunks[0].endswith('N'):
-                latitude = float(chunks[0][:-1])
-            elif chunks[0].endswith('S'):
-                latitude = -1 * float(chunks[0][:-1])
-            else:
-                latitude = float(chunks[0])
-            if chunks[1].endswith('E'):
-                longitude = float(chunks[1][:-1])
-            elif chunks[1].endswith('W'):
-                longitude = -1 * float(chunks[1][:-1])
-            else:
-                longitude = float(chunks[1])
-            return latitude, longitude
-        elif len(chunks) == 4:
-            if chunks[0].endswith(('s', '"')):
-                latitude = split_dms(chunks[0], chunks[1])
-            else:
-                latitude = float(chunks[0])
-                if chunks[1] == 'S':
-                    latitude = -1 * latitude
-            if chunks[2].endswith(('s', '"')):
-                longitude = split_dms(chunks[2], chunks[3])
-            else:
-                longitude = float(chunks[2])
-                if chunks[3] == 'W':
-                    longitude = -1 * longitude
-            return latitude, longitude
+def parse_coordinate(coordinate):
+    """Parse a single coordinate with a hemisphere suffix.
+
+    The same formats as :func:`parse_location` are recognised, such as
+    ``52.015N`` or NOAA's ``65-58-56N`` and ``70-56N``.
+
+    :param str coordinate: String to parse
+    :rtype: ``float``
+    :return: Coordinate in decimal degrees, negative for the southern and
+        western hemispheres, or ``None`` if ``coordinate`` isn't recognised
+
+    .. versionadded:: 0.13.0
+    """
+    matches = coordinate_matcher.match(coordinate)
+    if not matches:
+        return None
+    return _match_coordinate(matches.groupdict(), 'angle', 'SW')
+
+
+def parse_locations(locations):
+    """Parse latitude and longitude from multiple string locations.
+
+    .. versionadded:: 0.13.0
+
+    .. seealso::
+
+       :func:`parse_location`
+
+    :type locations: ``list`` of ``str``
+    :param locations: Strings to parse
+    :rtype: ``list`` of ``tuple`` of ``float`` objects
+    :return: Latitude and longitude of each location, or ``None`` for entries
+        that aren't recognised
+    """
+    return [parse_location(location) for location in locations]
 #}
 
 #{ Solar event utilities
@@ -829,47 +1393,24 @@ ZENITH = {
 }
 
 
-def sun_rise_set(latitude, longitude, date, mode='rise', timezone=0,
-                 zenith=None):
-    """Calculate sunrise or sunset for a specific location.
-
-    This function calculates the time sunrise or sunset, or optionally the
-    beginning or end of a specified twilight period.
-
-    Source::
+def _sun_utc(day, lng_hour, sin_latitude, cos_latitude, zenith, mode):
+    """Calculate the UTC time of sunrise or sunset.
 
-        Almanac for Computers, 1990
-        published by Nautical Almanac Office
-        United States Naval Observatory
-        Washington, DC 20392
-
-    :param float latitude: Location's latitude
-    :param float longitude: Location's longitude
-    :param datetime.date date: Calculate rise or set for given date
+    :param int day: Day of the year
+    :param float lng_hour: Location's longitude in hours
+    :param float sin_latitude: Sine of location's latitude
+    :param float cos_latitude: Cosine of location's latitude
+    :param float zenith: Sun's zenith for the event, in radians
     :param str mode: Which time to calculate
-    :param int timezone: Offset from UTC in minutes
-    :param str zenith: Calculate rise/set events, or twilight times
-    :rtype: :class:`datetime.time` or ``None``
-    :return: The time for the given event in the specified timezone, or
-        ``None`` if the event doesn't occur on the given date
+    :rtype: ``float``
+    :return: Hours from the start of the day in UTC, or ``None`` if the event
+        doesn't occur on the given day
     :raise ValueError: Unknown value for ``mode``
     """
-    if not date:
-        date = datetime.date.today()
-
-    zenith = ZENITH[zenith]
-
-    # First calculate the day of the year
-    # Thanks, datetime this would have been ugly without you!!!
-    n = (date - datetime.date(date.year - 1, 12, 31)).days
-
-    # Convert the longitude to hour value and calculate an approximate time
-    lng_hour = longitude / 15
-
     if mode == 'rise':
-        t = n + ((6 - lng_hour) / 24)
+        t = day + ((6 - lng_hour) / 24)
     elif mode == 'set':
-        t = n + ((18 - lng_hour) / 24)
+        t = day + ((18 - lng_hour) / 24)
     else:
         raise ValueError('Unknown mode value %r' % mode)
 
@@ -897,9 +1438,7 @@ def sun_rise_set(latitude, longitude, date, mode='rise', timezone=0,
     cos_dec = math.cos(math.asin(sin_dec))
 
     # Calculate the Sun's local hour angle
-    cos_h = (math.radians(zenith) -
-             (sin_dec * math.sin(math.radians(latitude)))) \
-        / (cos_dec * math.cos(math.radians(latitude)))
+    cos_h = (zenith - (sin_dec * sin_latitude)) / (cos_dec * cos_latitude)
 
     if cos_h > 1:
         # The sun never rises on this location (on the specified date)
@@ -919,7 +1458,26 @@ def sun_rise_set(latitude, longitude, date, mode='rise', timezone=0,
     t = h + ra - (0.06571 * t) - 6.622
 
     # Adjust back to UTC
-    utc = t - lng_hour
+    return t - lng_hour
+
+
+def _local_time(date, utc, timezone):
+    """Convert a UTC time of day to a location's time zone.
+
+    :param datetime.date date: Date of the event
+    :param float utc: Hours from the start of ``date`` in UTC
+    :type timezone: ``int`` or ``datetime.tzinfo``
+    :param timezone: Offset from UTC in minutes, or time zone of location
+    :rtype: :class:`datetime.time`
+    :return: Local time of day
+    """
+    if isinstance(timezone, datetime.tzinfo):
+        # The offset in effect at the event's instant is used, so that
+        # daylight saving time is honoured
+        moment = datetime.datetime.combine(date, datetime.time()) \
+            + datetime.timedelta(hours=utc)
+        moment = timezone.fromutc(moment.replace(tzinfo=timezone))
+        timezone = total_seconds(moment.utcoffset()) / 60
 
     # Convert UT value to local time zone of latitude/longitude
     local_t = utc + timezone / 60
@@ -938,6 +1496,56 @@ def sun_rise_set(latitude, longitude, date, mode='rise', timezone=0,
     return datetime.time(hour, minute)
 
 
+def sun_rise_set(latitude, longitude, date, mode='rise', timezone=0,
+                 zenith=None):
+    """Calculate sunrise or sunset for a specific location.
+
+    This function calculates the time sunrise or sunset, or optionally the
+    beginning or end of a specified twilight period.
+
+    Source::
+
+        Almanac for Computers, 1990
+        published by Nautical Almanac Office
+        United States Naval Observatory
+        Washington, DC 20392
+
+    .. versionchanged:: 0.13.0
+       ``timezone`` may be a ``datetime.tzinfo`` object, whose offset for the
+       event is used
+
+    :param float latitude: Location's latitude
+    :param float longitude: Location's longitude
+    :param datetime.date date: Calculate rise or set for given date
+    :param str mode: Which time to calculate
+    :type timezone: ``int`` or ``datetime.tzinfo``
+    :param timezone: Offset from UTC in minutes, or time zone of location
+    :param str zenith: Calculate rise/set events, or twilight times
+    :rtype: :class:`datetime.time` or ``None``
+    :return: The time for the given event in the specified timezone, or
+        ``None`` if the event doesn't occur on the given date
+    :raise ValueError: Unknown value for ``mode``
+    """
+    if not date:
+        date = datetime.date.today()
+
+    zenith = ZENITH[zenith]
+
+    # First calculate the day of the year
+    # Thanks, datetime this would have been ugly without you!!!
+    n = (date - datetime.date(date.year - 1, 12, 31)).days
+
+    # Convert the longitude to hour value and calculate an approximate time
+    lng_hour = longitude / 15
+
+    utc = _sun_utc(n, lng_hour, math.sin(math.radians(latitude)),
+                   math.cos(math.radians(latitude)), math.radians(zenith),
+                   mode)
+    if utc is None:
+        return None
+    return _local_time(date, utc, timezone)
+
+
 def sun_events(latitude, longitude, date, timezone=0, zenith=None):
     """Convenience function for calculating sunrise and sunset.
 
@@ -950,10 +1558,14 @@ def sun_events(latitude, longitude, date, timezone=0, zenith=None):
     Astronomical twilight starts/ends when the Sun's centre is 18 degrees below
     the horizon.
 
+    .. versionchanged:: 0.13.0
+       ``timezone`` may be a ``datetime.tzinfo`` object
+
     :param float latitude: Location's latitude
     :param float longitude: Location's longitude
     :param datetime.date date: Calculate rise or set for given date
-    :param int timezone: Offset from UTC in minutes
+    :type timezone: ``int`` or ``datetime.tzinfo``
+    :param timezone: Offset from UTC in minutes, or time zone of location
     :param str zenith: Calculate rise/set events, or twilight times
     :rtype: ``tuple`` of :class:`datetime.time`
     :return: The time for the given events in the specified timezone
@@ -961,6 +1573,41 @@ def sun_events(latitude, longitude, date, timezone=0, zenith=None):
     return (sun_rise_set(latitude, longitude, date, 'rise', timezone, zenith),
             sun_rise_set(latitude, longitude, date, 'set', timezone, zenith))
 
+
+def sun_events_series(latitude, longitude, dates, timezone=0, zenith=None):
+    """Calculate sunrise and sunset for many dates.
+
+    The results match :func:`sun_events` for each date, but the work that
+    only depends on the location is done once.
+
+    :param float latitude: Location's latitude
+    :param float longitude: Location's longitude
+    :type dates: ``list`` of :class:`datetime.date`
+    :param dates: Dates to calculate rise and set for
+    :type timezone: ``int`` or ``datetime.tzinfo``
+    :param timezone: Offset from UTC in minutes, or time zone of location
+    :param str zenith: Calculate rise/set events, or twilight times
+    :rtype: ``list`` of ``tuple`` of :class:`datetime.time`
+    :return: The time for the rise and set events on each date
+
+    .. versionadded:: 0.13.0
+    """
+    lng_hour = longitude / 15
+    sin_latitude = math.sin(math.radians(latitude))
+    cos_latitude = math.cos(math.radians(latitude))
+    zenith = math.radians(ZENITH[zenith])
+    events = []
+    for date in dates:
+        n = (date - datetime.date(date.year - 1, 12, 31)).days
+        times = []
+        for mode in ('rise', 'set'):
+            utc = _sun_utc(n, lng_hour, sin_latitude, cos_latitude, zenith,
+                           mode)
+            times.append(None if utc is None
+                         else _local_time(date, utc, timezone))
+        events.append(tuple(times))
+    return events
+
 #}
 
 
@@ -25,8 +25,10 @@ __doc__ += """.
 
 
 import logging
+import math
 
-from upoints import (point, trigpoints, utils)
+from upoints import (instrument, point, trigpoints, utils)
+from upoints.compat import lru_cache
 
 
 class Station(trigpoints.Trigpoint):
@@ -101,6 +103,17 @@ class Stations(point.KeyedPoints):
     .. versionadded:: 0.5.1
     """
 
+    point_class = Station
+
+    #: Size in degrees of the cells in which positions share a nearest
+    #: station lookup
+    query_cell = 0.001
+
+    #: Secondary indexes, built when first requested
+    _indexes = None
+    #: Spatial indexes for nearest station searches
+    _grids = None
+
     def __init__(self, data=None, index='WMO'):
         """Initialise a new `Stations` object."""
         super(Stations, self).__init__()
@@ -109,6 +122,153 @@ class Stations(point.KeyedPoints):
         if data:
             self.import_locations(data, index)
 
+    def __repr__(self):
+        """Self-documenting string representation.
+
+        :rtype: ``str``
+        :return: String to recreate ``Stations`` object
+        """
+        return utils.repr_assist(self, {'index': self._index})
+
+    def __setitem__(self, key, value):
+        self._indexes = self._grids = None
+        super(Stations, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._indexes = self._grids = None
+        super(Stations, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._indexes = self._grids = None
+        super(Stations, self).update(*args, **kwargs)
+
+    def pop(self, key, *args):
+        self._indexes = self._grids = None
+        return super(Stations, self).pop(key, *args)
+
+    def popitem(self):
+        self._indexes = self._grids = None
+        return super(Stations, self).popitem()
+
+    def clear(self):
+        self._indexes = self._grids = None
+        super(Stations, self).clear()
+
+    def _build_indexes(self):
+        """Index stations by both identifier schemes, and by country.
+
+        Stations carry the identifier of the scheme that wasn't used for the
+        file in their ``alt_id``, so one file is enough for both schemes.
+
+        :rtype: ``dict``
+        :return: Index name to index mapping
+        """
+        if self._indexes is None:
+            other = 'ICAO' if self._index == 'WMO' else 'WMO'
+            indexes = {self._index: dict(self), other: {}, 'country': {}}
+            for station in self.values():
+                if station.alt_id:
+                    indexes[other][station.alt_id] = station
+                indexes['country'].setdefault(station.country,
+                                              []).append(station)
+            self._indexes = indexes
+        return self._indexes
+
+    def index(self, scheme):
+        """Look up table for stations.
+
+        ``WMO`` and ``ICAO`` tables map identifiers to stations, whichever
+        scheme the data file was indexed with, and the ``country`` table maps
+        country names to lists of stations.  Tables are built when first
+        requested, and rebuilt after the collection changes.  They should be
+        treated as read only.
+
+        :param str scheme: ``WMO``, ``ICAO`` or ``country``
+        :rtype: ``dict``
+        :return: Identifier to station mapping
+        :raise ValueError: Unknown value for ``scheme``
+
+        .. versionadded:: 0.13.0
+        """
+        indexes = self._build_indexes()
+        try:
+            return indexes[scheme]
+        except KeyError:
+            raise ValueError('Unknown index %r' % scheme)
+
+    def _build_grid(self, rbsn_only):
+        """Index stations for nearest station searches.
+
+        :param bool rbsn_only: Only index stations belonging to RBSN
+        :rtype: ``tuple`` of ``list`` and :class:`point._SphereGrid`
+        :return: Identifiers and stations, and their spatial index
+        """
+        if self._grids is None:
+            self._grids = {}
+        if rbsn_only not in self._grids:
+            items = [(key, station) for key, station in self.items()
+                     if station.rbsn or not rbsn_only]
+            self._grids[rbsn_only] = \
+                (items, point._SphereGrid([station for _, station in items]))
+        return self._grids[rbsn_only]
+
+    def nearest_many(self, points, k=1, rbsn_only=False):
+        """Find the nearest stations to each of several locations.
+
+        Consecutive locations falling in the same :attr:`query_cell` share a
+        single search from the cell's centre, so long tracks sampled many
+        times a minute only search once for every hundred metres or so
+        travelled.  Results are produced lazily as ``points`` is consumed,
+        and only the latest search is kept.  Locations without a position,
+        such as :class:`nmea.Fix` objects recorded without a satellite fix,
+        have no nearest stations.
+
+        :type points: ``list`` of :class:`point.Point`
+        :param points: Locations to search around, such as
+            :class:`nmea.Locations` or GPX track points
+        :param int k: Number of stations to find for each location
+        :param bool rbsn_only: Only find stations belonging to RBSN
+        :rtype: ``generator`` of ``list`` of ``tuple`` of identifier and
+            :class:`Station`
+        :return: Nearest stations for each location, nearest first
+        :raise ValueError: ``k`` isn't positive
+
+        .. versionadded:: 0.13.0
+        """
+        if not k >= 1:
+            raise ValueError('Number of stations must be positive')
+        items, grid = self._build_grid(bool(rbsn_only))
+        return self._iter_nearest(points, k, items, grid)
+
+    def _iter_nearest(self, points, k, items, grid):
+        """Find the nearest stations to each location in turn.
+
+        :type points: ``list`` of :class:`point.Point`
+        :param points: Locations to search around
+        :param int k: Number of stations to find for each location
+        :param list items: Identifiers and stations indexed by ``grid``
+        :param point._SphereGrid grid: Spatial index of stations
+        :rtype: ``generator`` of ``list`` of ``tuple`` of identifier and
+            :class:`Station`
+        """
+        cell = self.query_cell
+        last_key = found = None
+        for location in points:
+            latitude = location.latitude
+            longitude = location.longitude
+            if latitude is None or longitude is None:
+                yield []
+                continue
+            key = (int(math.floor(latitude / cell)),
+                   int(math.floor(longitude / cell)))
+            if key != last_key:
+                last_key = key
+                found = [items[index] for index, _ in
+                         grid.nearest((key[0] + 0.5) * cell,
+                                      (key[1] + 0.5) * cell, k)]
+            yield found[:]
+
+    @instrument.instrumented('weather_stations')
     def import_locations(self, data, index='WMO'):
         """Parse NOAA weather station data files.
 
@@ -169,63 +329,107 @@ class Stations(point.KeyedPoints):
         .. _station location page: http://weather.noaa.gov/tg/site.shtml
         """
         self._data = data
-        data = utils.prepare_read(data)
-
-        for line in data:
-            line = line.strip()
-            chunk = line.split(';')
-            if not len(chunk) == 14:
-                if index == 'ICAO':
-                    # Some entries only have 12 or 13 elements, so we assume 13
-                    # and 14 are None.  Of the entries I've hand checked this
-                    # assumption would be correct.
-                    logging.debug('Extending ICAO %r entry, because it is '
-                                  'too short to process' % line)
-                    chunk.extend(['', ''])
-                elif index == 'WMO' and len(chunk) == 13:
-                    # A few of the WMO indexed entries are missing their RBSN
-                    # fields, hand checking the entries for 71046 and 71899
-                    # shows that they are correct if we just assume RBSN is
-                    # false.
-                    logging.debug('Extending WMO %r entry, because it is '
-                                  'too short to process' % line)
-                    chunk.append('')
-                else:
-                    raise utils.FileFormatError('NOAA')
-            if index == 'WMO':
-                identifier = ''.join(chunk[:2])
-                alt_id = chunk[2]
-            elif index == 'ICAO':
-                identifier = chunk[0]
-                alt_id = ''.join(chunk[1:3])
+        self._index = index
+        for identifier, station in iter_stations(data, index):
+            self[identifier] = station
+
+
+@lru_cache(maxsize=4096)
+def _parse_position(value):
+    """Parse a NOAA ``DD-MM-SSH`` style position.
+
+    Some entries in nsd_cccc.txt are of the format "DD-MM- N", and the
+    blank seconds are taken to be 0.
+
+    :param str value: Position to parse
+    :rtype: ``float``
+    :return: Position in decimal degrees, or ``None`` if empty
+    :raise FileFormatError: Invalid position
+    """
+    if not value:
+        return None
+    position = utils.parse_coordinate(value)
+    if position is None:
+        raise utils.FileFormatError('NOAA')
+    return position
+
+
+def iter_stations(data, index='WMO', predicate=None, bbox=None):
+    """Lazily parse NOAA weather station data files.
+
+    Entries outside of ``bbox`` are rejected once their location has been
+    parsed, before the remaining fields are converted.  The record passed to
+    ``predicate`` contains the entry's ``identifier``, and the keyword
+    arguments of :class:`Station`.
+
+    :type data: ``file``, ``list`` or ``str``
+    :param data: NOAA station data to read
+    :param str index: The identifier type used in the file
+    :param function predicate: Function called with each entry's parsed
+        fields, returning ``False`` for entries to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select entries
+        from
+    :rtype: ``generator`` of ``tuple``
+    :return: Identifiers and :class:`Station` objects for matching entries
+    :raise FileFormatError: Unknown file format
+    :raise ValueError: Unknown value for ``index``
+
+    .. versionadded:: 0.13.0
+    """
+    if index not in ('WMO', 'ICAO'):
+        raise ValueError('Unknown format %r' % index)
+    filters = utils.RecordFilter(predicate, bbox)
+    data = utils.prepare_read(data)
+
+    for line in data:
+        line = line.strip()
+        chunk = line.split(';')
+        if not len(chunk) == 14:
+            if index == 'ICAO':
+                # Some entries only have 12 or 13 elements, so we assume 13
+                # and 14 are None.  Of the entries I've hand checked this
+                # assumption would be correct.
+                logging.debug('Extending ICAO %r entry, because it is too '
+                              'short to process' % line)
+                chunk.extend(['', ''])
+            elif index == 'WMO' and len(chunk) == 13:
+                # A few of the WMO indexed entries are missing their RBSN
+                # fields, hand checking the entries for 71046 and 71899
+                # shows that they are correct if we just assume RBSN is
+                # false.
+                logging.debug('Extending WMO %r entry, because it is too '
+                              'short to process' % line)
+                chunk.append('')
             else:
-                raise ValueError('Unknown format %r' % index)
-            if alt_id in ('----', '-----'):
-                alt_id = None
-            name = chunk[3]
-            state = chunk[4] if chunk[4] else None
-            country = chunk[5]
-            wmo = int(chunk[6]) if chunk[6] else None
-            point_data = []
-            for i in chunk[7:11]:
-                if not i:
-                    point_data.append(None)
-                    continue
-                # Some entries in nsd_cccc.txt are of the format "DD-MM-
-                # N", so we just take the spaces to mean 0 seconds.
-                if ' ' in i:
-                    logging.debug('Fixing unpadded location data in %r entry'
-                                  % line)
-                    i = i.replace(' ', '0')
-                values = map(int, i[:-1].split('-'))
-                if i[-1] in ('S', 'W'):
-                    values = [-i for i in values]
-                point_data.append(point.utils.to_dd(*values))
-            latitude, longitude, ua_latitude, ua_longitude = point_data
-            altitude = int(chunk[11]) if chunk[11] else None
-            ua_altitude = int(chunk[12]) if chunk[12] else None
-            rbsn = False if not chunk[13] else True
-            self[identifier] = Station(alt_id, name, state, country, wmo,
-                                       latitude, longitude, ua_latitude,
-                                       ua_longitude, altitude, ua_altitude,
-                                       rbsn)
+                raise utils.FileFormatError('NOAA')
+        latitude = _parse_position(chunk[7])
+        longitude = _parse_position(chunk[8])
+        if not filters.in_bbox(latitude, longitude):
+            continue
+        if index == 'WMO':
+            identifier = ''.join(chunk[:2])
+            alt_id = chunk[2]
+        else:
+            identifier = chunk[0]
+            alt_id = ''.join(chunk[1:3])
+        if alt_id in ('----', '-----'):
+            alt_id = None
+        record = {
+            'alt_id': alt_id,
+            'name': chunk[3],
+            'state': chunk[4] if chunk[4] else None,
+            'country': chunk[5],
+            'wmo': int(chunk[6]) if chunk[6] else None,
+            'latitude': latitude,
+            'longitude': longitude,
+            'ua_latitude': _parse_position(chunk[9]),
+            'ua_longitude': _parse_position(chunk[10]),
+            'altitude': int(chunk[11]) if chunk[11] else None,
+            'ua_altitude': int(chunk[12]) if chunk[12] else None,
+            'rbsn': False if not chunk[13] else True,
+        }
+        if filters.predicate and \
+                not filters.matches(dict(record, identifier=identifier)):
+            continue
+        yield identifier, Station(**record)
@@ -23,7 +23,7 @@ __doc__ += """.
 .. versionadded:: 0.2.0
 """
 
-from upoints import (point, utils)
+from upoints import (instrument, point, utils)
 
 
 class Xearth(point.Point):
@@ -70,6 +70,8 @@ class Xearths(point.KeyedPoints):
     .. versionadded:: 0.5.1
     """
 
+    point_class = Xearth
+
     def __init__(self, marker_file=None):
         """Initialise a new ``Xearths`` object."""
         super(Xearths, self).__init__()
@@ -85,6 +87,7 @@ class Xearths(point.KeyedPoints):
         """
         return '\n'.join(utils.dump_xearth_markers(self, 'comment'))
 
+    @instrument.instrumented('xearth')
     def import_locations(self, marker_file):
         """Parse Xearth data files.
 
@@ -121,18 +124,51 @@ class Xearths(point.KeyedPoints):
         .. _xplanet: http://xplanet.sourceforge.net/
         """
         self._marker_file = marker_file
-        data = utils.prepare_read(marker_file)
-
-        for line in data:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            chunk = line.split('#')
-            data = chunk[0]
-            comment = chunk[1].strip() if len(chunk) == 2 else None
-            # Need maximum split of 2, because name may contain whitespace
-            latitude, longitude, name = data.split(None, 2)
-            name = name.strip()
-            # Find matching start and end quote, and keep only the contents
-            name = name[1:name.find(name[0], 1)]
-            self[name.strip()] = Xearth(latitude, longitude, comment)
+        for name, marker in iter_xearths(marker_file):
+            self[name] = marker
+
+
+def iter_xearths(marker_file, predicate=None, bbox=None):
+    """Lazily parse xearth data files.
+
+    The record passed to ``predicate`` contains the marker's ``name``, and
+    the keyword arguments of :class:`Xearth`.
+
+    :type marker_file: ``file``, ``list`` or ``str``
+    :param marker_file: xearth marker data to read
+    :param function predicate: Function called with each marker's parsed
+        fields, returning ``False`` for markers to skip
+    :type bbox: :class:`point.Bounds` or ``tuple`` of ``float``
+    :param bbox: Area, as ``(south, west, north, east)``, to select markers
+        from
+    :rtype: ``generator`` of ``tuple``
+    :return: Names and :class:`Xearth` objects for matching markers
+
+    .. versionadded:: 0.13.0
+    """
+    filters = utils.RecordFilter(predicate, bbox)
+    data = utils.prepare_read(marker_file)
+
+    for line in data:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            instrument.count('rows_skipped')
+            continue
+        chunk = line.split('#')
+        data = chunk[0]
+        comment = chunk[1].strip() if len(chunk) == 2 else None
+        # Need maximum split of 2, because name may contain whitespace
+        latitude, longitude, name = data.split(None, 2)
+        latitude = float(latitude)
+        longitude = float(longitude)
+        if not filters.in_bbox(latitude, longitude):
+            continue
+        name = name.strip()
+        # Find matching start and end quote, and keep only the contents
+        name = name[1:name.find(name[0], 1)].strip()
+        if filters.predicate and \
+                not filters.matches({'name': name, 'latitude': latitude,
+                                     'longitude': longitude,
+                                     'comment': comment}):
+            continue
+        yield name, Xearth(latitude, longitude, comment)